@@ -1,4 +1,5 @@
 # app/__init__.py
 from .preprocessing import preprocess_data
 from .solver import auto_rooster
-from .validate import validate_auto_rooster
\ No newline at end of file
+from .validate import validate_auto_rooster
+from .instance import ProblemInstance
@@ -0,0 +1,176 @@
+"""
+Headless scheduler: preprocess → solve → validate without the web interface.
+
+    python -m app werknemers.xlsx onbeschikbaarheid.xlsx --team "Team 1" --weeks 4 \
+        --profile standard --threads 8 --output rooster.csv --hint auto --repair-hint
+
+Writes the roster (CSV, or Parquet when the output ends in .parquet) and a JSON file
+with statistics and timings next to it (or to --stats).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from functools import partial
+
+from . import preprocess_data, auto_rooster, validate_auto_rooster
+from .cache import cache_key, get_cached_hint, put_cached_hint
+from .decompose import SPLIT_MODES, solve_decomposed
+from .hints import HINT_SOURCES, build_hint, solution_hint
+from .loaders import load_workbooks
+from .objective import WEIGHT_PROFILES
+from .params import PROFILES, resolve_profile
+from .profiling import format_build_report
+from .workers import WorkerSheetError
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app", description="Maak een rooster zonder de webinterface.")
+    parser.add_argument("workers_file", help="werkboek met werknemers, rooster template en vaste roosters")
+    parser.add_argument("onb_file", help="werkboek met onbeschikbaarheid en vorig rooster")
+    parser.add_argument("--team", default=None, help="alleen deze afdeling ('Team medewerker') inroosteren")
+    parser.add_argument("--split", choices=SPLIT_MODES, default="none",
+                        help="zonder --team: none (één model), components (onafhankelijke delen parallel, zelfde model) "
+                             "of teams (ook medewerkers alleen op diensten van hun eigen team)")
+    parser.add_argument("--weeks", type=int, default=4, help="lengte van de planningshorizon in weken")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="standard",
+                        help="solverprofiel: draft (snel), standard of quality (zie app/params.py)")
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="tijdslimiet van de solver in seconden (standaard die van het profiel)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="aantal parallelle solver workers (standaard naar de beschikbare CPU's)")
+    parser.add_argument("--stop-gap", type=float, default=None,
+                        help="stop zodra de bezetting op haar ondergrens zit en het gat op de overige doelen "
+                             "hooguit deze fractie is (standaard die van het profiel)")
+    parser.add_argument("--stop-no-improvement", type=float, default=None,
+                        help="stop na zoveel seconden zonder betere oplossing, 0 schakelt dit uit (standaard die van het profiel)")
+    parser.add_argument("--stop-objective", type=float, default=None, help="stop zodra de doelfunctie hooguit deze waarde heeft")
+    parser.add_argument("--output", default="rooster.csv", help="uitvoerbestand (.csv of .parquet)")
+    parser.add_argument("--stats", default=None, help="JSON met statistieken en tijden (standaard <output>.json)")
+    parser.add_argument("--hint", choices=HINT_SOURCES, default="auto",
+                        help="startoplossing: vorig rooster (previous), laatste oplossing voor dezelfde invoer (last), "
+                             "last indien beschikbaar anders previous (auto) of geen (none)")
+    parser.add_argument("--repair-hint", action="store_true", help="startoplossing eerst toelaatbaar maken")
+    parser.add_argument("--weights", choices=sorted(WEIGHT_PROFILES), default="default",
+                        help="gewichtenprofiel van de doelfunctie (zie app/objective.py)")
+    parser.add_argument("--staged", action="store_true",
+                        help="eerst alleen de bezetting optimaliseren, daarna de overige doelen")
+    parser.add_argument("--phase1-share", type=float, default=0.2,
+                        help="deel van de tijdslimiet voor de eerste fase (met --staged)")
+    parser.add_argument("--quiet", action="store_true", help="geen tussentijdse oplossingen tonen")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    timings = {}
+
+    # --- 1. Parse workbooks ---
+    t0 = time.perf_counter()
+    frames = load_workbooks(args.workers_file, args.onb_file)
+    workers_df = frames["workers"]
+    rooster_template_df = frames["rooster_template"]
+    vast_rooster_df = frames["vast_rooster"]
+    onb_df = frames["onb"]
+    prev_df = frames["prev_assignments"]
+    if args.team:
+        onb_df = onb_df[onb_df['Team medewerker'] == args.team]
+        prev_df = prev_df[prev_df['Team medewerker'] == args.team]
+    timings["parse_s"] = round(time.perf_counter() - t0, 3)
+    timings["parse"] = frames["timings"]
+
+    # --- 2. Preprocess & solve ---
+    t0 = time.perf_counter()
+    try:
+        data = preprocess_data(df_werknemers=workers_df, df_rooster_template=rooster_template_df, df_onb=onb_df,
+                               prev_assignments=prev_df, df_vastrooster=vast_rooster_df, num_weeks=args.weeks)
+    except WorkerSheetError as e:
+        print(e, file=sys.stderr)
+        return 1
+    timings["preprocess_s"] = round(time.perf_counter() - t0, 3)
+
+    # the last solution for the same inputs is kept in the preprocessing cache directory
+    with open(args.workers_file, "rb") as wf, open(args.onb_file, "rb") as of:
+        key = cache_key(wf.read(), of.read(), num_weeks=args.weeks, team=args.team)
+    hint, hint_info = build_hint(data, args.hint, last_solution=get_cached_hint(key), repair=args.repair_hint)
+
+    settings = resolve_profile(args.profile, time_limit_s=args.time_limit, num_workers=args.threads,
+                               soft_gap=args.stop_gap, no_improvement_s=args.stop_no_improvement,
+                               objective_target=args.stop_objective)
+    print(f"Profiel {args.profile}: {settings['time_limit_s']} s, {settings['num_workers']} workers")
+
+    t0 = time.perf_counter()
+    kwargs = {"on_incumbent": None} if args.quiet else {}
+    # --split solves independent groups of shifts/employees in parallel, only without a team filter
+    if args.team or args.split == "none":
+        solve = auto_rooster
+    else:
+        solve = partial(solve_decomposed, split_teams=args.split == "teams")
+    result = solve(data, hint=hint, weights=args.weights, staged=args.staged, phase1_share=args.phase1_share,
+                   **settings, **kwargs)
+    timings["auto_rooster_s"] = round(time.perf_counter() - t0, 3)
+    if result is None:
+        print("Geen oplossing gevonden", file=sys.stderr)
+        return 1
+    put_cached_hint(key, solution_hint(result))
+    timings["first_solution_s"] = result["incumbents"][0]["elapsed_s"] if result["incumbents"] else None
+    timings["build_s"] = result["build_profile"]["total"]["time_s"]
+    timings["solve_s"] = round(result["solve_time_s"], 3)
+
+    # --- 3. Validate ---
+    t0 = time.perf_counter()
+    errors = validate_auto_rooster(data, result)
+    timings["validate_s"] = round(time.perf_counter() - t0, 3)
+
+    # --- 4. Write roster and stats ---
+    assignments_df = result["assignments_df"]
+    if args.output.lower().endswith(".parquet"):
+        assignments_df.to_parquet(args.output, index=False)  # needs pyarrow or fastparquet
+    else:
+        assignments_df.to_csv(args.output, index=False)
+
+    shifts_filled = int(assignments_df["shift_filled"].sum())
+    stats = {
+        "workers_file": os.path.abspath(args.workers_file),
+        "onb_file": os.path.abspath(args.onb_file),
+        "team": args.team,
+        "split": args.split,
+        "weeks": args.weeks,
+        "profile": args.profile,
+        "time_limit_s": settings["time_limit_s"],
+        "threads": result["num_workers"],
+        "solver_params": settings["solver_params"],
+        "weights": args.weights,
+        "start_date": assignments_df["shift_date"].min().date().isoformat(),
+        "end_date": assignments_df["shift_date"].max().date().isoformat(),
+        "total_shifts": len(data["shifts"]),
+        "num_employees": int(assignments_df["employee_id"].nunique()),
+        "shifts_filled": shifts_filled,
+        "shifts_unfilled": len(data["shifts"]) - shifts_filled,
+        "solver_status": result["solver_status"],
+        "stop_reason": result["stop_reason"],
+        "stop": settings["stop"],
+        "objective_value": result["objective_value"],
+        "best_bound": result["best_bound"],
+        "phases": result["phases"],
+        "hint": dict(hint_info, hinted_shifts=result["hinted_shifts"]),
+        "vast_rooster_unmatched": data["vast_rooster_unmatched"],
+        "worker_report": data["worker_report"],
+        "validation_errors": errors or [],
+        "timings": timings,
+        "incumbents": result["incumbents"],
+        "build_profile": result["build_profile"],
+    }
+    stats_path = args.stats or os.path.splitext(args.output)[0] + ".json"
+    with open(stats_path, "w") as f:
+        json.dump(stats, f, indent=2, default=str)
+
+    print(format_build_report(result["build_profile"]))
+    print(f"Rooster geschreven naar {args.output}, statistieken naar {stats_path}")
+    print(f"Tijden: {timings}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zipfile
+
+from .instance import ProblemInstance
+from .preprocessing import next_monday
+
+# Content-addressed cache of preprocessed problems, keyed by the uploaded bytes and the
+# preprocessing parameters. Entries are ProblemInstance .npz files (app/instance.py), so
+# reading one never unpickles anything; the least recently used entries are evicted once the
+# directory exceeds CACHE_MAX_BYTES.
+# Next to an entry the last solution for the same key can be kept as a JSON warm start hint.
+CACHE_DIR = os.environ.get("ROOSTER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "rooster_cache"))
+CACHE_MAX_BYTES = int(os.environ.get("ROOSTER_CACHE_MAX_MB", 256)) * 2**20
+CACHE_VERSION = 8  # bump when the preprocessed data layout changes
+
+ENTRY_SUFFIX = ".npz"
+
+_lock = threading.Lock()
+_counters = {"hits": 0, "misses": 0}  # per process
+
+
+def cache_key(workers_content, onb_content, num_weeks=4, team=None):
+    """
+    SHA-256 over both workbooks and the preprocessing parameters. The planning start date
+    follows from the previous roster in onb_content; without one preprocess_data plans from
+    next Monday, and get_cached drops such an entry once next Monday has moved on.
+    """
+    h = hashlib.sha256()
+    h.update(hashlib.sha256(workers_content).digest())
+    h.update(hashlib.sha256(onb_content).digest())
+    params = {
+        "version": CACHE_VERSION,
+        "num_weeks": num_weeks,
+        "team": team or None,
+    }
+    h.update(json.dumps(params, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, f"{key}{ENTRY_SUFFIX}")
+
+
+def get_cached(key, today=None):
+    """
+    Returns the cached preprocessed data for key, or None (counted as a miss). An entry planned
+    from next Monday (no previous roster) is only valid while that is still the start date.
+    """
+    path = _entry_path(key)
+    try:
+        data = ProblemInstance.load(path).to_data()
+        if data["default_start_date"] not in (None, next_monday(today).date().isoformat()):
+            raise ValueError("planned from an earlier Monday")
+        os.utime(path)  # mark as recently used
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        with _lock:
+            _counters["misses"] += 1
+        return None
+    with _lock:
+        _counters["hits"] += 1
+    return data
+
+
+def put_cached(key, data):
+    """Stores data under key and evicts least recently used entries above CACHE_MAX_BYTES."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{_entry_path(key)}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        ProblemInstance.from_data(data).save(f)
+    os.replace(tmp_path, _entry_path(key))
+    _evict()
+
+
+def _hint_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.hint.json")
+
+
+def get_cached_hint(key):
+    """The last solution ({shift_id: emp}) stored for key, or None."""
+    try:
+        with open(_hint_path(key)) as f:
+            return {int(s): emp for s, emp in json.load(f).items()}
+    except (OSError, ValueError):
+        return None
+
+
+def put_cached_hint(key, hint):
+    """Stores the solution of a run on these inputs as warm start for the next run (see app/hints.py)."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{_hint_path(key)}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(hint, f)
+    os.replace(tmp_path, _hint_path(key))
+
+
+def _entries():
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(ENTRY_SUFFIX):
+            continue
+        try:
+            st = os.stat(os.path.join(CACHE_DIR, name))
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, name))
+    return entries
+
+
+def _evict():
+    entries = sorted(_entries())
+    total = sum(size for _, size, _ in entries)
+    # keep at least the newest entry, even if it alone exceeds the limit
+    while total > CACHE_MAX_BYTES and len(entries) > 1:
+        _, size, name = entries.pop(0)
+        for path in (os.path.join(CACHE_DIR, name), _hint_path(name[:-len(ENTRY_SUFFIX)])):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= size
+
+
+def cache_stats():
+    """Hit/miss counters of this process plus the size of the shared cache directory."""
+    entries = _entries() if os.path.isdir(CACHE_DIR) else []
+    with _lock:
+        counters = dict(_counters)
+    lookups = counters["hits"] + counters["misses"]
+    return {
+        **counters,
+        "hit_rate": counters["hits"] / lookups if lookups else None,
+        "entries": len(entries),
+        "size_bytes": sum(size for _, size, _ in entries),
+        "max_bytes": CACHE_MAX_BYTES,
+        "pid": os.getpid(),
+    }
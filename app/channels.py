@@ -0,0 +1,76 @@
+from ortools.sat.python import cp_model
+
+
+class ChannelRegistry:
+    """
+    Memoized registry of derived day-level indicator variables for auto_rooster.
+    Every indicator (works on date, works a night on date, works the weekend of a week,
+    start/end of a work block) is created and channelled to the assignment variables
+    exactly once, and shared by all constraint and objective sections that need it.
+    """
+
+    def __init__(self, model: cp_model.CpModel, xs, shifts_by_date, night_shifts_by_date, weekend_shifts_by_week):
+        # xs(shift_ids, emp) -> list of assignment variables (ineligible pairs are left out)
+        self.model = model
+        self.xs = xs
+        self.shifts_by_date = shifts_by_date
+        self.night_shifts_by_date = night_shifts_by_date
+        self.weekend_shifts_by_week = weekend_shifts_by_week
+        self._channels = {}
+
+    def _any_of(self, key, name, lits):
+        # b <=> at least one of lits is worked
+        if key in self._channels:
+            return self._channels[key]
+        b = self.model.NewBoolVar(name)
+        if lits:
+            self.model.Add(sum(lits) >= 1).OnlyEnforceIf(b)
+            self.model.Add(sum(lits) == 0).OnlyEnforceIf(b.Not())
+        else:
+            self.model.Add(b == 0)
+        self._channels[key] = b
+        return b
+
+    def works_on(self, emp, d):
+        """1 iff emp works any shift on date d (date object)."""
+        return self._any_of(('work', emp, d), f"workDay_e{emp}_d{d.isoformat()}",
+                            self.xs(self.shifts_by_date.get(d, []), emp))
+
+    def works_night_on(self, emp, d):
+        """1 iff emp works a night shift on date d (date object)."""
+        return self._any_of(('night', emp, d), f"nightDay_e{emp}_d{d.isoformat()}",
+                            self.xs(self.night_shifts_by_date.get(d, []), emp))
+
+    def works_weekend(self, emp, w):
+        """1 iff emp works any Saturday/Sunday shift in week w."""
+        return self._any_of(('weekend', emp, w), f"weekendWorked_e{emp}_w{w}",
+                            self.xs(self.weekend_shifts_by_week.get(w, []), emp))
+
+    def block_start(self, emp, d_prev, d):
+        """1 iff emp works on d but not on d_prev (a work block starts on d)."""
+        key = ('block_start', emp, d)
+        if key not in self._channels:
+            b = self.model.NewBoolVar(f"block_start_{emp}_{d.isoformat()}")
+            work_today, work_prev = self.works_on(emp, d), self.works_on(emp, d_prev)
+            self.model.AddBoolAnd([work_today, work_prev.Not()]).OnlyEnforceIf(b)
+            self.model.AddBoolOr([work_today.Not(), work_prev]).OnlyEnforceIf(b.Not())
+            self._channels[key] = b
+        return self._channels[key]
+
+    def block_end(self, emp, d, d_next):
+        """1 iff emp works on d but not on d_next (a work block ends on d)."""
+        key = ('block_end', emp, d)
+        if key not in self._channels:
+            b = self.model.NewBoolVar(f"end_block_{emp}_{d.isoformat()}")
+            work_today, work_next = self.works_on(emp, d), self.works_on(emp, d_next)
+            self.model.AddBoolAnd([work_today, work_next.Not()]).OnlyEnforceIf(b)
+            self.model.AddBoolOr([work_today.Not(), work_next]).OnlyEnforceIf(b.Not())
+            self._channels[key] = b
+        return self._channels[key]
+
+    def counts(self):
+        """Number of indicators created per kind."""
+        counts = {}
+        for key in self._channels:
+            counts[key[0]] = counts.get(key[0], 0) + 1
+        return counts
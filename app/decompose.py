@@ -0,0 +1,285 @@
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .params import MIN_WORKERS, available_cpus, solver_workers
+from .preprocessing import normalized_dates
+from .progress import print_incumbent
+from .solver import auto_rooster, build_shift_maps, compute_eligible_pairs
+
+# how the web job and the CLI split a solve without a team filter: not at all (one model),
+# into the eligibility components (the same model) or per team group (an extra constraint)
+SPLIT_MODES = ("none", "components", "teams")
+
+
+def eligible_pairs(data):
+    """
+    The (shift_id, emp) pairs auto_rooster creates variables for: the precomputed set of a
+    ProblemInstance (data['eligible_pairs']) or else computed from the preprocessed data.
+    """
+    if data.get('eligible_pairs') is not None:
+        return data['eligible_pairs']
+    shifts = normalized_dates(data['shifts'])
+    prev_assignments = data['prev_assignments']
+    if prev_assignments is None:
+        prev_assignments = pd.DataFrame(columns=['shift_id', 'shift_date', 'employee_id', 'is_night', 'absolute_day', 'week'])
+    prev_assignments = normalized_dates(prev_assignments)
+
+    dates_list, shifts_by_date, _, shift_type_map = build_shift_maps(shifts)
+    return compute_eligible_pairs(shifts, data['emp_table'], data['emp_index'], data['blocked_pairs'],
+                                  data['unavailable_dates'], data['emp_ids'], prev_assignments,
+                                  shifts_by_date, data['night_shifts'], shift_type_map, dates_list)
+
+
+def team_groups(data):
+    """
+    Team group per shift and per employee as ({shift_id: group}, {emp: group}), from the
+    employee -> team map of the onb sheet (emp_team) and the previous roster: a shift name
+    belongs to the teams whose employees worked it there, an employee missing from emp_team
+    gets the team they worked for there. Cross-team rule: teams that worked the same shift
+    name form one group, and shifts whose name nobody worked and employees without a team
+    (or of a team that worked none of the shift names) join the group with the most shifts.
+    Without team information every group is None. Teams that share one rooster template
+    all end up in one group.
+    """
+    emp_team = data.get('emp_team', {})
+    prev = data['prev_assignments']
+    name_teams = {}
+    if prev is not None and 'Team medewerker' in prev.columns:
+        worked = prev.dropna(subset=['Team medewerker'])
+        name_teams = worked.groupby('shift_name')['Team medewerker'].agg(lambda t: sorted(set(t))).to_dict()
+        emp_team = {**worked.groupby('employee_id')['Team medewerker'].first().to_dict(), **emp_team}
+
+    parent = {}
+
+    def find(team):
+        parent.setdefault(team, team)
+        while parent[team] != team:
+            parent[team] = parent[parent[team]]
+            team = parent[team]
+        return team
+
+    for teams in name_teams.values():
+        find(teams[0])
+        for team in teams[1:]:
+            a, b = find(teams[0]), find(team)
+            if a != b:
+                parent[a] = b
+
+    shift_group = {int(s): find(name_teams[name][0]) if name in name_teams else None
+                   for s, name in zip(data['shifts']['shift_id'], data['shifts']['shift_name'])}
+    sizes = Counter(g for g in shift_group.values() if g is not None)
+    default = sizes.most_common(1)[0][0] if sizes else None
+    shift_group = {s: default if g is None else g for s, g in shift_group.items()}
+    emp_group = {emp: find(emp_team[emp]) if emp_team.get(emp) in parent else default for emp in data['emp_ids']}
+    return shift_group, emp_group
+
+
+def eligibility_components(data, split_teams=False):
+    """
+    Connected components of the bipartite shift/employee eligibility graph, largest first,
+    as a list of dicts with shift_ids, emp_ids and pairs (number of eligible pairs).
+    Every constraint and objective term of auto_rooster is per shift or per employee, so the
+    components are independent models and together exactly the full one. Shifts and
+    employees without any eligible pair are added to the largest component.
+    split_teams additionally drops every pair of an employee and a shift of another team
+    group (see team_groups): an extra constraint, so the components no longer add up to
+    the full model.
+    """
+    shifts = data['shifts']
+    eligible = eligible_pairs(data)
+    if split_teams:
+        shift_group, emp_group = team_groups(data)
+        eligible = [(s, emp) for s, emp in eligible if shift_group[s] == emp_group[emp]]
+
+    # union-find over ('s', shift_id) and ('e', emp) nodes
+    parent = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for s, emp in eligible:
+        a, b = find(('s', s)), find(('e', emp))
+        if a != b:
+            parent[a] = b
+
+    groups = {}
+    for s, emp in eligible:
+        groups.setdefault(find(('e', emp)), {'shift_ids': set(), 'emp_ids': set(), 'pairs': 0})
+        comp = groups[find(('e', emp))]
+        comp['shift_ids'].add(s)
+        comp['emp_ids'].add(emp)
+        comp['pairs'] += 1
+
+    components = sorted(groups.values(), key=lambda c: c['pairs'], reverse=True)
+    if not components:
+        components = [{'shift_ids': set(), 'emp_ids': set(), 'pairs': 0}]
+    largest = components[0]
+    largest['shift_ids'].update(set(shifts['shift_id']) - set().union(*(c['shift_ids'] for c in components)))
+    largest['emp_ids'].update(set(data['emp_ids']) - set().union(*(c['emp_ids'] for c in components)))
+
+    order = {emp: i for i, emp in enumerate(data['emp_ids'])}
+    for comp in components:
+        comp['shift_ids'] = sorted(comp['shift_ids'])
+        comp['emp_ids'] = sorted(comp['emp_ids'], key=order.get)
+    return components
+
+
+def subset_data(data, shift_ids, emp_ids):
+    """Preprocessed data restricted to the given shifts and employees (IDs are kept)."""
+    shift_set, emp_set = set(shift_ids), set(emp_ids)
+    rows = [data['emp_index'][emp] for emp in emp_ids]
+    emp_table = {col: values[rows] if isinstance(values, np.ndarray) else [values[i] for i in rows]
+                 for col, values in data['emp_table'].items()}
+
+    def keep(ids):
+        return [s for s in ids if s in shift_set]
+
+    return {
+        **data,
+        "shifts": data['shifts'][data['shifts']['shift_id'].isin(shift_set)].reset_index(drop=True),
+        "workers": data['workers'].iloc[rows].reset_index(drop=True),
+        "emp_table": emp_table,
+        "emp_ids": list(emp_ids),
+        "emp_index": {emp: i for i, emp in enumerate(emp_ids)},
+        "emp_team": {emp: team for emp, team in data.get('emp_team', {}).items() if emp in emp_set},
+        "onb": data['onb'][data['onb']['Medewerker id'].isin(emp_set)],
+        "blocked_pairs": {(s, emp) for s, emp in data['blocked_pairs'] if s in shift_set and emp in emp_set},
+        "preferred_pairs": {(s, emp) for s, emp in data['preferred_pairs'] if s in shift_set and emp in emp_set},
+        "eligible_pairs": None if data.get('eligible_pairs') is None else
+                          {(s, emp) for s, emp in data['eligible_pairs'] if s in shift_set and emp in emp_set},
+        "unavailable_dates": {emp: dates for emp, dates in data['unavailable_dates'].items() if emp in emp_set},
+        "shifts_by_week": {w: keep(ids) for w, ids in data['shifts_by_week'].items()},
+        "shifts_by_day": {d: keep(ids) for d, ids in data['shifts_by_day'].items()},
+        "night_shifts": keep(data['night_shifts']),
+        "night_shifts_by_week": {w: keep(ids) for w, ids in data['night_shifts_by_week'].items()},
+        # prev_assignments is only ever read per employee, keep it whole
+    }
+
+
+class _ComponentIncumbent:
+    """Picklable on_incumbent wrapper that tags events with their component."""
+
+    def __init__(self, on_incumbent, component):
+        self.on_incumbent = on_incumbent
+        self.component = component
+
+    def __call__(self, event):
+        self.on_incumbent({**event, "component": self.component})
+
+
+def _solve_component(sub_data, time_limit_s, on_incumbent, num_workers, hint, options):
+    return auto_rooster(sub_data, time_limit_s=time_limit_s, on_incumbent=on_incumbent, num_workers=num_workers,
+                        hint=hint, **options)
+
+
+def _merge_results(data, components, results):
+    prev_assignments = data['prev_assignments']
+    if prev_assignments is None:
+        prev_assignments = pd.DataFrame(columns=['shift_id', 'shift_date', 'employee_id', 'is_night', 'absolute_day', 'week'])
+    prev_assignments = normalized_dates(prev_assignments)
+
+    assignments_df = pd.concat([r['assignments_df'] for r in results], ignore_index=True)
+    assignments_df = assignments_df.sort_values('shift_id', kind='stable').reset_index(drop=True)
+
+    sections = {}
+    for r in results:
+        for row in r['build_profile']['sections']:
+            acc = sections.setdefault(row['section'], {'section': row['section'], 'time_s': 0.0, 'variables': 0,
+                                                       'constraints': 0, 'memory_mb': 0.0})
+            for k in ('time_s', 'variables', 'constraints', 'memory_mb'):
+                acc[k] += row[k] or 0
+    total = {'section': 'total'}
+    for k in ('time_s', 'variables', 'constraints', 'memory_mb'):
+        total[k] = sum(r['build_profile']['total'][k] or 0 for r in results)
+
+    statuses = {r['solver_status'] for r in results}
+    return {
+        "assignments_df": assignments_df,
+        "all_assignments_df": pd.concat([prev_assignments, assignments_df], ignore_index=True),
+        "uncovered_shifts": sorted(s for r in results for s in r['uncovered_shifts']),
+        "objective_value": sum(r['objective_value'] for r in results),
+        "best_bound": sum(r['best_bound'] for r in results),
+        "solver_status": "OPTIMAL" if statuses == {"OPTIMAL"} else "FEASIBLE",
+        "solve_time_s": max(r['solve_time_s'] for r in results),
+        "incumbents": sorted((dict(e, component=i) for i, r in enumerate(results) for e in r['incumbents']),
+                             key=lambda e: e['elapsed_s']),
+        "build_profile": {"sections": list(sections.values()), "total": total},
+        "hinted_shifts": sum(r['hinted_shifts'] for r in results),
+        "objective_breakdown": {
+            term: {"raw": sum(r['objective_breakdown'][term]['raw'] for r in results),
+                   "weight": row['weight'],
+                   "value": sum(r['objective_breakdown'][term]['value'] for r in results)}
+            for term, row in results[0]['objective_breakdown'].items()
+        },
+        "presolve_s": max(r['presolve_s'] or 0 for r in results),
+        "num_workers": sum(r['num_workers'] for r in results),
+        # the components run in parallel, so the one that ran longest decided when the solve ended
+        "stop_reason": max(results, key=lambda r: r['solve_time_s'])['stop_reason'],
+        "phases": [dict(phase, component=i) for i, r in enumerate(results) for phase in r['phases']],
+        "components": [
+            {
+                "shifts": len(comp['shift_ids']),
+                "employees": len(comp['emp_ids']),
+                "teams": sorted({str(data['emp_team'][emp]) for emp in comp['emp_ids'] if emp in data.get('emp_team', {})}),
+                "time_limit_s": comp['time_limit_s'],
+                "num_workers": comp['num_workers'],
+                "solver_status": r['solver_status'],
+                "stop_reason": r['stop_reason'],
+                "objective_value": r['objective_value'],
+            }
+            for comp, r in zip(components, results)
+        ],
+    }
+
+
+def solve_decomposed(data, time_limit_s=60, on_incumbent=print_incumbent, num_workers=None, max_processes=None, hint=None,
+                     split_teams=False, **options):
+    """
+    Solves every connected component of the eligibility graph (see eligibility_components)
+    as its own CP-SAT model in a process pool and merges the results into one auto_rooster
+    result dict (plus 'components'). The processes split the search workers evenly, so at
+    most num_workers run at once; when there are more components than processes each
+    component gets a share of the time budget proportional to its number of eligible pairs.
+    With a single component this is plain auto_rooster. split_teams (opt-in) keeps every
+    employee on the shifts of their own team group, see team_groups.
+    hint ({shift_id: emp}, see app/hints.py) is split over the components, other options
+    (weights, staged, phase1_share, solver_params, stop) are passed on to auto_rooster.
+    """
+    components = eligibility_components(data, split_teams=split_teams)
+    if len(components) == 1:
+        return auto_rooster(data, time_limit_s=time_limit_s, on_incumbent=on_incumbent, num_workers=num_workers, hint=hint,
+                            **options)
+
+    num_workers = num_workers or solver_workers()
+    # the processes run at the same time and share num_workers, at least MIN_WORKERS each
+    processes = max(1, min(len(components), max_processes or available_cpus(), num_workers // MIN_WORKERS))
+    total_pairs = sum(max(1, c['pairs']) for c in components)
+    for comp in components:
+        share = max(1, comp['pairs']) / total_pairs
+        comp['num_workers'] = num_workers // processes
+        comp['time_limit_s'] = time_limit_s if len(components) <= processes else min(time_limit_s, time_limit_s * processes * share)
+    print(f"Solving {len(components)} independent components in {processes} processes: "
+          f"{[(len(c['shift_ids']), len(c['emp_ids'])) for c in components]} (shifts, employees)")
+
+    # spawn instead of fork: the parent may be a threaded web worker
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [
+            pool.submit(_solve_component, subset_data(data, comp['shift_ids'], comp['emp_ids']), comp['time_limit_s'],
+                        _ComponentIncumbent(on_incumbent, i) if on_incumbent is not None else None, comp['num_workers'],
+                        {s: hint[s] for s in comp['shift_ids'] if s in hint} if hint else None, options)
+            for i, comp in enumerate(components)
+        ]
+        results = [f.result() for f in futures]
+
+    if any(r is None for r in results):
+        print("No solution found for at least one component")
+        return None
+    return _merge_results(data, components, results)
@@ -0,0 +1,137 @@
+import datetime as dt
+import math
+
+import pandas as pd
+
+from .decompose import eligible_pairs
+
+# Warm starts for auto_rooster. A hint is a dict {shift_id: emp}; shifts without an entry
+# are hinted as uncovered. Hints only guide the search, the model itself is unchanged.
+HINT_SOURCES = ("none", "previous", "last", "auto")
+GOOD_SOLUTION_GAP = 0.01  # "good" = within 1% of a reference objective, see time_to_good
+
+
+def project_previous_period(data):
+    """
+    Projects the previous roster ('Aanlevering diensten') onto the new horizon by whole weeks:
+    the previous period is repeated from its first Monday, and every new shift gets the employee
+    that worked the shift with the same name on the same weekday of the matching week.
+    """
+    prev = data['prev_assignments']
+    if prev is None or prev.empty:
+        return {}
+    prev = prev[prev['employee_id'].notna()]
+    if prev.empty:
+        return {}
+    prev_dates = pd.to_datetime(prev['shift_date']).dt.normalize()
+    first_monday = prev_dates.min() - pd.Timedelta(days=prev_dates.min().weekday())
+    period_days = 7 * math.ceil(((prev_dates.max() - first_monday).days + 1) / 7)
+
+    prev_by_key = {}
+    for date, name, emp in zip(prev_dates, prev['shift_name'], prev['employee_id']):
+        prev_by_key.setdefault((date, name), []).append(str(emp))
+
+    shifts = data['shifts'].sort_values('shift_id')
+    shift_dates = pd.to_datetime(shifts['shift_date']).dt.normalize()
+    new_by_key = {}
+    for s, date, name in zip(shifts['shift_id'], shift_dates, shifts['shift_name']):
+        src = first_monday + pd.Timedelta(days=(date - first_monday).days % period_days)
+        new_by_key.setdefault((src, name), []).append(int(s))
+
+    # several shifts with the same name on one day are matched in order
+    hint = {}
+    for key, shift_ids in new_by_key.items():
+        for s, emp in zip(shift_ids, prev_by_key.get(key, [])):
+            hint[s] = emp
+    return hint
+
+
+def solution_hint(result):
+    """The {shift_id: emp} assignment of an auto_rooster result, to reuse as a later hint."""
+    df = result['assignments_df']
+    df = df[df['shift_filled']]
+    return {int(s): str(emp) for s, emp in zip(df['shift_id'], df['employee_id'])}
+
+
+def repair_hint(data, hint):
+    """
+    Greedily drops hinted assignments (in date order) that break a simple hard rule:
+    eligibility (qualification, unavailability, ...), one shift per day, no day/evening
+    shift after a night, max days per week and contract hours. The remaining rules are
+    left to the solver.
+    """
+    eligible = eligible_pairs(data)
+    shifts = data['shifts'].set_index('shift_id')
+    emp_table, emp_index = data['emp_table'], data['emp_index']
+    num_weeks = len(data['weeks'])
+
+    # nights worked on the last day of the previous roster
+    night_dates = set()
+    prev = data['prev_assignments']
+    if prev is not None and not prev.empty:
+        prev = prev[prev['employee_id'].notna() & prev['is_night'].astype(bool)]
+        night_dates = {(str(emp), pd.Timestamp(d).date()) for emp, d in zip(prev['employee_id'], prev['shift_date'])}
+
+    worked_dates = set()
+    days_per_week = {}
+    minutes = {}
+    repaired = {}
+    order = sorted(hint, key=lambda s: (pd.Timestamp(shifts.at[s, 'shift_date']), s))
+    for s in order:
+        emp = hint[s]
+        if (s, emp) not in eligible:
+            continue
+        row = shifts.loc[s]
+        d = pd.Timestamp(row['shift_date']).date()
+        w = int(row['week'])
+        i = emp_index[emp]
+        if (emp, d) in worked_dates:
+            continue
+        if not row['is_night'] and (emp, d - dt.timedelta(days=1)) in night_dates:
+            continue
+        if days_per_week.get((emp, w), 0) >= int(emp_table['max_days_per_week'][i]):
+            continue
+        if minutes.get(emp, 0) + data['dur_min'][s] > int(emp_table['contract_minutes'][i]) * num_weeks:
+            continue
+        repaired[s] = emp
+        worked_dates.add((emp, d))
+        if row['is_night']:
+            night_dates.add((emp, d))
+        days_per_week[(emp, w)] = days_per_week.get((emp, w), 0) + 1
+        minutes[emp] = minutes.get(emp, 0) + data['dur_min'][s]
+    return repaired
+
+
+def build_hint(data, source="auto", last_solution=None, repair=False):
+    """
+    Returns (hint, info) for auto_rooster. source is 'none', 'previous' (project_previous_period),
+    'last' (last_solution, a solution_hint of an earlier run on the same inputs) or 'auto'
+    (last when available, otherwise previous). info describes the hint for reports.
+    """
+    if source not in HINT_SOURCES:
+        raise ValueError(f"Unknown hint source {source!r}, expected one of {HINT_SOURCES}")
+    if source == "auto":
+        source = "last" if last_solution else "previous"
+    if source == "last":
+        hint = dict(last_solution or {})
+    elif source == "previous":
+        hint = project_previous_period(data)
+    else:
+        hint = {}
+
+    info = {"source": source, "shifts": len(hint), "repaired": repair, "dropped": 0}
+    if hint and repair:
+        repaired = repair_hint(data, hint)
+        info["dropped"] = len(hint) - len(repaired)
+        hint = repaired
+    print(f"Hint ({source}): {len(hint)} of {len(data['shifts'])} shifts, {info['dropped']} dropped by repair")
+    return hint or None, info
+
+
+def time_to_good(incumbents, reference):
+    """Seconds until an incumbent came within GOOD_SOLUTION_GAP of reference (None if never)."""
+    threshold = reference + GOOD_SOLUTION_GAP * max(1.0, abs(reference))
+    for event in incumbents:
+        if event['objective'] <= threshold:
+            return event['elapsed_s']
+    return None
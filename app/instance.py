@@ -0,0 +1,286 @@
+import datetime as dt
+import json
+
+import numpy as np
+import pandas as pd
+
+from .decompose import eligible_pairs
+from .preprocessing import build_employee_table
+
+# Serializable form of the preprocess_data result. Every frame column and helper map is stored
+# as plain NumPy arrays: strings as int32 codes into a unicode table, lists and tuples as a flat
+# array plus offsets, dates and clock times as integers. An instance is saved to .npz and loaded
+# with allow_pickle=False, so loading a file never runs code from it. Derived structures
+# (emp_index, emp_table) are rebuilt on load instead of stored. The eligible (shift, employee)
+# pairs of the model build are stored as well (shift IDs plus positions in emp_ids), so a
+# loaded instance goes to auto_rooster without the compute_eligible_pairs pre-pass.
+
+FRAMES = ("shifts", "workers", "onb", "prev_assignments")
+INT_LISTS = ("weeks", "night_shifts")
+INT_LIST_MAPS = ("shifts_by_week", "shifts_by_day", "night_shifts_by_week")
+PAIR_SETS = ("blocked_pairs", "preferred_pairs")
+JSON_KEYS = ("vast_rooster_unmatched", "worker_report", "default_start_date")
+
+# missing value of an object column, restored on load
+_SENTINELS = {"none": None, "nan": np.nan, "na": pd.NA, "nat": pd.NaT}
+
+
+def _missing(value):
+    if value is None:
+        return True
+    if isinstance(value, (list, tuple, set, frozenset, np.ndarray)):
+        return False
+    return bool(pd.isna(value))
+
+
+def _sentinel(values, mask):
+    """Name of the first missing value in values (None, NaN, pd.NA or NaT)."""
+    for value, missing in zip(values, mask):
+        if missing:
+            if value is None:
+                return "none"
+            if value is pd.NA:
+                return "na"
+            if value is pd.NaT:
+                return "nat"
+            return "nan"
+    return "none"
+
+
+def _strings(values):
+    """Strings → (int32 codes, unicode table); -1 for missing."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    table = np.array([str(u) for u in uniques], dtype=str) if len(uniques) else np.array([], dtype="<U1")
+    return codes.astype(np.int32), table
+
+
+def _unstrings(codes, table, missing=None):
+    values = np.array(table.tolist() + [missing], dtype=object)
+    return values[codes]  # code -1 picks the missing value
+
+
+def _ragged(lists):
+    """Sequences → (flat values, int64 offsets of len(lists) + 1)."""
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum([len(x) for x in lists], out=offsets[1:])
+    flat = [v for x in lists for v in x]
+    return flat, offsets
+
+
+def _unragged(flat, offsets, cast=list):
+    flat = flat.tolist()
+    return [cast(flat[a:b]) for a, b in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (dt.date, dt.time)):
+        return value.isoformat()
+    return str(value)
+
+
+def _kind(values):
+    """Encoding of an object column from the types of its non-missing values."""
+    types = {type(v) for v in values}
+    if not types:
+        return "missing"
+    if types <= {str}:
+        return "str"
+    if types <= {dt.date}:
+        return "date"
+    if types <= {dt.time}:
+        return "time"
+    if types <= {list, tuple}:
+        items = {type(v) for x in values for v in x}
+        if items <= {int, np.int64}:
+            return "tuple" if types == {tuple} else "list"
+        if items <= {str}:
+            return "str_list"
+    return "json"
+
+
+def _encode_column(name, series, arrays):
+    """Stores series under the array prefix name; returns its column spec."""
+    if isinstance(series.dtype, pd.StringDtype):
+        codes, table = _strings(series.to_numpy(dtype=object, na_value=None))
+        arrays[f"{name}.codes"], arrays[f"{name}.table"] = codes, table
+        return {"kind": "string"}
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+        # nullable integers/booleans: values plus a mask
+        arrays[f"{name}.mask"] = series.isna().to_numpy()
+        arrays[f"{name}.values"] = series.fillna(0).to_numpy(dtype=series.dtype.numpy_dtype)
+        return {"kind": "masked", "dtype": str(series.dtype)}
+    if series.dtype != object:
+        arrays[name] = series.to_numpy()
+        return {"kind": "array"}
+
+    raw = series.tolist()
+    mask = np.array([_missing(v) for v in raw], dtype=bool)
+    present = [v for v, m in zip(raw, mask) if not m]
+    spec = {"kind": _kind(present), "missing": _sentinel(raw, mask)}
+    arrays[f"{name}.mask"] = mask
+    if spec["kind"] == "str":
+        arrays[f"{name}.codes"], arrays[f"{name}.table"] = _strings([None if m else v for v, m in zip(raw, mask)])
+    elif spec["kind"] == "date":
+        arrays[name] = np.array([np.datetime64("NaT") if m else v for v, m in zip(raw, mask)], dtype="datetime64[D]")
+    elif spec["kind"] == "time":
+        arrays[name] = np.array([-1 if m else ((v.hour * 60 + v.minute) * 60 + v.second) * 10**6 + v.microsecond
+                                 for v, m in zip(raw, mask)], dtype=np.int64)
+    elif spec["kind"] in ("list", "tuple", "str_list"):
+        flat, arrays[f"{name}.offsets"] = _ragged([() if m else v for v, m in zip(raw, mask)])
+        if spec["kind"] == "str_list":
+            arrays[f"{name}.codes"], arrays[f"{name}.table"] = _strings(flat)
+        else:
+            arrays[f"{name}.flat"] = np.array(flat, dtype=np.int64)
+    elif spec["kind"] == "json":
+        arrays[name] = np.array(json.dumps([None if m else v for v, m in zip(raw, mask)], default=_json_default))
+    return spec
+
+
+def _decode_column(name, spec, arrays):
+    kind = spec["kind"]
+    if kind == "array":
+        return arrays[name]
+    if kind == "string":
+        return pd.array(_unstrings(arrays[f"{name}.codes"], arrays[f"{name}.table"]), dtype="string")
+    if kind == "masked":
+        return pd.array(np.where(arrays[f"{name}.mask"], None, arrays[f"{name}.values"].astype(object)),
+                        dtype=spec["dtype"])
+
+    mask = arrays[f"{name}.mask"]
+    missing = _SENTINELS[spec["missing"]]
+    if kind == "str":
+        return _unstrings(arrays[f"{name}.codes"], arrays[f"{name}.table"], missing)
+    if kind == "date":
+        values = arrays[name].astype(object)
+    elif kind == "time":
+        values = [None if m else dt.time(*divmod(v // 60_000_000, 60), (v // 10**6) % 60, v % 10**6)
+                  for v, m in zip(arrays[name].tolist(), mask)]
+    elif kind in ("list", "tuple"):
+        values = _unragged(arrays[f"{name}.flat"], arrays[f"{name}.offsets"], list if kind == "list" else tuple)
+    elif kind == "str_list":
+        flat = _unstrings(arrays[f"{name}.codes"], arrays[f"{name}.table"])
+        values = _unragged(flat, arrays[f"{name}.offsets"])
+    elif kind == "json":
+        values = json.loads(str(arrays[name]))
+    else:  # only missing values
+        values = [None] * len(mask)
+    out = np.fromiter(values, dtype=object, count=len(mask))  # never broadcasts nested lists
+    out[mask] = missing
+    return out
+
+
+def _encode_frame(name, frame, arrays):
+    columns = []
+    for i, column in enumerate(frame.columns):
+        columns.append([column, _encode_column(f"{name}.{i}", frame[column], arrays)])
+    spec = {"columns": columns, "rows": len(frame)}
+    if not frame.index.equals(pd.RangeIndex(len(frame))):
+        arrays[f"{name}.index"] = frame.index.to_numpy()
+    return spec
+
+
+def _decode_frame(name, spec, arrays):
+    index = arrays.get(f"{name}.index")
+    frame = pd.DataFrame({column: _decode_column(f"{name}.{i}", col_spec, arrays)
+                          for i, (column, col_spec) in enumerate(spec["columns"])},
+                         index=index if index is not None else pd.RangeIndex(spec["rows"]))
+    return frame
+
+
+class ProblemInstance:
+    """
+    preprocess_data result as named NumPy arrays (arrays) plus a JSON description of how to
+    rebuild the frames and maps (meta). Create with from_data or load, get the dict for
+    auto_rooster and validate_auto_rooster back with to_data; that dict also carries the
+    eligible pairs (eligible_pairs), which auto_rooster then uses instead of computing them.
+    """
+
+    def __init__(self, arrays, meta):
+        self.arrays = arrays
+        self.meta = meta
+
+    @classmethod
+    def from_data(cls, data):
+        arrays, meta = {}, {"frames": {}}
+        for name in FRAMES:
+            if data[name] is not None:
+                meta["frames"][name] = _encode_frame(name, data[name], arrays)
+
+        emp_codes, emp_table = _strings(data["emp_ids"])
+        arrays["emp_ids"] = emp_table[emp_codes]
+        emp_pos = {emp: i for i, emp in enumerate(data["emp_ids"])}
+        pairs = sorted((s, emp_pos[emp]) for s, emp in eligible_pairs(data))
+        arrays["eligible_pairs.shift_id"] = np.array([s for s, _ in pairs], dtype=np.int64)
+        arrays["eligible_pairs.emp"] = np.array([e for _, e in pairs], dtype=np.int32)
+        for name in INT_LISTS:
+            arrays[name] = np.array(data[name], dtype=np.int64)
+        for name in INT_LIST_MAPS:
+            keys = list(data[name])
+            arrays[f"{name}.keys"] = np.array(keys, dtype=np.int64)
+            flat, arrays[f"{name}.offsets"] = _ragged([data[name][k] for k in keys])
+            arrays[f"{name}.flat"] = np.array(flat, dtype=np.int64)
+        arrays["dur_min.keys"] = np.array(list(data["dur_min"]), dtype=np.int64)
+        arrays["dur_min.values"] = np.array(list(data["dur_min"].values()), dtype=np.int64)
+        for name in PAIR_SETS:
+            pairs = sorted(data[name])
+            arrays[f"{name}.shift_id"] = np.array([s for s, _ in pairs], dtype=np.int64)
+            arrays[f"{name}.emp.codes"], arrays[f"{name}.emp.table"] = _strings([e for _, e in pairs])
+        emps = list(data["unavailable_dates"])
+        dates, arrays["unavailable_dates.offsets"] = _ragged([sorted(data["unavailable_dates"][e]) for e in emps])
+        arrays["unavailable_dates.emp.codes"], arrays["unavailable_dates.emp.table"] = _strings(emps)
+        arrays["unavailable_dates.dates"] = np.array(dates, dtype="datetime64[D]")
+        arrays["emp_team.emp.codes"], arrays["emp_team.emp.table"] = _strings(list(data["emp_team"]))
+        arrays["emp_team.team.codes"], arrays["emp_team.team.table"] = _strings(list(data["emp_team"].values()))
+        for name in JSON_KEYS:
+            meta[name] = data.get(name, [])
+        return cls(arrays, meta)
+
+    def to_data(self):
+        """The preprocess_data dict; emp_index and emp_table are rebuilt from emp_ids and workers."""
+        arrays, meta = self.arrays, self.meta
+        data = {name: _decode_frame(name, meta["frames"][name], arrays) if name in meta["frames"] else None
+                for name in FRAMES}
+        emp_ids = arrays["emp_ids"].tolist()
+        data["emp_ids"] = emp_ids
+        data["emp_index"] = {emp: i for i, emp in enumerate(emp_ids)}
+        data["emp_table"] = build_employee_table(data["workers"])
+        data["eligible_pairs"] = set(zip(arrays["eligible_pairs.shift_id"].tolist(),
+                                         arrays["emp_ids"][arrays["eligible_pairs.emp"]].tolist()))
+        for name in INT_LISTS:
+            data[name] = arrays[name].tolist()
+        for name in INT_LIST_MAPS:
+            data[name] = dict(zip(arrays[f"{name}.keys"].tolist(),
+                                  _unragged(arrays[f"{name}.flat"], arrays[f"{name}.offsets"])))
+        data["dur_min"] = dict(zip(arrays["dur_min.keys"].tolist(), arrays["dur_min.values"].tolist()))
+        for name in PAIR_SETS:
+            emps = _unstrings(arrays[f"{name}.emp.codes"], arrays[f"{name}.emp.table"])
+            data[name] = set(zip(arrays[f"{name}.shift_id"].tolist(), emps.tolist()))
+        emps = _unstrings(arrays["unavailable_dates.emp.codes"], arrays["unavailable_dates.emp.table"]).tolist()
+        dates = _unragged(arrays["unavailable_dates.dates"].astype(object), arrays["unavailable_dates.offsets"], set)
+        data["unavailable_dates"] = dict(zip(emps, dates))
+        data["emp_team"] = dict(zip(_unstrings(arrays["emp_team.emp.codes"], arrays["emp_team.emp.table"]).tolist(),
+                                    _unstrings(arrays["emp_team.team.codes"], arrays["emp_team.team.table"]).tolist()))
+        for name in JSON_KEYS:
+            data[name] = meta[name]
+        return data
+
+    @property
+    def nbytes(self):
+        """Bytes held by the arrays (the in-memory size of the instance)."""
+        return sum(a.nbytes for a in self.arrays.values())
+
+    def save(self, file):
+        """Writes the arrays and meta to file (a path or binary file object) as .npz."""
+        meta = np.array(json.dumps(self.meta, default=_json_default))
+        np.savez(file, __meta__=meta, **self.arrays)
+
+    @classmethod
+    def load(cls, file):
+        """Reads an instance written by save; nothing in the file is unpickled."""
+        with np.load(file, allow_pickle=False) as f:
+            arrays = {name: f[name] for name in f.files}
+        meta = json.loads(str(arrays.pop("__meta__")))
+        return cls(arrays, meta)
+
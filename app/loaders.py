@@ -0,0 +1,154 @@
+# Readers for the two uploaded workbooks; each accepts a path, file object or upload
+# and returns the raw DataFrame that preprocess_data expects.
+import time
+
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+from openpyxl.utils import column_index_from_string
+from pandas.io.parsers import TextParser
+
+# frame name -> (sheet, usecols, skiprows) for both workbooks
+WORKERS_WORKBOOK_FRAMES = {
+    "workers": ("Tabellen", "T:AH", 1),
+    "rooster_template": ("Tabellen", "E:P", 1),
+    "vast_rooster": ("Vaste roosters", "A:E", 1),
+}
+ONB_WORKBOOK_FRAMES = {
+    "onb": ("Aanlevering onbeschikbaarheid p", None, None),
+    "prev_assignments": ("Aanlevering diensten", None, None),
+}
+
+
+def _read_frame(source, spec):
+    sheet, usecols, skiprows = spec
+    return pd.read_excel(source, sheet_name=sheet, usecols=usecols, skiprows=skiprows)
+
+def read_workers(source):
+    return _read_frame(source, WORKERS_WORKBOOK_FRAMES["workers"])
+
+def read_rooster_template(source):
+    return _read_frame(source, WORKERS_WORKBOOK_FRAMES["rooster_template"])
+
+def read_vast_rooster(source):
+    return _read_frame(source, WORKERS_WORKBOOK_FRAMES["vast_rooster"])
+
+def read_onb(source):
+    return _read_frame(source, ONB_WORKBOOK_FRAMES["onb"])
+
+def read_prev_assignments(source):
+    return _read_frame(source, ONB_WORKBOOK_FRAMES["prev_assignments"])
+
+
+def _convert_cell(cell):
+    # same conversion as pandas' openpyxl reader, so the frames match read_excel exactly
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return float("nan")
+    if cell.data_type == TYPE_NUMERIC:
+        as_int = int(cell.value)
+        return as_int if as_int == cell.value else float(cell.value)
+    return cell.value
+
+
+def _sheet_rows(ws):
+    """All rows of a read-only worksheet with trailing empty cells/rows trimmed and padded to equal width."""
+    ws.reset_dimensions()  # the stored dimensions of generated files are often wrong
+    rows = []
+    last_row_with_data = -1
+    for i, row in enumerate(ws.rows):
+        values = [_convert_cell(cell) for cell in row]
+        while values and values[-1] == "":
+            values.pop()
+        if values:
+            last_row_with_data = i
+        rows.append(values)
+    rows = rows[:last_row_with_data + 1]
+    if rows:
+        width = max(len(r) for r in rows)
+        rows = [r + [""] * (width - len(r)) for r in rows]
+    return rows
+
+
+def _usecols(spec):
+    # "T:AH" -> [19, ..., 33]
+    if spec is None:
+        return None
+    first, last = spec.split(":")
+    return list(range(column_index_from_string(first) - 1, column_index_from_string(last)))
+
+
+def load_workbook_frames(source, frames):
+    """
+    Opens one workbook once (read-only, streaming) and builds every frame in frames
+    ({name: (sheet, usecols, skiprows)}), reading each sheet a single time.
+    Returns (dict of DataFrames, timings).
+    """
+    timings = {"sheets": {}, "frames": {}}
+    t0 = time.perf_counter()
+    wb = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+    timings["open_s"] = round(time.perf_counter() - t0, 4)
+
+    sheet_rows = {}
+    out = {}
+    try:
+        for name, (sheet, usecols, skiprows) in frames.items():
+            if sheet not in sheet_rows:
+                t0 = time.perf_counter()
+                sheet_rows[sheet] = _sheet_rows(wb[sheet])
+                timings["sheets"][sheet] = round(time.perf_counter() - t0, 4)
+
+            t0 = time.perf_counter()
+            rows = sheet_rows[sheet]
+            if rows:
+                # the header is mangled over the full row (like read_excel) before usecols is applied
+                out[name] = TextParser(list(rows), header=0, skiprows=skiprows, usecols=_usecols(usecols),
+                                       skip_blank_lines=False).read()
+            else:
+                out[name] = pd.DataFrame()
+            timings["frames"][name] = round(time.perf_counter() - t0, 4)
+    finally:
+        wb.close()
+    return out, timings
+
+
+def load_workbooks(workers_source, onb_source):
+    """
+    Single-pass replacement for the five read_* calls: each workbook is opened and
+    each sheet parsed once. Returns a dict with workers, rooster_template, vast_rooster,
+    onb and prev_assignments DataFrames plus a 'timings' breakdown.
+    """
+    t0 = time.perf_counter()
+    workers_frames, workers_timings = load_workbook_frames(workers_source, WORKERS_WORKBOOK_FRAMES)
+    onb_frames, onb_timings = load_workbook_frames(onb_source, ONB_WORKBOOK_FRAMES)
+    return {
+        **workers_frames,
+        **onb_frames,
+        "timings": {
+            "workers_workbook": workers_timings,
+            "onb_workbook": onb_timings,
+            "total_s": round(time.perf_counter() - t0, 4),
+        },
+    }
+
+
+def read_teams(source):
+    """
+    Sorted distinct 'Team medewerker' values of the onbeschikbaarheid sheet, streaming
+    only that column instead of parsing the whole sheet.
+    """
+    sheet = ONB_WORKBOOK_FRAMES["onb"][0]
+    wb = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb[sheet]
+        ws.reset_dimensions()
+        header = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+        if "Team medewerker" not in header:
+            raise KeyError("Column 'Team medewerker' missing")
+        col = header.index("Team medewerker") + 1
+        teams = {row[0] for row in ws.iter_rows(min_row=2, min_col=col, max_col=col, values_only=True)}
+    finally:
+        wb.close()
+    teams.discard(None)
+    return sorted(teams)
@@ -0,0 +1,122 @@
+# Objective builder for auto_rooster: integer weight profiles and piecewise-linear convex
+# penalties. All weights are integers, so CP-SAT does not have to rescale the objective, and
+# squares are tables instead of multiplication constraints. The weights are the old float
+# weights times 10; scaling them all by one factor keeps the same optimal rosters.
+#
+# Under-coverage is the exception, and it does change the rosters. Before, the squared
+# under-coverage variable was never tied to the deficit, so the term was 0 in every solution.
+# Now it is squared in hours (see UNDER_COVERAGE_TABLE) and weighs 2 per hour². A deficit of
+# one 8-hour shift then costs 128: more than a single isolated shift or night-rest penalty, far
+# less than an uncovered shift (1000). So the solver fills contract hours before the
+# preferences, but never at the cost of coverage.
+
+# Weight per objective term (see the O-sections in auto_rooster). Bonus terms have negative weights.
+WEIGHT_PROFILES = {
+    "default": {
+        "uncovered": 1000,             # required shift left uncovered
+        "uncovered_optional": 500,     # shift with required == 0.5 left uncovered
+        "under_coverage": 2,           # per hour² below contract hours (see UNDER_COVERAGE_TABLE)
+        "under_coverage_weekend": 1,   # idem, employees with a weekend preference
+        "consecutive_weekends": 50,
+        "isolated_shifts": 10,
+        "rest_after_night": 5,
+        "unequal_shift_types": 1,
+        "week_balance": 1,             # per (scaled) deviation², see O7
+        "overig": 10,
+        "preferred_shift": -1,
+        "deskundigheid": 1,            # per level², see O10
+        "preferred_qualification": -5,
+    },
+    # same coverage, but fairness between weeks and employees weighs as much as the preferences
+    "fairness": {
+        "uncovered": 1000,
+        "uncovered_optional": 500,
+        "under_coverage": 4,
+        "under_coverage_weekend": 1,
+        "consecutive_weekends": 50,
+        "isolated_shifts": 10,
+        "rest_after_night": 5,
+        "unequal_shift_types": 10,
+        "week_balance": 5,
+        "overig": 10,
+        "preferred_shift": -1,
+        "deskundigheid": 1,
+        "preferred_qualification": -5,
+    },
+}
+
+
+# under-coverage (minutes) is squared in hours rather than minutes, so a deficit no one can fill
+# (more staff than shifts) does not swamp the coverage terms; breakpoints double from 1 hour and
+# with divisor 1 every deficit costs something (at least 1 below the first hour, by interpolation)
+UNDER_COVERAGE_TABLE = {"unit": 60, "divisor": 1, "dense": 1}
+
+
+def get_weights(weights="default"):
+    """A weight profile by name, or a dict of term -> integer weight (missing terms use 'default')."""
+    if isinstance(weights, str):
+        if weights not in WEIGHT_PROFILES:
+            raise ValueError(f"Unknown weight profile {weights!r}, expected one of {sorted(WEIGHT_PROFILES)}")
+        return dict(WEIGHT_PROFILES[weights])
+    merged = {**WEIGHT_PROFILES["default"], **weights}
+    for term, w in merged.items():
+        if int(w) != w:
+            raise ValueError(f"Weight of {term!r} must be an integer, got {w!r}")
+    return {term: int(w) for term, w in merged.items()}
+
+
+def square_table(max_value, unit=1, dense=8, divisor=1):
+    """
+    Breakpoints and integer values of (value / unit)² / divisor on [0, max_value]: every unit up to
+    dense units, then doubling. Every breakpoint is a whole number of units (the last one is
+    max_value rounded up to a unit), so the values are exact squares, rounded up by the divisor.
+    Between breakpoints the table interpolates linearly, which overestimates the square slightly
+    but keeps it convex.
+    """
+    end = -(-max_value // unit) * unit
+    points = [0]
+    step = unit
+    while points[-1] < end:
+        points.append(min(end, points[-1] + step))
+        if points[-1] >= dense * unit:
+            step = points[-1]
+    return points, [-(-(p // unit) ** 2 // divisor) for p in points]
+
+
+def add_convex_penalty(model, y, breakpoints, values, name):
+    """
+    Integer variable p >= the piecewise-linear interpolation of (breakpoints, values) at y,
+    one linear constraint per segment. For a convex table and a minimized p this is exact
+    (p is the maximum of the segment lines), without multiplication constraints.
+    """
+    p = model.NewIntVar(0, max(values), name)
+    for (b0, v0), (b1, v1) in zip(zip(breakpoints, values), zip(breakpoints[1:], values[1:])):
+        # (b1 - b0) * p >= (b1 - b0) * v0 + (v1 - v0) * (y - b0)
+        model.Add((b1 - b0) * p >= (b1 - b0) * v0 + (v1 - v0) * (y - b0))
+    return p
+
+
+def weighted_objective(terms, weights):
+    """The weighted sum of the objective terms (term -> list of variables or expressions)."""
+    return sum(weights[term] * sum(items) for term, items in terms.items() if items)
+
+
+def objective_breakdown(solver, terms, weights):
+    """
+    Per-term contribution of the solution, evaluated from the term expressions after solving:
+    term -> {raw (unweighted sum), weight, value (weighted)}. The values add up to the objective.
+    """
+    breakdown = {}
+    for term, items in terms.items():
+        raw = sum(solver.Value(item) for item in items)
+        breakdown[term] = {"raw": raw, "weight": weights[term], "value": weights[term] * raw}
+    return breakdown
+
+
+def format_breakdown(breakdown):
+    """Text table of an objective_breakdown."""
+    lines = [f"{'term':<26}{'raw':>10}{'weight':>8}{'value':>12}"]
+    for term, row in breakdown.items():
+        lines.append(f"{term:<26}{row['raw']:>10}{row['weight']:>8}{row['value']:>12}")
+    lines.append(f"{'total':<26}{'':>10}{'':>8}{sum(row['value'] for row in breakdown.values()):>12}")
+    return "\n".join(lines)
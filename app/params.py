@@ -0,0 +1,90 @@
+import os
+
+from .stopping import STOP_CRITERIA
+
+# Solver sizing and named parameter profiles. The number of CP-SAT search workers follows
+# the CPUs this process may use (cgroup quota in a container) divided over the solves that
+# run at the same time, so concurrent web jobs do not oversubscribe the CPU.
+
+# presolve_level -> CP-SAT presolve parameters (2 is the CP-SAT default)
+PRESOLVE_LEVELS = {
+    0: {"cp_model_presolve": False},
+    1: {"cp_model_probing_level": 0, "max_presolve_iterations": 1},
+    2: {},
+}
+
+# a single CP-SAT worker runs one search strategy instead of a portfolio; when the CPU share
+# of a solve is one CPU it still gets two workers
+MIN_WORKERS = 2
+
+# soft_gap, no_improvement_s and objective_target end the solve early (see app/stopping.py)
+PROFILES = {
+    # quick look: short, light presolve, no LP relaxation, at most 4 workers
+    "draft": {"time_limit_s": 30, "max_workers": 4, "presolve_level": 1, "linearization_level": 0, "seed": 0,
+              "soft_gap": 0.05, "no_improvement_s": 10, "objective_target": None},
+    # what the web interface always used; most runs plateau after 40-60 s
+    "standard": {"time_limit_s": 300, "max_workers": 16, "presolve_level": 2, "linearization_level": 1, "seed": 0,
+                 "soft_gap": 0.01, "no_improvement_s": 60, "objective_target": None},
+    # final roster: longer and a stronger LP relaxation
+    "quality": {"time_limit_s": 900, "max_workers": 16, "presolve_level": 2, "linearization_level": 2, "seed": 0,
+                "soft_gap": 0.002, "no_improvement_s": 180, "objective_target": None},
+}
+
+
+def _cgroup_cpus():
+    """CPU quota of the cgroup (v2 cpu.max or v1 cfs quota/period), None without a quota."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus():
+    """CPUs this process may use: the cgroup quota, capped by the CPU affinity mask."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not on Linux
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpus()
+    if quota is not None:
+        cpus = min(cpus, max(1, int(quota)))
+    return max(1, cpus)
+
+
+def solver_workers(concurrent_solves=1, max_workers=16, min_workers=MIN_WORKERS):
+    """CP-SAT search workers for one of concurrent_solves simultaneous solves."""
+    return min(max_workers, max(min_workers, available_cpus() // max(1, concurrent_solves)))
+
+
+def resolve_profile(profile="standard", concurrent_solves=1, **overrides):
+    """
+    Solve settings for a named profile as auto_rooster keyword arguments: time_limit_s,
+    num_workers, solver_params (extra CP-SAT parameters) and stop (early termination criteria).
+    overrides (time_limit_s, num_workers or any profile key) take precedence when they are not None.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown solver profile {profile!r}, expected one of {sorted(PROFILES)}")
+    settings = {**PROFILES[profile], **{k: v for k, v in overrides.items() if v is not None}}
+    num_workers = settings.get("num_workers") or solver_workers(concurrent_solves, settings["max_workers"])
+    return {
+        "time_limit_s": settings["time_limit_s"],
+        "num_workers": num_workers,
+        "solver_params": {
+            **PRESOLVE_LEVELS[settings["presolve_level"]],
+            "linearization_level": settings["linearization_level"],
+            "random_seed": settings["seed"],
+        },
+        "stop": {key: settings[key] for key in STOP_CRITERIA},
+    }
@@ -1,9 +1,203 @@
 
 import pandas as pd
+import numpy as np
 import datetime as dt
 import ast
 import re
 
+from .workers import parse_workers, format_worker_report
+
+def build_employee_table(workers: pd.DataFrame):
+    """
+    Compact, array-backed employee table for the solver and validator.
+    Row i describes emp_ids[i]; look attributes up with emp_table[col][emp_index[emp]].
+    """
+    deskundigheid = [list(d) for d in workers['deskundigheid']]
+    return {
+        "medewerker_id": workers['medewerker_id'].to_numpy(dtype=object),
+        "medewerker_naam": workers['medewerker_naam'].to_numpy(dtype=object),
+        "contract_minutes": workers['contract_minutes'].to_numpy(dtype=np.int64),
+        "max_days_per_week": workers['max_days_per_week'].to_numpy(dtype=np.int64),
+        "leeftijd": workers['leeftijd'].to_numpy(dtype=np.int64),
+        "deskundigheid": deskundigheid,
+        "qualification_set": [frozenset(d) for d in deskundigheid],
+        "min_deskundigheid": np.array([min(d) for d in deskundigheid], dtype=np.int64),
+        "max_deskundigheid": np.array([max(d) for d in deskundigheid], dtype=np.int64),
+        "first_deskundigheid": np.array([d[0] for d in deskundigheid], dtype=np.int64),
+        "voorkeur_dag": workers['voorkeur_dag'].to_numpy(dtype=object),
+        "voorkeur_avond": workers['voorkeur_avond'].to_numpy(dtype=object),
+        "voorkeur_nacht": workers['voorkeur_nacht'].to_numpy(dtype=object),
+        "weekend_pref": np.array(['weekend' in str(w).lower() for w in workers['wensen']], dtype=bool),
+        "patroon": workers['patroon'].tolist(),
+        "min_achtereenvolgende_diensten": workers['min_achtereenvolgende_diensten'].to_numpy(dtype=np.int64),
+        "max_achtereenvolgende_diensten": workers['max_achtereenvolgende_diensten'].to_numpy(dtype=np.int64),
+        "rust_na_werkperiode": workers['rust_na_werkperiode'].to_numpy(dtype=np.int64),
+    }
+
+
+def minutes_of_day(values):
+    """
+    Clock times (datetime.time, Timestamp or 'HH:MM[:SS]' strings) → minutes since midnight as
+    an Int64 Series (<NA> where there is no time), parsed in one vectorized string pass.
+    """
+    values = values if isinstance(values, pd.Series) else pd.Series(values)
+    parts = values.astype(str).str.extract(r'(\d{1,2}):(\d{2})')
+    return (pd.to_numeric(parts[0]) * 60 + pd.to_numeric(parts[1])).astype('Int64')
+
+
+def time_of_minutes(minutes):
+    """Minutes since midnight → datetime.time (None where missing), the inverse of minutes_of_day."""
+    return [dt.time(m // 60, m % 60) if pd.notna(m) else None for m in minutes]
+
+
+def normalized_dates(frame, column='shift_date'):
+    """frame with column as midnight Timestamps; frame itself, not a copy, when it already is."""
+    values = frame[column]
+    if pd.api.types.is_datetime64_dtype(values) and values.dt.normalize().equals(values):
+        return frame
+    return frame.assign(**{column: pd.to_datetime(values).dt.normalize()})
+
+
+def _windows(frame, date_col, start_col, end_col):
+    """
+    Rows as windows [start, end) in minutes from the midnight of their date. A window that
+    crosses midnight (end beyond 1440) is repeated on the next date, shifted back by a day.
+    """
+    spill = frame[frame[end_col] > 24 * 60].copy()
+    spill[date_col] = spill[date_col] + np.timedelta64(1, 'D')
+    spill[start_col] -= 24 * 60
+    spill[end_col] -= 24 * 60
+    return pd.concat([frame, spill], ignore_index=True)
+
+
+def build_availability_pairs(shifts: pd.DataFrame, df_onb: pd.DataFrame, emp_ids):
+    """
+    Joins the onbeschikbaarheid rows onto the shift instances in one vectorized merge on date.
+    Overlap is computed on the integer minute columns (start_min/end_min), so a night shift
+    also overlaps the morning of the next day. Returns:
+    - blocked_pairs: set of (shift_id, emp) where the shift overlaps a window that is not
+      'beschikbaar' (rows without times block the whole day)
+    - preferred_pairs: set of (shift_id, emp) on dates the employee marked as 'beschikbaar'
+    - unavailable_dates: dict emp -> set of dates with any row that is not 'beschikbaar'
+    """
+    onb = df_onb[df_onb['Medewerker id'].isin(emp_ids)]
+    onb = pd.DataFrame({
+        'emp': onb['Medewerker id'].to_numpy(),
+        'date': pd.to_datetime(onb['Datum']).dt.normalize().to_numpy(),
+        'available': (onb['Beschikbaarheid'].astype(str).str.lower() == 'beschikbaar').to_numpy(),
+        'start': onb['start_min'].to_numpy(dtype=float, na_value=np.nan),
+        'end': onb['end_min'].to_numpy(dtype=float, na_value=np.nan),
+    }).dropna(subset=['date'])
+    # rows without times cover the whole day, a window ending before it starts runs past midnight
+    no_times = onb['start'].isna() | onb['end'].isna()
+    onb.loc[no_times, 'start'] = 0
+    onb.loc[no_times, 'end'] = 24 * 60
+    onb.loc[onb['end'] <= onb['start'], 'end'] += 24 * 60
+
+    shift_times = pd.DataFrame({
+        'shift_id': shifts['shift_id'].to_numpy(),
+        'date': pd.to_datetime(shifts['shift_date']).dt.normalize().to_numpy(),
+        'shift_start': shifts['start_min'].to_numpy(),
+        'shift_end': shifts['end_min'].to_numpy(),
+    })
+
+    # same-date pairs, plus the parts of windows and shifts that run into the next day
+    joined = _windows(onb, 'date', 'start', 'end').merge(_windows(shift_times, 'date', 'shift_start', 'shift_end'),
+                                                          on='date', how='inner')
+    overlap = (joined['shift_start'] < joined['end']) & (joined['start'] < joined['shift_end'])
+
+    blocked = joined[~joined['available'] & overlap]
+    preferred = onb[onb['available']].merge(shift_times, on='date', how='inner')
+    unavailable = onb[~onb['available']]
+
+    return {
+        "blocked_pairs": set(zip(blocked['shift_id'].tolist(), blocked['emp'].tolist())),
+        "preferred_pairs": set(zip(preferred['shift_id'].tolist(), preferred['emp'].tolist())),
+        "unavailable_dates": {emp: set(dates.dt.date) for emp, dates in unavailable.groupby('emp')['date']},
+    }
+
+
+DAY_COLUMNS = ["Maandag", "Dinsdag", "Woensdag", "Donderdag", "Vrijdag", "Zaterdag", "Zondag"]
+
+SHIFT_COLUMNS = ['shift_id', 'shift_name', 'shift_date', 'week', 'global_week', 'day_of_week', 'absolute_day', 'start_time',
+                 'end_time', 'start_min', 'end_min', 'duration_min', 'qualification', 'is_day', 'is_evening', 'is_night',
+                 'day_key', 'required']
+
+
+def build_shift_requirements(df_shifts: pd.DataFrame):
+    """
+    Template rows (one per shift, a 1/0.5/0 column per weekday) → one row per shift and weekday
+    it is planned on (required 1) or optional on (required 0.5), in template order. Everything
+    that only depends on the template row (times, duration, shift type) is computed here once.
+    start_min/end_min are minutes from the midnight of the shift date; end_min is beyond 1440
+    for a shift that crosses midnight.
+    """
+    day_values = df_shifts[DAY_COLUMNS].to_numpy(dtype=float)
+    rows, days = np.nonzero((day_values == 1) | (day_values == 0.5))  # row-major: template order, then weekday
+    req = pd.DataFrame({
+        "shift_name": df_shifts['Shifts'].to_numpy()[rows],
+        "day_of_week": days,
+        "start_time": df_shifts['Begintijd'].to_numpy()[rows],
+        "end_time": df_shifts['Eindtijd'].to_numpy()[rows],
+        "qualification": df_shifts['Deskundigheid'].to_numpy()[rows],
+        "start_min": df_shifts['start_min'].to_numpy(dtype=int)[rows],
+        "duration_min": df_shifts['duration_min'].to_numpy(dtype=int)[rows],
+        "required": day_values[rows, days],
+    })
+    req['end_min'] = req['start_min'] + req['duration_min']
+    req['qualification'] = req['qualification'].apply(lambda q: ast.literal_eval(q) if isinstance(q, str) else q)
+
+    # night: crosses midnight; day/evening: starts before/after 12:00 (shifts of zero length are neither)
+    forward = (req['duration_min'] > 0) & (req['end_min'] < 24 * 60)
+    req['is_day'] = forward & (req['start_min'] < 12 * 60)
+    req['is_evening'] = forward & (req['start_min'] >= 12 * 60)
+    req['is_night'] = req['end_min'] >= 24 * 60
+    return req
+
+
+def expand_shift_instances(shift_requirements: pd.DataFrame, start_date, global_start_date, num_weeks: int):
+    """
+    Cross join of the shift requirements with the weeks of the horizon: row (week, requirement)
+    in week-major order, with day offsets and dates computed on whole arrays. shift_id is the row
+    number; week and global_week are 1-based, absolute_day counts from start_date.
+    """
+    n = len(shift_requirements)
+    week0 = np.repeat(np.arange(num_weeks), n)
+    shifts = shift_requirements.iloc[np.tile(np.arange(n), num_weeks)].reset_index(drop=True)
+    shifts['week'] = week0 + 1
+    shifts['absolute_day'] = week0 * 7 + shifts['day_of_week'].to_numpy()
+    shifts['shift_date'] = start_date + pd.to_timedelta(shifts['absolute_day'], unit="D")
+    shifts['global_week'] = (shifts['shift_date'].dt.normalize() - global_start_date).dt.days // 7 + 1
+    shifts['day_key'] = list(zip(shifts['week'].tolist(), shifts['day_of_week'].tolist()))
+    shifts['shift_id'] = shifts.index.astype(int)
+    return shifts[SHIFT_COLUMNS]
+
+
+def shift_helper_maps(shifts: pd.DataFrame):
+    """
+    The per-shift helper maps of preprocess_data (dur_min, shifts_by_week, shifts_by_day, weeks,
+    night_shifts, night_shifts_by_week), grouped in shift_id order.
+    """
+    weeks = sorted(shifts['week'].unique().tolist())
+    ids = shifts['shift_id']
+    night = shifts['is_night'].to_numpy(dtype=bool)
+    night_by_week = {w: g.tolist() for w, g in ids[night].groupby(shifts['week'][night])}
+    return {
+        "dur_min": dict(zip(ids.tolist(), shifts['duration_min'].tolist())),
+        "shifts_by_week": {w: g.tolist() for w, g in ids.groupby(shifts['week'])},
+        "shifts_by_day": {d: g.tolist() for d, g in ids.groupby(shifts['absolute_day'])},
+        "weeks": weeks,
+        "night_shifts": ids[night].tolist(),
+        "night_shifts_by_week": {w: night_by_week.get(w, []) for w in weeks},
+    }
+
+
+def next_monday(today=None):
+    """Planning start date without a previous roster: next Monday, or today when it is a Monday."""
+    today = pd.Timestamp(today or dt.datetime.now().date())
+    return today + pd.to_timedelta((7 - today.weekday()) % 7, unit="D")
+
+
 def preprocess_data(df_werknemers: pd.DataFrame, df_rooster_template: pd.DataFrame, df_onb: pd.DataFrame, prev_assignments: pd.DataFrame, df_vastrooster: pd.DataFrame, num_weeks: int = 4):
     """
     Prepares shifts and workers dataframes for the OR-Tools scheduling model.
@@ -52,44 +246,12 @@ def preprocess_data(df_werknemers: pd.DataFrame, df_rooster_template: pd.DataFra
 
     df_shifts["Deskundigheid"] = df_shifts["Deskundigheid"].apply(parse_desk)
     
-    # Compute duration in hours
-    df_shifts["Duur"] = (
-        pd.to_datetime(df_shifts["Eindtijd"].astype(str)) -
-        pd.to_datetime(df_shifts["Begintijd"].astype(str))
-    ).dt.total_seconds() / 3600
-
-    # Fix negative durations (crosses midnight)
-
-    df_shifts.loc[df_shifts["Duur"] < 0, "Duur"] += 24
-
-    # Convert to long format: each row = one shift on one day
-    days = ['Maandag', 'Dinsdag', 'Woensdag', 'Donderdag', 'Vrijdag', 'Zaterdag', 'Zondag']
-    day_map = {day: i for i, day in enumerate(days)}  # Map day names to day indices (0–6)
-
-    shift_requirements = []
-
-    for idx, row in df_shifts.iterrows():
-        for day in days:
-            if row[day] == 1:  # If this shift needs to be filled on this day
-                shift_requirements.append({
-                    "shift_name": row['Shifts'],
-                    "day_of_week": day_map[day],  # 0=Monday, etc.
-                    "start_time": row['Begintijd'],
-                    "end_time": row['Eindtijd'],
-                    "qualification": row['Deskundigheid'],
-                    "duration": row['Duur'],
-                    "required": 1
-                })
-            elif row[day] == 0.5:  # Facultatief
-                shift_requirements.append({
-                    "shift_name": row['Shifts'],
-                    "day_of_week": day_map[day],  # 0=Monday, etc.
-                    "start_time": row['Begintijd'],
-                    "end_time": row['Eindtijd'],
-                    "qualification": row['Deskundigheid'],
-                    "duration": row['Duur'],
-                    "required": 0.5
-                })
+    # Start and duration in minutes (a negative difference crosses midnight)
+    df_shifts["start_min"] = minutes_of_day(df_shifts["Begintijd"])
+    df_shifts["duration_min"] = (minutes_of_day(df_shifts["Eindtijd"]) - df_shifts["start_min"]) % (24 * 60)
+
+    # Long format: each row = one shift on one day (expanded over the weeks below)
+    shift_requirements = build_shift_requirements(df_shifts)
 
     ### Previous assignments processing ###
     if prev_assignments is not None and not prev_assignments.empty:
@@ -116,18 +278,15 @@ def preprocess_data(df_werknemers: pd.DataFrame, df_rooster_template: pd.DataFra
 
         # --- 3. Add scheduler fields ---
         df["shift_id"] = range(len(df))
-        df['is_night'] = df['start_time'].apply(lambda t: t.hour >= 22 or t.hour < 6)
+        df["start_min"] = minutes_of_day(df["start_time"]).astype(int)
+        df['is_night'] = (df['start_min'] >= 22 * 60) | (df['start_min'] < 6 * 60)
         df["shift_filled"] = True
         df["qualification"] = pd.NA
         df["deskundigheid"] = pd.NA
 
-        # Duration in minutes
-        df["duration_min"] = (
-            pd.to_datetime(df["end_time"].astype(str)) -
-            pd.to_datetime(df["start_time"].astype(str))
-        ).dt.total_seconds() / 60
-        # Fix negative durations (crosses midnight)
-        df.loc[df["duration_min"] < 0, "duration_min"] += 24 * 60
+        # Duration in minutes (a negative difference crosses midnight), end_min beyond 1440 after midnight
+        df["duration_min"] = (minutes_of_day(df["end_time"]).astype(int) - df["start_min"]) % (24 * 60)
+        df["end_min"] = df["start_min"] + df["duration_min"]
 
         # --- 4. Compute day_of_week and absolute_day ---
         df = df.sort_values("shift_date").reset_index(drop=True)
@@ -146,70 +305,17 @@ def preprocess_data(df_werknemers: pd.DataFrame, df_rooster_template: pd.DataFra
 
         # --- 7. Set start_date for the next scheduling period ---
         start_date = prev_assignments["shift_date"].max() + dt.timedelta(days=1)
+        default_start_date = None  # follows from the uploads
         
     else:
         # If no previous assignments, set start_date to next Monday
-        today = pd.Timestamp(dt.datetime.now().date())
-        start_date = today + pd.to_timedelta((7 - today.weekday()) % 7, unit="D")
+        start_date = next_monday()
         global_start_date = start_date
+        default_start_date = start_date.date().isoformat()
     
     
-    all_shift_instances = []
-    for week in range(num_weeks):
-        for row in shift_requirements:
-            shift_date = start_date + dt.timedelta(days=week * 7 + row["day_of_week"])
-            global_week = (shift_date.normalize() - global_start_date).days // 7 + 1
-            all_shift_instances.append({
-                **row,
-                "week": week + 1,
-                "absolute_day": week * 7 + row["day_of_week"],
-                "shift_date": shift_date,
-                "global_week": global_week
-            })
-
-    shifts = pd.DataFrame(all_shift_instances)
-    shifts['shift_id'] = shifts.index.astype(int)    
-    
-    # Convert durations (hours → minutes, integers for CP-SAT)
-    shifts['duration_min'] = (shifts['duration'].astype(float) * 60).round().astype(int)
-
-    # Ensure int types
-    shifts['week'] = shifts['week'].astype(int)
-    shifts['day_of_week'] = shifts['day_of_week'].astype(int)
+    shifts = expand_shift_instances(shift_requirements, start_date, global_start_date, num_weeks)
 
-    # Day key for grouping
-    shifts['day_key'] = list(zip(shifts['week'], shifts['day_of_week']))
-    
-    # add is_night based on the difference between start_time and end_time being negative
-    # compute per-shift whether end_time < start_time (crosses midnight)
-    shifts['is_night'] = (
-        pd.to_datetime(shifts['end_time'].astype(str)) -
-        pd.to_datetime(shifts['start_time'].astype(str))
-    ) < pd.Timedelta(0)
-    shifts['is_night'] = shifts['is_night'].astype(bool)
-    shifts['shift_id'] = shifts.index.astype(int)
-
-    # add is_evening based on start time being >= 12:00, and difference between start_time and end_time being positive
-    shifts['is_evening'] = (
-        (pd.to_datetime(shifts['start_time'].astype(str)).dt.hour >= 12) &
-        ((pd.to_datetime(shifts['end_time'].astype(str)) -
-          pd.to_datetime(shifts['start_time'].astype(str))) > pd.Timedelta(0))
-    )
-    shifts['is_evening'] = shifts['is_evening'].astype(bool)
-    shifts['shift_id'] = shifts.index.astype(int)
-    
-    # add is_day based on start time being < 12:00, and difference between start_time and end_time being positive
-    shifts['is_day'] = (
-        (pd.to_datetime(shifts['start_time'].astype(str)).dt.hour < 12) &
-        ((pd.to_datetime(shifts['end_time'].astype(str)) -
-          pd.to_datetime(shifts['start_time'].astype(str))) > pd.Timedelta(0))
-    )
-    
-    shifts['qualification'] = shifts['qualification'].apply(
-        lambda q: ast.literal_eval(q) if isinstance(q, str) else q)
-    
-    shifts = shifts[['shift_id', 'shift_name', 'shift_date', 'week', 'global_week', 'day_of_week', 'absolute_day', 'start_time', 'end_time', 'duration_min', 'qualification','is_day', 'is_evening', 'is_night', 'day_key', 'required']]
-    
     shifts_constant = shifts.copy()
     # Remove all shifts where shift_name = KOK or FM
     shifts_constant = shifts_constant[shifts_constant['shift_name'].isin(['KOK', 'FM'])]
@@ -233,103 +339,10 @@ def preprocess_data(df_werknemers: pd.DataFrame, df_rooster_template: pd.DataFra
     
     print('Shift data loaded')
     # --- Workers ---
-    workers = df_werknemers.copy().reset_index(drop=True)
-    workers['medewerker_id'] = workers['medewerker_id'].astype(str)
-    
-    # delete all rows where wensen = niet plannen
-    workers = workers[workers['wensen'] != 'niet plannen']
-    workers = workers.reset_index(drop=True)
-    
-    #change name of in dienst and uit dienst to contract vanaf and contract tm
-    workers = workers.rename(columns={'datum indienst': 'contact vanaf', 'datum uit dienst': 'contract tm', 'deskundigheid.1': 'deskundigheid'})
-    
-    # Convert contract geldig van, contract tm, and geboortedatum to datetime
-    workers['contract_vanaf'] = pd.to_datetime(workers['contact vanaf'], format='%d/%m/%Y')
-    workers['contract_tm'] = pd.to_datetime(workers['contract tm'], format='%d/%m/%Y')
-    #If contract_tm is NaT, set to 31-12-2099
-    workers['contract_tm'] = workers['contract_tm'].fillna(pd.Timestamp('2099-12-31'))
-    
-    # Drop unnecessary columns
-    workers = workers.drop(columns=['contact vanaf', 'contract tm'])
-    
-    #Convert deskundigheid to list of ints
-    lsts = []
-    for i in range(len(workers)):
-        lst = []
-        if workers['deskundigheid'][i] <10:
-            lst = [int(workers['deskundigheid'][i])]
-        else:
-            lst = [int(x) for x in str(int(workers['deskundigheid'][i]))]
-        
-        lsts.append(lst)
-        
-    workers['deskundigheid'] = lsts
-
-    workers['deskundigheid'] = workers['deskundigheid'].apply(
-        lambda q: ast.literal_eval(q) if isinstance(q, str) else q
-    )
-    
-    # Delete all employees with deskundigheid = 5 or 6
-    workers = workers[~workers['deskundigheid'].apply(lambda x: isinstance(x, (list, tuple)) and (5 in x or 6 in x))]
-    
-    # If deskundigheid contains 7, ensure 3 is also present
-    workers['deskundigheid'] = workers['deskundigheid'].apply(lambda x: x + [3] if 7 in x and 3 not in x else x)
-        
-    # If contract soort = oproep, set contracturen to 0
-    workers.loc[workers['contract soort'] == 'oproep', 'contracturen'] = 0
-    
-    # Normalize contract details
-    workers['max_days_per_week'] = workers['max_werkdgn_pw'].fillna(0).astype(int)
-    
-    # Safely convert contracturen to float, fill NaN with 0 before converting to int
-    workers['contract_hours'] = workers['contracturen'].fillna(0).astype(float)
-    
-    # if contract_hours is 0, fill with 9 * max_days_per_week
-    workers.loc[workers['contract_hours'] == 0, 'contract_hours'] = workers['max_days_per_week'] * 9
-    
-    workers['contract_minutes'] = (workers['contract_hours'] * 60).round().astype(int) 
-    # Convert geboortedatum to leeftijd based on current day (round down if birthday not yet occurred this year)
-    current_date = dt.datetime.now().date()
-
-    workers['leeftijd'] = workers['geboortedatum'].apply(
-        lambda x: current_date.year - x.year - ((current_date.month, current_date.day) < (x.month, x.day))
-    )
-        
-    def parse_list(x, cast=str):
-        if pd.isna(x) or str(x).strip() == '':
-            return []
-        return [cast(s.strip()) for s in str(x).split(',')]
-
-    workers['voorkeur_dagdelen'] = workers['voorkeur dagdelen (dag, avond, nacht)'].apply(
-    lambda x: parse_list(x, str))
-    
-    # split voorkeur_dagdelen list into three separate columns (safe for missing items)
-    workers['voorkeur_dag'] = workers['voorkeur_dagdelen'].apply(
-        lambda x: x[0].strip() if isinstance(x, (list, tuple)) and len(x) > 0 and isinstance(x[0], str) else ''
-    )
-    workers['voorkeur_avond'] = workers['voorkeur_dagdelen'].apply(
-        lambda x: x[1].strip() if isinstance(x, (list, tuple)) and len(x) > 1 and isinstance(x[1], str) else ''
-    )
-    workers['voorkeur_nacht'] = workers['voorkeur_dagdelen'].apply(
-        lambda x: x[2].strip() if isinstance(x, (list, tuple)) and len(x) > 2 and isinstance(x[2], str) else ''
-    )
-    
-
-    workers['patroon'] = workers['patroon'].apply(
-        lambda x: parse_list(x, int))
-
-    workers['achtereenvolgende_diensten'] = workers['achtereenvolgende diensten'].apply(
-        lambda x: parse_list(x, int))
-    
-    # split achtereenvolgende_diensten list into two separate columns named achtereenvolgende_diensten_min and achtereenvolgende_diensten_max (safe for missing items)
-    workers['min_achtereenvolgende_diensten'] = workers['achtereenvolgende_diensten'].apply(
-        lambda x: x[0] if isinstance(x, (list, tuple)) and len(x) > 0 else 0
-    )
-    workers['max_achtereenvolgende_diensten'] = workers['achtereenvolgende_diensten'].apply(
-        lambda x: x[1] if isinstance(x, (list, tuple)) and len(x) > 1 else 0
-    )
-
-    workers['rust_na_werkperiode'] = workers['rust na werkperiode'].fillna(0).astype(int)
+    # typed columns in one pass; malformed values raise a WorkerSheetError listing all of them
+    workers, worker_report = parse_workers(df_werknemers)
+    if worker_report:
+        print(format_worker_report(worker_report))
     
         
     print('Worker data loaded')
@@ -345,6 +358,7 @@ def preprocess_data(df_werknemers: pd.DataFrame, df_rooster_template: pd.DataFra
     df_onb = df_onb.rename(columns={'Mw_id':'Medewerker id'})
     
     # --- Constant schedule integration ---
+    vast_rooster_unmatched = []
     if df_vastrooster is not None and not df_vastrooster.empty:
         # Normalize employee_id
         df_vastrooster['medewerker_id'] = df_vastrooster['medewerker_id'].astype(str)
@@ -355,12 +369,16 @@ def preprocess_data(df_werknemers: pd.DataFrame, df_rooster_template: pd.DataFra
         # Compute shift_date
         df_vastrooster['shift_date'] = start_date + pd.to_timedelta((df_vastrooster['weekvolgnr']-1)*7 + df_vastrooster['day_of_week'], unit='D')
         
-        # Map to shift_id in shifts_constant
-        def find_shift_id(row):
-            matches = shifts_constant[(shifts_constant['shift_name']==row['dienst']) & (shifts_constant['day_of_week']==row['day_of_week'])]
-            return matches['shift_id'].iloc[0] if not matches.empty else None
-        df_vastrooster['shift_id'] = df_vastrooster.apply(find_shift_id, axis=1)
-        
+        # Map (dienst, day_of_week) to the first shift_id in shifts_constant with one merge
+        shift_lookup = shifts_constant.drop_duplicates(['shift_name', 'day_of_week'])[['shift_name', 'day_of_week', 'shift_id', 'duration_min']]
+        df_vastrooster = df_vastrooster.drop(columns=['shift_id', 'duration_min'], errors='ignore').merge(
+            shift_lookup.rename(columns={'shift_name': 'dienst'}), on=['dienst', 'day_of_week'], how='left')
+        unmatched = df_vastrooster[df_vastrooster['shift_id'].isna()]
+        vast_rooster_unmatched = unmatched[['medewerker_id', 'dienst', 'dag', 'weekvolgnr']].to_dict('records')
+        if vast_rooster_unmatched:
+            print(f"Warning: {len(vast_rooster_unmatched)} fixed roster rows match no KOK/FM shift in the template "
+                  f"(day still blocked, no contract minutes subtracted): {vast_rooster_unmatched}")
+
         # Append to df_onb
         df_const_unavail = df_vastrooster[['medewerker_id','shift_date','shift_id']].copy()
         df_const_unavail = df_const_unavail.rename(columns={'medewerker_id':'Medewerker id','shift_date':'Datum beschikbaarheid'})
@@ -371,73 +389,78 @@ def preprocess_data(df_werknemers: pd.DataFrame, df_rooster_template: pd.DataFra
         
         df_onb = pd.concat([df_onb, df_const_unavail[['Medewerker id','Datum beschikbaarheid', 'Beschikbaarheid','Beschikbaarheid tijd vanaf','Beschikbaarheid tijd t/m']]], ignore_index=True)
         
-        # Subtract constant schedule hours from contract_minutes
-        for emp in df_const_unavail['Medewerker id'].unique():
-            shift_ids = df_const_unavail[df_const_unavail['Medewerker id']==emp]['shift_id'].dropna().tolist()
-            hours_to_subtract = shifts_constant.loc[shifts_constant['shift_id'].isin(shift_ids),'duration_min'].sum()
-            workers.loc[workers['medewerker_id']==emp,'contract_minutes'] -= hours_to_subtract
-            
-            print(f"Subtracted {hours_to_subtract} minutes from employee {emp} due to constant schedule.")
-    
+        # Subtract constant schedule hours from contract_minutes (weekly): every distinct fixed shift
+        # of an employee counts once, however many weeks (weekvolgnr) it is listed for
+        matched = df_vastrooster.dropna(subset=['shift_id']).drop_duplicates(['medewerker_id', 'shift_id'])
+        minutes_to_subtract = matched.groupby('medewerker_id')['duration_min'].sum().astype(int)
+        workers['contract_minutes'] -= workers['medewerker_id'].map(minutes_to_subtract).fillna(0).astype(int)
+        for emp, minutes in minutes_to_subtract.items():
+            print(f"Subtracted {minutes} minutes from employee {emp} due to constant schedule.")
+
     # --- onbeschikbaarheid ---
     # Convert 'Datum beschikbaarheid' to datetime
     df_onb['Datum'] = pd.to_datetime(df_onb['Datum beschikbaarheid'], format='%Y-%m-%d').dt.date
     df_onb['Beschikbaarheid'] = df_onb['Beschikbaarheid'].fillna('Onbekend')
-    def ensure_time(x):
-        if isinstance(x, dt.time):
-            return x
-        try:
-            return pd.to_datetime(x, format='%H:%M').time()
-        except:
-            return None
-
-    df_onb['Beschikbaarheid_tijd_vanaf'] = df_onb['Beschikbaarheid tijd vanaf'].apply(ensure_time)
-    df_onb['Beschikbaarheid_tijd_tm'] = df_onb['Beschikbaarheid tijd t/m'].apply(ensure_time)
+    # window in minutes since midnight (<NA> without a time), the time columns are derived from it
+    df_onb['start_min'] = minutes_of_day(df_onb['Beschikbaarheid tijd vanaf'])
+    df_onb['end_min'] = minutes_of_day(df_onb['Beschikbaarheid tijd t/m'])
+    df_onb['Beschikbaarheid_tijd_vanaf'] = time_of_minutes(df_onb['start_min'])
+    df_onb['Beschikbaarheid_tijd_tm'] = time_of_minutes(df_onb['end_min'])
     
     #df_onb['Beschikbaarheid_tijd_vanaf'] = pd.to_datetime(df_onb['Beschikbaarheid tijd vanaf'], format='%H:%M', errors='coerce').dt.time
     #df_onb['Beschikbaarheid_tijd_tm'] = pd.to_datetime(df_onb['Beschikbaarheid tijd t/m'], format='%H:%M', errors='coerce').dt.time
-    df_onb = df_onb[['Medewerker id', 'Datum', 'Beschikbaarheid', 'Beschikbaarheid_tijd_vanaf', 'Beschikbaarheid_tijd_tm']]
+    # employee -> team from the onb sheet (the workers sheet has no team column)
+    emp_team = {}
+    if 'Team medewerker' in df_onb.columns:
+        teams = df_onb.dropna(subset=['Team medewerker']).drop_duplicates('Medewerker id')
+        emp_team = dict(zip(teams['Medewerker id'].astype(str), teams['Team medewerker']))
+
+    df_onb = df_onb[['Medewerker id', 'Datum', 'Beschikbaarheid', 'Beschikbaarheid_tijd_vanaf', 'Beschikbaarheid_tijd_tm',
+                     'start_min', 'end_min']]
     print('Onbeschikbaarheid data loaded')
 
 
     # --- Helper dictionaries ---
-    dur_min = shifts.set_index('shift_id')['duration_min'].to_dict()
-
-    # Grouping by week/day
-    shifts_by_week = {}
-    #shifts_by_day = {}
-    for _, r in shifts.iterrows():
-        s = int(r['shift_id'])
-        w = int(r['week'])
-        day_k = r['day_key']
-        shifts_by_week.setdefault(w, []).append(s)
-        #shifts_by_day.setdefault(day_k, []).append(s)
-
-    shifts_by_day = shifts.groupby('absolute_day')['shift_id'].apply(list).to_dict()
-    
-    weeks = sorted(shifts['week'].unique().tolist())
-    
-    night_shifts = shifts.loc[shifts['is_night'], 'shift_id'].tolist()
-    night_shifts_by_week = {
-        w: shifts.loc[(shifts['week'] == w) & (shifts['is_night']), 'shift_id'].tolist() for w in weeks}
-    
+    maps = shift_helper_maps(shifts)
+    dur_min = maps["dur_min"]
+    shifts_by_week = maps["shifts_by_week"]
+    shifts_by_day = maps["shifts_by_day"]
+    weeks = maps["weeks"]
+    night_shifts = maps["night_shifts"]
+    night_shifts_by_week = maps["night_shifts_by_week"]
+
     # Create clean shifts dataframe
     # Delete all rows where shifts = KOK or FM
     shifts = shifts[~shifts['shift_name'].isin(['KOK', 'FM'])]
     shifts = shifts.reset_index(drop=True)
     shifts['shift_id'] = shifts.index.astype(int)
 
+    # Array-backed employee attributes (after the constant schedule changed contract_minutes)
+    workers = workers.reset_index(drop=True)
+    emp_table = build_employee_table(workers)
+
+    # (shift, employee) pairs blocked by / preferred in the onbeschikbaarheid sheet
+    availability = build_availability_pairs(shifts, df_onb, emp_ids)
+
     return {
         "shifts": shifts,
         "workers": workers,
+        "emp_table": emp_table,
         "onb": df_onb,
+        "blocked_pairs": availability["blocked_pairs"],
+        "preferred_pairs": availability["preferred_pairs"],
+        "unavailable_dates": availability["unavailable_dates"],
         "emp_ids": emp_ids,
         "emp_index": emp_index,
+        "emp_team": emp_team,
         "dur_min": dur_min,
         "shifts_by_week": shifts_by_week,
         "shifts_by_day": shifts_by_day,
         "weeks": weeks,
         "night_shifts": night_shifts,
         "night_shifts_by_week": night_shifts_by_week,
-        "prev_assignments": prev_assignments
+        "prev_assignments": prev_assignments,
+        "vast_rooster_unmatched": vast_rooster_unmatched,
+        "worker_report": worker_report,
+        "default_start_date": default_start_date,
     }
\ No newline at end of file
@@ -0,0 +1,71 @@
+import os
+import time
+
+
+def _rss_bytes():
+    """Resident set size of this process (from /proc, so Linux only), None elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class BuildProfiler:
+    """
+    Records wall time, variables added, constraints added and memory (RSS) delta for each
+    section of a CP-SAT model build. Call mark(name) at the end of every section; it closes
+    the section that started at the previous mark (or when the profiler was created).
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.sections = []
+        self._start = self._last = self._snapshot()
+
+    def _snapshot(self):
+        proto = self.model.Proto()
+        return time.perf_counter(), len(proto.variables), len(proto.constraints), _rss_bytes()
+
+    @staticmethod
+    def _delta(name, before, after):
+        mem = None if before[3] is None or after[3] is None else round((after[3] - before[3]) / 2**20, 2)
+        return {
+            "section": name,
+            "time_s": round(after[0] - before[0], 4),
+            "variables": after[1] - before[1],
+            "constraints": after[2] - before[2],
+            "memory_mb": mem,
+        }
+
+    def mark(self, name):
+        now = self._snapshot()
+        self.sections.append(self._delta(name, self._last, now))
+        self._last = now
+
+    def report(self):
+        """Dict with the per-section rows and the totals since the profiler was created."""
+        return {
+            "sections": list(self.sections),
+            "total": self._delta("total", self._start, self._last),
+        }
+
+
+def format_build_report(report):
+    """Plain-text table of a BuildProfiler report, for printing on the command line."""
+    lines = [f"{'section':<36}{'time (s)':>10}{'vars':>10}{'constrs':>10}{'mem (MB)':>10}"]
+    for row in report["sections"] + [report["total"]]:
+        mem = "-" if row["memory_mb"] is None else f"{row['memory_mb']:.1f}"
+        lines.append(f"{row['section']:<36}{row['time_s']:>10.3f}{row['variables']:>10}{row['constraints']:>10}{mem:>10}")
+    return "\n".join(lines)
+
+
+def presolve_time(log_lines):
+    """Seconds until 'Starting search at Xs' in a CP-SAT search log (None if not found)."""
+    for line in log_lines:
+        if line.startswith("Starting search at "):
+            try:
+                return float(line.split()[3].rstrip("s"))
+            except (IndexError, ValueError):
+                return None
+    return None
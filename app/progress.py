@@ -0,0 +1,55 @@
+from ortools.sat.python import cp_model
+
+
+def print_incumbent(event):
+    phase = f" ({event['phase']})" if "phase" in event else ""
+    print(f"[{event['elapsed_s']:7.1f}s]{phase} objective {event['objective']:.3f}, "
+          f"bound {event['best_bound']:.3f}, gap {100 * event['gap']:.1f}%, "
+          f"uncovered shifts {event['uncovered']}")
+
+
+class IncumbentCallback(cp_model.CpSolverSolutionCallback):
+    """
+    CP-SAT solution callback that publishes every improving incumbent as a dict with
+    elapsed_s, objective, best_bound, gap and uncovered (number of unfilled shifts).
+    on_incumbent(event) is called from the solver thread, so it should return quickly.
+    For a staged solve offset_s (time spent in earlier phases) is added to elapsed_s and
+    events carry the phase name.
+    """
+
+    def __init__(self, uncovered_vars, on_incumbent=print_incumbent, offset_s=0.0, phase=None):
+        super().__init__()
+        self.uncovered_vars = list(uncovered_vars)
+        self.on_incumbent = on_incumbent
+        self.offset_s = offset_s
+        self.phase = phase
+        self.best_objective = None
+        self.events = []
+
+    def on_solution_callback(self):
+        objective = self.ObjectiveValue()
+        # the objective is minimized, only report strict improvements
+        if self.best_objective is not None and objective >= self.best_objective:
+            return
+        self.best_objective = objective
+        bound = self.BestObjectiveBound()
+        event = {
+            "elapsed_s": round(self.offset_s + self.WallTime(), 2),
+            "objective": objective,
+            "best_bound": bound,
+            "gap": abs(objective - bound) / max(1.0, abs(objective)),
+            "uncovered": sum(self.Value(v) for v in self.uncovered_vars),
+        }
+        if self.phase is not None:
+            event["phase"] = self.phase
+        self.events.append(event)
+        if self.on_incumbent is not None:
+            self.on_incumbent(event)
+
+
+def time_to_gap(incumbents, gap):
+    """Seconds until the first incumbent with a relative gap of at most gap (None if never)."""
+    for event in incumbents:
+        if event['gap'] <= gap:
+            return event['elapsed_s']
+    return None
@@ -0,0 +1,132 @@
+import datetime as dt
+
+import pandas as pd
+
+from .preprocessing import build_availability_pairs, minutes_of_day, shift_helper_maps
+from .progress import print_incumbent
+from .solver import auto_rooster
+
+# Local re-plan after a late change (sick call, leaving employee, extra shift). Everything
+# outside the neighbourhood of the change is pinned and only the freed shifts are re-solved,
+# so the rest of the roster stays as it was.
+
+
+def _add_shifts(shifts, added):
+    """
+    Appends the added shifts ({shift_name, shift_date}) as copies of an existing shift with the
+    same name (same weekday if there is one) moved to the new date. Returns (shifts, new ids).
+    """
+    start = pd.to_datetime(shifts['shift_date']).min().normalize()
+    rows, new_ids = [], []
+    next_id = int(shifts['shift_id'].max()) + 1
+    for item in added:
+        date = pd.Timestamp(item['shift_date']).normalize()
+        same_name = shifts[shifts['shift_name'] == item['shift_name']]
+        if same_name.empty:
+            raise ValueError(f"Unknown shift name {item['shift_name']!r} in added shifts")
+        same_day = same_name[same_name['day_of_week'] == date.weekday()]
+        row = (same_day if not same_day.empty else same_name).iloc[0].copy()
+        week = (date - start).days // 7 + 1  # preprocess_data numbers weeks from 1
+        row['global_week'] = int(row['global_week']) + week - int(row['week'])
+        row['week'] = week
+        row['shift_date'] = date
+        row['day_of_week'] = date.weekday()
+        row['absolute_day'] = (date - start).days
+        row['day_key'] = (week, date.weekday())
+        row['shift_id'] = next_id
+        if 'required' in item:
+            row['required'] = item['required']
+        rows.append(row)
+        new_ids.append(next_id)
+        next_id += 1
+    return pd.concat([shifts, pd.DataFrame(rows)], ignore_index=True), new_ids
+
+
+def apply_delta(data, delta):
+    """
+    Preprocessed data with a late change applied. delta may contain:
+    - unavailable: list of {employee_id, date, start=None, end=None} (times as datetime.time,
+      no times blocks the whole day)
+    - removed_employees: list of employee IDs that can no longer be scheduled
+    - added_shifts: list of {shift_name, shift_date, required (optional)}
+    Returns (data, affected_dates, affected_employees, added_shift_ids).
+    """
+    data = dict(data)
+    # the shifts and blocked pairs change, so precomputed eligible pairs (ProblemInstance) are stale
+    data.pop('eligible_pairs', None)
+    affected_dates, affected_employees = set(), set()
+
+    added_ids = []
+    if delta.get('added_shifts'):
+        shifts, added_ids = _add_shifts(data['shifts'], delta['added_shifts'])
+        data['shifts'] = shifts
+        data.update(shift_helper_maps(shifts))
+        affected_dates |= {pd.Timestamp(item['shift_date']).date() for item in delta['added_shifts']}
+
+    if delta.get('unavailable'):
+        onb_rows = pd.DataFrame({
+            'Medewerker id': [str(item['employee_id']) for item in delta['unavailable']],
+            'Datum': [pd.Timestamp(item['date']).date() for item in delta['unavailable']],
+            'Beschikbaarheid': 'Niet beschikbaar',
+            'Beschikbaarheid_tijd_vanaf': [item.get('start') for item in delta['unavailable']],
+            'Beschikbaarheid_tijd_tm': [item.get('end') for item in delta['unavailable']],
+        })
+        onb_rows['start_min'] = minutes_of_day(onb_rows['Beschikbaarheid_tijd_vanaf'])
+        onb_rows['end_min'] = minutes_of_day(onb_rows['Beschikbaarheid_tijd_tm'])
+        availability = build_availability_pairs(data['shifts'], onb_rows, data['emp_ids'])
+        data['onb'] = pd.concat([data['onb'], onb_rows], ignore_index=True)
+        data['blocked_pairs'] = data['blocked_pairs'] | availability['blocked_pairs']
+        data['unavailable_dates'] = {emp: set(dates) for emp, dates in data['unavailable_dates'].items()}
+        for emp, dates in availability['unavailable_dates'].items():
+            data['unavailable_dates'].setdefault(emp, set()).update(dates)
+        affected_dates |= set(onb_rows['Datum'])
+        affected_employees |= set(onb_rows['Medewerker id'])
+
+    removed = {str(emp) for emp in delta.get('removed_employees', [])}
+    if removed:
+        data['blocked_pairs'] = data['blocked_pairs'] | {(s, emp) for s in data['shifts']['shift_id'] for emp in removed}
+        affected_employees |= removed
+
+    return data, affected_dates, affected_employees, added_ids
+
+
+def replan(data, assignments_df, delta, days=1, free_employees=True, time_limit_s=10,
+           on_incumbent=print_incumbent, num_workers=None):
+    """
+    Re-solves only the neighbourhood of a late change (see apply_delta) and keeps the rest
+    of assignments_df (an auto_rooster result) unchanged. Freed are:
+    - all shifts on the affected dates ± days
+    - with free_employees, every shift of the affected employees (so their hours can move)
+    - shifts whose pinned assignment is no longer eligible (done by auto_rooster)
+    Returns the auto_rooster result dict plus 'replan' (freed, pinned and changed shifts) and
+    'data' (the changed preprocessed data, to validate the result against).
+    """
+    data, affected_dates, affected_employees, added_ids = apply_delta(data, delta)
+    current = {int(s): (str(emp) if filled else None)
+               for s, emp, filled in zip(assignments_df['shift_id'], assignments_df['employee_id'], assignments_df['shift_filled'])}
+
+    window = {d + dt.timedelta(days=k) for d in affected_dates for k in range(-days, days + 1)}
+    shift_dates = pd.to_datetime(data['shifts']['shift_date']).dt.date
+    free = set(data['shifts'].loc[shift_dates.isin(window).to_numpy(), 'shift_id'].astype(int)) | set(added_ids)
+    if free_employees:
+        free |= {s for s, emp in current.items() if emp in affected_employees}
+    fixed = {s: emp for s, emp in current.items() if s not in free}
+    hint = {s: emp for s, emp in current.items() if emp is not None and emp not in affected_employees}
+    print(f"Re-plan: {len(free)} shifts freed around {sorted(affected_dates)} "
+          f"and employees {sorted(affected_employees)}, {len(fixed)} pinned")
+
+    result = auto_rooster(data, time_limit_s=time_limit_s, on_incumbent=on_incumbent, num_workers=num_workers,
+                          hint=hint, fixed=fixed)
+    if result is None:
+        return None
+    new = result['assignments_df']
+    new = {int(s): (str(emp) if filled else None)
+           for s, emp, filled in zip(new['shift_id'], new['employee_id'], new['shift_filled'])}
+    result['replan'] = {
+        "freed_shifts": len(free),
+        "pinned_shifts": len(fixed),
+        "changed_shifts": sorted(s for s in new if current.get(s, None) != new[s] and s not in added_ids),
+        "added_shifts": added_ids,
+    }
+    result['data'] = data
+    return result
@@ -1,15 +1,179 @@
 
+import numpy as np
 import pandas as pd
 from ortools.sat.python import cp_model
 import datetime as dt
 
-def auto_rooster(data, time_limit_s=60):
+from .channels import ChannelRegistry
+from .params import solver_workers
+from .preprocessing import normalized_dates
+from .progress import print_incumbent
+from .profiling import BuildProfiler, format_build_report, presolve_time
+from .stopping import StopCallback, coverage_lower_bound, stop_without_improvement, stop_reason
+from .objective import (UNDER_COVERAGE_TABLE, get_weights, square_table, add_convex_penalty, weighted_objective,
+                        objective_breakdown, format_breakdown)
+
+
+# helper to get previous consecutive block using dates (returns list of dates)
+def get_last_consecutive_block_dates(prev_assignments_df, emp, is_night=False):
+    df = prev_assignments_df[prev_assignments_df['employee_id'] == emp].copy()
+    if is_night:
+        df = df[df['is_night'] == True]
+    if df.empty:
+        return []
+    # normalized dates sorted ascending
+    days = sorted(pd.to_datetime(df['shift_date']).dt.date.unique().tolist())
+    # walk from end backwards to collect consecutive tail
+    block = []
+    for d in reversed(days):
+        if not block:
+            block.append(d)
+        else:
+            if (pd.to_datetime(block[-1]) - pd.to_datetime(d)).days == 1:
+                block.append(d)
+            else:
+                break
+    return list(reversed(block))
+
+
+def get_pattern_phase_offset(prev_assignments_df, emp, dates_list, period, is_night=False):
+    """
+    Phase of a fixed on/off pattern (11.2) derived from the last consecutive block
+    in the previous schedule. Returns None when the solver may choose the phase.
+    """
+    prev_shift_block = get_last_consecutive_block_dates(prev_assignments_df, emp, is_night=is_night)
+    if not prev_shift_block:
+        return None
+    try:
+        base = pd.to_datetime(dates_list[0])
+        prev_first = pd.to_datetime(prev_shift_block[0])
+        return (prev_first - base).days % period
+    except Exception:
+        return None
+
+
+def compute_eligible_pairs(shifts, emp_table, emp_index, blocked_pairs, unavailable_dates, emp_ids, prev_assignments, shifts_by_date, night_shifts, shift_type_map, dates_list):
+    """
+    Pre-pass for auto_rooster: returns the set of (shift_id, emp) pairs that survive the
+    hard rules that fix an assignment to 0 on their own (deskundigheid, voorkeur dag/avond/nacht,
+    age, unavailability, rest after a previous night block and fixed patterns).
+    Only these pairs get a decision variable; every other pair is treated as 0.
+    """
+    all_shift_ids = shifts['shift_id'].tolist()
+    night_set = set(night_shifts)
+    blocked = {emp: set() for emp in emp_ids}
+
+    # 6) Unavailable times (date-aware), joined onto the shifts in preprocessing
+    for (s, emp) in blocked_pairs:
+        if emp in blocked:
+            blocked[emp].add(s)
+
+    # 8) Deskundigheid: required level per shift
+    req_level = {}
+    for _, shift_row in shifts.iterrows():
+        req_quals = shift_row['qualification']
+        req_level[int(shift_row['shift_id'])] = max(req_quals) if isinstance(req_quals, list) else int(req_quals)
+
+    for emp in emp_ids:
+        i = emp_index[emp]
+        voorkeur_nacht = emp_table['voorkeur_nacht'][i]
+        out = blocked[emp]
+
+        # 7.2) last previous block of >= 3 nights blocks the first two days after it
+        prev_nights = get_last_consecutive_block_dates(prev_assignments, emp, is_night=True)
+        if len(prev_nights) >= 3:
+            dprev = prev_nights[-1]
+            for k in [1, 2]:
+                block_d = (pd.to_datetime(dprev) + pd.Timedelta(days=k)).date()
+                out.update(shifts_by_date.get(block_d, []))
+
+        # 7.4) Age > 55: no night shifts (anyone whose voorkeur_nacht is not 'niet' is exempt)
+        if voorkeur_nacht == 'niet' and emp_table['leeftijd'][i] >= 55:
+            out.update(night_set)
+
+        # 8) employee can only work shift if emp_level <= req_level
+        emp_level = emp_table['min_deskundigheid'][i]
+        out.update(s for s in all_shift_ids if emp_level > req_level[s])
+
+        # 9) voorkeur_nacht
+        if voorkeur_nacht == 'Niet':
+            out.update(night_set)
+        elif voorkeur_nacht == 'uitsluitend':
+            out.update(s for s in all_shift_ids if s not in night_set)
+
+        # 11.1) voorkeur_dagdelen
+        day_emp = emp_table['voorkeur_dag'][i]
+        if day_emp == 'niet':
+            out.update(s for s in all_shift_ids if shift_type_map.get(s, 'Other') in {'D', 'A'})
+        elif day_emp == 'uitsluitend':
+            out.update(s for s in all_shift_ids if shift_type_map.get(s, 'Other') not in {'D', 'A'})
+        if emp_table['voorkeur_avond'][i] == 'niet':
+            out.update(s for s in all_shift_ids if shift_type_map.get(s, 'Other') in {'A'})
+        elif day_emp == 'uitsluitend':
+            out.update(s for s in all_shift_ids if shift_type_map.get(s, 'Other') not in {'A'})
+        if voorkeur_nacht == 'niet':
+            out.update(night_set)
+
+        # 11.2) fixed pattern: off days (and unavailable on days) of a known phase
+        patroon = emp_table['patroon'][i]
+        if patroon and patroon != []:
+            night = voorkeur_nacht == 'uitsluitend'
+            on_days = patroon[0]
+            period = patroon[0] + patroon[1]
+            prev_phase_offset = get_pattern_phase_offset(prev_assignments, emp, dates_list, period, is_night=night)
+            if prev_phase_offset is not None:
+                emp_unavailable = unavailable_dates.get(emp, set())
+                for d in dates_list:
+                    pos = ((pd.to_datetime(d) - pd.to_datetime(dates_list[0])).days - prev_phase_offset) % period
+                    if pos >= on_days or d in emp_unavailable:
+                        out.update(shifts_by_date.get(d, []))
+
+        # 11.3) rest after a previous work block at the start of the horizon
+        R = int(emp_table['rust_na_werkperiode'][i])
+        if R > 0 and get_last_consecutive_block_dates(prev_assignments, emp, is_night=False):
+            for d in dates_list[:R]:
+                out.update(shifts_by_date.get(d, []))
+
+    return {(s, emp) for emp in emp_ids for s in all_shift_ids if s not in blocked[emp]}
+
+
+def build_shift_maps(shifts):
+    """
+    Date-based helper maps of a shifts DataFrame whose shift_date is normalized:
+    (dates_list, shifts_by_date, night_shifts_by_date, shift_type_map).
+    """
+    dates = shifts['shift_date'].dt.date
+    dates_list = sorted(dates.unique().tolist())  # list of date objects
+    ids = shifts['shift_id']
+    night = shifts['is_night'].to_numpy(dtype=bool)
+
+    # shifts_by_date: date -> [shift_id, ...]
+    shifts_by_date = {d: g.tolist() for d, g in ids.groupby(dates, sort=False)}
+
+    # night_shifts_by_date: date -> [night_shift_id,...]
+    night_shifts_by_date = {d: g.tolist() for d, g in ids[night].groupby(dates[night], sort=False)}
+
+    #shift type mapping
+    types = np.select([shifts['is_day'].to_numpy(dtype=bool), shifts['is_evening'].to_numpy(dtype=bool), night],
+                      ['D', 'A', 'N'], 'Other')
+    shift_type_map = dict(zip(ids.tolist(), types.tolist()))
+
+    return dates_list, shifts_by_date, night_shifts_by_date, shift_type_map
+
+
+def auto_rooster(data, time_limit_s=60, on_incumbent=print_incumbent, num_workers=None, hint=None, fixed=None, weights="default",
+                 staged=False, phase1_share=0.2, solver_params=None, stop=None):
     """
     Main function to create an automatic schedule using OR-Tools CP-SAT solver.
     Expects preprocessed data dictionary with keys:
     - shifts: DataFrame of shifts to be filled
     - workers: DataFrame of workers with their attributes
+    - emp_table: Dict of per-employee attribute arrays (see build_employee_table)
+    - emp_index: Dict mapping employee ID to its row in emp_table
     - onb: DataFrame of unavailable times
+    - blocked_pairs: Set of (shift_id, emp) pairs that overlap an unavailable time
+    - preferred_pairs: Set of (shift_id, emp) pairs on dates marked 'beschikbaar'
+    - unavailable_dates: Dict mapping employee ID to the set of dates with unavailability
     - emp_ids: List of employee IDs
     - dur_min: Dict mapping shift_id to duration in minutes
     - shifts_by_week: Dict mapping week number to list of shift_ids
@@ -17,18 +181,48 @@ def auto_rooster(data, time_limit_s=60):
     - night_shifts: List of shift_ids that are night shifts
     - night_shifts_by_week: Dict mapping week number to list of night shift_ids
     - prev_assignments: DataFrame of previous assignments (can be empty)
-    
+
+    on_incumbent(event) is called for every improving solution found during the solve
+    (see IncumbentCallback), pass None to disable progress reporting.
+    num_workers is the number of parallel CP-SAT search workers (default: the CPUs available
+    to this process, see app/params.py); solver_params are extra CP-SAT parameters by name
+    (see resolve_profile).
+    hint is an optional warm start {shift_id: emp} (see app/hints.py); hinted pairs that are
+    not eligible are ignored and their shifts are hinted as uncovered.
+    fixed {shift_id: emp or None} pins shifts to an employee (None: uncovered), used by the
+    local re-plan in app/repair.py; a pinned pair that is no longer eligible leaves the shift free.
+    weights is an integer weight profile name or dict (see app/objective.py).
+    staged solves lexicographically: phase 1 minimizes the uncovered shifts only for
+    phase1_share of time_limit_s, its value is then fixed as a constraint and phase 2
+    optimizes the full objective in the remaining time, warm started from phase 1.
+    stop {soft_gap, no_improvement_s, objective_target} ends the search before the time
+    limit (see app/stopping.py); a staged phase 1 always stops once the coverage reaches
+    its lower bound.
+
     Returns a dictionary with:
     - assignments_df: DataFrame of shift assignments
     - all_assignments_df: DataFrame of all assignments including previous
     - uncovered_shifts: List of shift_ids that could not be covered
     - objective_value: Objective value of the solution
+    - best_bound: Best proven lower bound on the objective
     - solver_status: Status of the solver (OPTIMAL, FEASIBLE, etc.)
+    - solve_time_s: Wall time spent in solver.Solve
+    - incumbents: List of improving solutions (elapsed_s, objective, best_bound, gap, uncovered)
+    - build_profile: Per-section build time, variables, constraints and memory delta (see BuildProfiler)
+    - hinted_shifts: Number of shifts with a usable hint (0 without hint)
+    - objective_breakdown: Per objective term the raw sum, weight and weighted value
+    - presolve_s: Seconds CP-SAT spent in presolve (from its search log)
+    - phases: For a staged solve per phase its time limit, status, objective, bound, time and stop reason
+    - stop_reason: Why the solve ended (optimal, time_limit, soft_gap, no_improvement, objective_target)
     """
     
-    shifts = data['shifts'].copy()
-    workers = data['workers'].copy()
-    onb = data['onb'].copy()
+    shifts = data['shifts']
+    workers = data['workers']
+    emp_table = data['emp_table']
+    emp_index = data['emp_index']
+    blocked_pairs = data['blocked_pairs']
+    preferred_pairs = data['preferred_pairs']
+    unavailable_dates = data['unavailable_dates']
     emp_ids = data['emp_ids']
     dur_min = data['dur_min']
     shifts_by_week = data['shifts_by_week']
@@ -48,185 +242,137 @@ def auto_rooster(data, time_limit_s=60):
     print(f"start_date: {shifts['shift_date'].min().date()}, end_date: {shifts['shift_date'].max().date()}")
     print(f"Shifts: {len(shifts)}, Workers: {len(workers)}")
 
-    # make sure shift_date is datetime (date or Timestamp)
-    shifts['shift_date'] = pd.to_datetime(shifts['shift_date']).dt.normalize()  # midnight timestamps
-    prev_assignments['shift_date'] = pd.to_datetime(prev_assignments['shift_date']).dt.normalize()
+    # midnight timestamps; preprocessed (or cached) frames already are and are used as they are
+    shifts = normalized_dates(shifts)
+    prev_assignments = normalized_dates(prev_assignments)
 
     # helper lists and maps using dates
-    dates_list = sorted(shifts['shift_date'].dt.date.unique().tolist())  # list of date objects
+    dates_list, shifts_by_date, night_shifts_by_date, shift_type_map = build_shift_maps(shifts)
     num_weeks = len(weeks)
 
-    # shifts_by_date: date -> [shift_id, ...]
-    shifts_by_date = {}
-    for _, r in shifts.iterrows():
-        s = int(r['shift_id'])
-        d = pd.to_datetime(r['shift_date']).date()
-        shifts_by_date.setdefault(d, []).append(s)
-
-    # night_shifts_by_date: date -> [night_shift_id,...]
-    night_shifts_by_date = {}
-    for _, r in shifts[shifts['is_night']].iterrows():
-        s = int(r['shift_id'])
-        d = pd.to_datetime(r['shift_date']).date()
-        night_shifts_by_date.setdefault(d, []).append(s)
-        
-    #shift type mapping
-    shift_type_map = {}
-    for _, r in shifts.iterrows():
-        sid = int(r['shift_id'])
-        shift_name = r['shift_name']
-        #if 'D' in shift_name:
-        if r['is_day']:
-            shift_type_map[sid] = 'D'
-        #elif 'A' in shift_name:
-        elif r['is_evening']:
-            shift_type_map[sid] = 'A'
-        #elif 'N' in shift_name:
-        elif r['is_night']:
-            shift_type_map[sid] = 'N'
-        else:
-            shift_type_map[sid] = 'Other'
-
-
-    # helper to get previous consecutive block using dates (returns list of dates)
-    def get_last_consecutive_block_dates(prev_assignments_df, emp, is_night=False):
-        df = prev_assignments_df[prev_assignments_df['employee_id'] == emp].copy()
-        if is_night:
-            df = df[df['is_night'] == True]
-        if df.empty:
-            return []
-        # normalized dates sorted ascending
-        days = sorted(pd.to_datetime(df['shift_date']).dt.date.unique().tolist())
-        # walk from end backwards to collect consecutive tail
-        block = []
-        for d in reversed(days):
-            if not block:
-                block.append(d)
-            else:
-                if (pd.to_datetime(block[-1]) - pd.to_datetime(d)).days == 1:
-                    block.append(d)
-                else:
-                    break
-        return list(reversed(block))
 
     model = cp_model.CpModel()
-
-    # Decision variables: x[(shift_id, emp)]
+    # per-section wall time, model size and memory, see app/profiling.py
+    prof = BuildProfiler(model)
+
+    # Eligible (shift, employee) pairs; every other pair is fixed at 0 and gets no variable.
+    # Data loaded from a ProblemInstance (cache hit) carries them already, see app/instance.py
+    eligible = data.get('eligible_pairs')
+    if eligible is None:
+        eligible = compute_eligible_pairs(shifts, emp_table, emp_index, blocked_pairs, unavailable_dates, emp_ids,
+                                          prev_assignments, shifts_by_date, night_shifts, shift_type_map, dates_list)
+    # Pinned shifts keep only their own pair
+    pinned = {}
+    if fixed:
+        pinned = {s: emp for s, emp in fixed.items() if emp is None or (s, emp) in eligible}
+        eligible = {(s, emp) for (s, emp) in eligible if s not in pinned or pinned[s] == emp}
+        print(f"Fixed shifts: {len(pinned)} of {len(shifts)} ({len(fixed) - len(pinned)} freed, no longer eligible)")
+    prof.mark("eligibility")
+
+    # Decision variables: x[(shift_id, emp)] for eligible pairs only
     x = {(s, emp): model.NewBoolVar(f"x_s{s}_e{emp}")
-         for s in shifts['shift_id'] for emp in emp_ids}
+         for s in shifts['shift_id'] for emp in emp_ids if (s, emp) in eligible}
+
+    emps_by_shift = {s: [] for s in shifts['shift_id']}
+    for (s, emp) in x:
+        emps_by_shift[s].append(emp)
+
+    def emp_attr(emp, col):
+        """O(1) lookup in the preprocessed employee table."""
+        return emp_table[col][emp_index[emp]]
+
+    def xs(shift_ids, emp):
+        """Assignment variables of emp for shift_ids (missing keys are 0)."""
+        return [x[(s, emp)] for s in shift_ids if (s, emp) in x]
+
+    print(f"Decision variables: {len(x)} of {len(shifts) * len(emp_ids)} (shift, employee) pairs eligible")
 
     # uncovered
     u = {s: model.NewBoolVar(f"uncovered_s{s}") for s in shifts['shift_id']}
 
-    # n_emp_date: 1 iff employee emp works a night on date d (date object)
-    n_emp_date = {}
-    for emp in emp_ids:
-        for d in dates_list:
-            b = model.NewBoolVar(f"n_emp{emp}_d{d.isoformat()}")
-            n_emp_date[(emp, d)] = b
-            night_ids = night_shifts_by_date.get(d, [])
-            if night_ids:
-                # if b then sum >=1, else sum == 0
-                model.Add(sum(x[(s, emp)] for s in night_ids) >= 1).OnlyEnforceIf(b)
-                model.Add(sum(x[(s, emp)] for s in night_ids) == 0).OnlyEnforceIf(b.Not())
-            else:
-                model.Add(b == 0)
-    
-    # emp_date: 1 iff employee emp works on date d (date object)
-    emp_date = {}
-    for emp in emp_ids:
-        for d in dates_list:
-            b = model.NewBoolVar(f"n_emp{emp}_d{d.isoformat()}")
-            emp_date[(emp, d)] = b
-            shift_ids = shifts_by_date.get(d, [])
-            if shift_ids:
-                # if b then sum >=1, else sum == 0
-                model.Add(sum(x[(s, emp)] for s in shift_ids) >= 1).OnlyEnforceIf(b)
-                model.Add(sum(x[(s, emp)] for s in shift_ids) == 0).OnlyEnforceIf(b.Not())
-            else:
-                model.Add(b == 0)
+    # Warm start: hint every decision variable, a shift without usable hint is hinted uncovered
+    hinted_shifts = 0
+    if hint:
+        for (s, emp), var in x.items():
+            model.AddHint(var, hint.get(s) == emp)
+        for s, var in u.items():
+            covered = (s, hint.get(s)) in x
+            hinted_shifts += covered
+            model.AddHint(var, not covered)
+        print(f"Warm start hint: {hinted_shifts} of {len(u)} shifts")
+
+    # Derived day-level indicators (works on date, works night on date, works weekend, block start/end)
+    # are created once by the channel registry and shared by all sections below
+    weekend_days = [5, 6]  # day_of_week indices for Saturday and Sunday
+    weekend_shifts_by_week = {}
+    for w in weeks:
+        weekend_shifts_by_week[w] = shifts.loc[(shifts['week'] == w) & (shifts['day_of_week'].isin(weekend_days)), 'shift_id'].tolist()
+    channels = ChannelRegistry(model, xs, shifts_by_date, night_shifts_by_date, weekend_shifts_by_week)
+    prof.mark("variables and channels")
 
     ### Constraints ###
 
     # 1) Coverage
     for s in shifts['shift_id']:
-        model.Add(sum(x[(s, emp)] for emp in emp_ids) + u[s] == 1)
+        model.Add(sum(x[(s, emp)] for emp in emps_by_shift[s]) + u[s] == 1)
+    for s, emp in pinned.items():
+        model.Add(u[s] == (1 if emp is None else 0))
+    prof.mark("C1 coverage")
 
     # 2) At most one shift per employee per calendar day (use shifts_by_date)
     for emp in emp_ids:
         for d, s_list in shifts_by_date.items():
-            if s_list:
-                model.AddAtMostOne(x[(s, emp)] for s in s_list)
+            day_vars = xs(s_list, emp)
+            if len(day_vars) > 1:
+                model.AddAtMostOne(day_vars)
+    prof.mark("C2 one shift per day")
 
     # 3) After night shift, no day/evening next day (but night allowed next day)
+    night_ids = set(shifts.loc[shifts['is_night'], 'shift_id'])
+    non_night_shifts_by_date = {d: [s for s in s_list if s not in night_ids] for d, s_list in shifts_by_date.items()}
     # For each emp and each date d: if emp works any night on d then they cannot work non-night shifts on d+1
     for emp in emp_ids:
         for d in dates_list:
-            next_d = (pd.to_datetime(d) + pd.Timedelta(days=1)).date()
+            next_d = d + dt.timedelta(days=1)
             if next_d not in shifts_by_date:
                 continue
             night_ids_today = night_shifts_by_date.get(d, [])
-            next_day_non_night_ids = [s for s in shifts_by_date.get(next_d, []) if not bool(shifts.loc[shifts['shift_id'] == s, 'is_night'].iloc[0])]
-            if not night_ids_today or not next_day_non_night_ids:
+            next_day_non_night_ids = non_night_shifts_by_date.get(next_d, [])
+            night_vars_today = xs(night_ids_today, emp)
+            next_day_vars = xs(next_day_non_night_ids, emp)
+            if not night_vars_today or not next_day_vars:
                 continue
-            # sum(x_night_today) + sum(x_non_night_nextday) <= len(night_ids_today)
-            # if any night worked today -> none of next_day_non_night_ids can be worked.
-            model.Add(
-                sum(x[(s, emp)] for s in night_ids_today) +
-                sum(x[(s, emp)] for s in next_day_non_night_ids)
-                <= len(night_ids_today)
-            )
+            # sum(x_night_today) + sum(x_non_night_nextday) <= 1
+            # if any night worked today -> none of next_day_non_night_ids can be worked
+            # (with len(night_ids_today) as bound a night plus a day shift fitted when there are 2 nights)
+            model.Add(sum(night_vars_today) + sum(next_day_vars) <= 1)
+    prof.mark("C3 no day/evening after night")
 
     # 4) Max work days per week (kept weekly using shifts_by_week)
     for emp in emp_ids:
-        max_days = int(workers.loc[workers['medewerker_id'] == emp, 'max_days_per_week'].iloc[0])
+        max_days = int(emp_attr(emp, 'max_days_per_week'))
         for w in weeks:
             s_list = shifts_by_week.get(w, [])
-            if s_list:
-                model.Add(sum(x[(s, emp)] for s in s_list) <= max_days)
+            week_vars = xs(s_list, emp)
+            if week_vars:
+                model.Add(sum(week_vars) <= max_days)
+    prof.mark("C4 max days per week")
 
     # 5) Contract hours averaged across horizon
     for emp in emp_ids:
-        cap_minutes = int(workers.loc[workers['medewerker_id'] == emp, 'contract_minutes'].iloc[0])
+        cap_minutes = int(emp_attr(emp, 'contract_minutes'))
         total_shifts = list(shifts['shift_id'].tolist())
-        model.Add(sum(dur_min[s] * x[(s, emp)] for s in total_shifts) <= cap_minutes * num_weeks)
+        model.Add(sum(dur_min[s] * x[(s, emp)] for s in total_shifts if (s, emp) in x) <= cap_minutes * num_weeks)
+    prof.mark("C5 contract hours")
 
-    # 6) Respect unavailable times (date-aware)
-    # assume onb['Datum'] is a date or datetime; times in 'Beschikbaarheid_tijd_vanaf' and '_tm' are time-like
-    for _, r in onb.iterrows():
-        emp = r['Medewerker id']
-        if emp not in emp_ids:
-            continue
-        date_unb = pd.to_datetime(r['Datum']).date()
-        besch = str(r['Beschikbaarheid']).lower()
-        if besch == 'beschikbaar':
-            continue
-        start_unb = r.get('Beschikbaarheid_tijd_vanaf', None)
-        end_unb = r.get('Beschikbaarheid_tijd_tm', None)
-        # if times are strings, try to parse to time
-        if isinstance(start_unb, str):
-            start_unb = pd.to_datetime(start_unb).time()
-        if isinstance(end_unb, str):
-            end_unb = pd.to_datetime(end_unb).time()
-        shifts_that_day = shifts_by_date.get(date_unb, [])
-        for s in shifts_that_day:
-            shift_start = shifts.loc[shifts['shift_id'] == s, 'start_time'].iloc[0]
-            shift_end = shifts.loc[shifts['shift_id'] == s, 'end_time'].iloc[0]
-            # overlap check
-            if start_unb is not None and end_unb is not None:
-                overlap = not (shift_end <= start_unb or shift_start >= end_unb)
-            else:
-                # if no times provided, treat as fully unavailable that day
-                overlap = True
-            if overlap:
-                model.Add(x[(s, emp)] == 0)
+    # 6) Respect unavailable times (date-aware): handled by compute_eligible_pairs
 
     # 7.1) Max consecutive nights (consider prev_assignments)
     for emp in emp_ids:
         #max_consec = 7 if emp in {'602859-1'} else 5  # your CAO exemption set uses strings in your code earlier
         #If emp has non-empty patroon column and has value 'uitsluitend' for voorkeur_nacht, set max_consec to first value of patroon
-        patroon = workers.loc[workers['medewerker_id'] == emp, 'patroon'].iloc[0]
-        voorkeur_nacht = workers.loc[workers['medewerker_id'] == emp, 'voorkeur_nacht'].iloc[0]
+        patroon = emp_attr(emp, 'patroon')
+        voorkeur_nacht = emp_attr(emp, 'voorkeur_nacht')
         # default value
         max_consec = 5
         try:
@@ -262,45 +408,28 @@ def auto_rooster(data, time_limit_s=60):
                 # find all night shift ids in the current horizon that fall on those dates
                 night_shift_ids_in_window = [s for d in window_curr_dates for s in night_shifts_by_date.get(d, [])]
                 # enforce at most max_consec nights in that window
-                model.Add(sum(x[(s, emp)] for s in night_shift_ids_in_window) <= max_consec)
+                model.Add(sum(xs(night_shift_ids_in_window, emp)) <= max_consec)
+    prof.mark("C7.1 max consecutive nights")
 
     # 7.2) After >=3 consecutive nights => 46h rest (2 calendar days)
-    # Build boolean n_emp_date already created. Use OnlyEnforceIf with cond_lits.
+    # Use the works-night-on-date channels with OnlyEnforceIf on cond_lits.
+    # The tail of a previous block is handled in compute_eligible_pairs.
     for emp in emp_ids:
-        # handle prev_assignments tail: if the last prev block >= 3 and ends on day Dprev,
-        # then block Dprev+1 and Dprev+2 (if in current horizon)
-        prev_nights = get_last_consecutive_block_dates(prev_assignments, emp, is_night=True)
-        if len(prev_nights) >= 3:
-            dprev = prev_nights[-1]
-            for k in [1, 2]:
-                block_d = (pd.to_datetime(dprev) + pd.Timedelta(days=k)).date()
-                if block_d in dates_list:
-                    # block all shifts that day for this employee
-                    for s in shifts_by_date.get(block_d, []):
-                        model.Add(x[(s, emp)] == 0)
-
-        # now enforce within horizon using OnlyEnforceIf with n_emp_date variables
         for idx in range(2, len(dates_list)):
             d2 = dates_list[idx]
             d1 = dates_list[idx - 1]
             d0 = dates_list[idx - 2]
-            # need d2+1 to exist to form condition "not n(d2+1)"
+            # need d2+1 in the horizon for the condition "not n(d2+1)", else there is nothing to block
             d2p1 = (pd.to_datetime(d2) + pd.Timedelta(days=1)).date()
-            if d2p1 not in n_emp_date and d2p1 not in dates_list:
+            if d2p1 not in dates_list:
                 continue
             # cond literals: n(d0) & n(d1) & n(d2) & not n(d2+1)
             cond = [
-                n_emp_date[(emp, d0)],
-                n_emp_date[(emp, d1)],
-                n_emp_date[(emp, d2)]
+                channels.works_night_on(emp, d0),
+                channels.works_night_on(emp, d1),
+                channels.works_night_on(emp, d2),
+                channels.works_night_on(emp, d2p1).Not(),
             ]
-            # n(d2+1) might not exist if outside horizon; treat absent as 0; but we only enforce if d2+1 is in horizon
-            if d2p1 in dates_list:
-                cond.append(n_emp_date[(emp, d2p1)].Not())
-            else:
-                # if next day not in horizon we treat condition only requiring n(d0)&n(d1)&n(d2)
-                # but we won't be able to block shifts in missing dates, so skip
-                continue
 
             # blocked days: d2+1 and d2+2 if they exist in horizon
             blocked_days = []
@@ -310,8 +439,9 @@ def auto_rooster(data, time_limit_s=60):
                     blocked_days.append(bd)
             # collect blocked shift ids
             blocked_shift_ids = [s for bd in blocked_days for s in shifts_by_date.get(bd, [])]
-            for bs in blocked_shift_ids:
-                model.Add(x[(bs, emp)] == 0).OnlyEnforceIf(cond)
+            for bs_var in xs(blocked_shift_ids, emp):
+                model.Add(bs_var == 0).OnlyEnforceIf(cond)
+    prof.mark("C7.2 rest after night block")
 
     # 7.3) Max 35 nights per 13 weeks (count prev nights in sliding windows)
     for emp in emp_ids:
@@ -338,156 +468,44 @@ def auto_rooster(data, time_limit_s=60):
                 except Exception:
                     # if prev doesn't contain week, skip (or you could compute from date)
                     pass
-            model.Add(sum(x[(s, emp)] for s in window_shifts) + prev_count <= 35)
+            model.Add(sum(xs(window_shifts, emp)) + prev_count <= 35)
+    prof.mark("C7.3 max nights per 13 weeks")
 
     # 7.4) Age > 55: no night shifts (respect exemptions)
-    # If voorkeur_nacht column is anything else than 'niet', put worker in CAO_7_4_exempt
-    CAO_7_4_exempt = workers[workers['voorkeur_nacht'] != 'niet']['medewerker_id'].astype(str).tolist()
-    
-    
-    for emp in emp_ids:
-        if emp in CAO_7_4_exempt:
-            continue
-        leeftijd = int(workers.loc[workers['medewerker_id'] == emp, 'leeftijd'].iloc[0])
-        if leeftijd >= 55:
-            for s in night_shifts:
-                model.Add(x[(s, emp)] == 0)
-
     # 8) Deskundigheid rule
-    for _, shift_row in shifts.iterrows():
-        sid = int(shift_row['shift_id'])
-
-        # required qualification → take minimum qualification level for shift
-        req_quals = shift_row['qualification']
-        if isinstance(req_quals, list):
-            req_level = max(req_quals)   # e.g., [1,2] → requires level 3, but 2 is preferred (see objective function 11)
-        else:
-            req_level = int(req_quals)
-        
-        for emp in emp_ids:
-            emp_level = workers.loc[workers['medewerker_id'] == emp, 'deskundigheid'].iloc[0]
-            # employee can only work shift if emp_level <= req_level
-            if min(emp_level) > req_level:
-                model.Add(x[(sid, emp)] == 0)
-    
     # 9) Use 'voorkeur_nacht' column to enforce the night shift preferences
-    for emp in emp_ids:
-        night_emp = workers.loc[workers['medewerker_id'] == emp, 'voorkeur_nacht'].iloc[0]
-        if night_emp == 'Niet':
-            for s in night_shifts:
-                model.Add(x[(s, emp)] == 0)
-        elif night_emp == 'uitsluitend':
-            for s in shifts['shift_id']:
-                if s not in night_shifts:
-                    model.Add(x[(s, emp)] == 0)
-                        
-    # Standardized constraints
-    
     # 11.1) Use 'voorkeur_dagdelen' column to enforce shift preferences
-    for emp in emp_ids:
-        #pref_emp = workers.loc[workers['medewerker_id'] == emp, 'voorkeur_dagdelen'].iloc[0]
-        day_emp = workers.loc[workers['medewerker_id'] == emp, 'voorkeur_dag'].iloc[0]
-        if day_emp == 'niet':
-            for shift in shifts['shift_id']:
-                shift_type_map_value = shift_type_map.get(shift, 'Other')
-                if shift_type_map_value in {'D', 'A'}:
-                    model.Add(x[(shift, emp)] == 0)
-        elif day_emp == 'uitsluitend':
-            for shift in shifts['shift_id']:
-                shift_type_map_value = shift_type_map.get(shift, 'Other')
-                if shift_type_map_value not in {'D', 'A'}:
-                    model.Add(x[(shift, emp)] == 0)
-        
-        evening_emp = workers.loc[workers['medewerker_id'] == emp, 'voorkeur_avond'].iloc[0]
-        if evening_emp == 'niet':
-            for shift in shifts['shift_id']:
-                shift_type_map_value = shift_type_map.get(shift, 'Other')
-                if shift_type_map_value in {'A'}:
-                    model.Add(x[(shift, emp)] == 0)
-                    
-        elif day_emp == 'uitsluitend':
-            for shift in shifts['shift_id']:
-                shift_type_map_value = shift_type_map.get(shift, 'Other')
-                if shift_type_map_value not in {'A'}:
-                    model.Add(x[(shift, emp)] == 0)
-        
-        night_emp = workers.loc[workers['medewerker_id'] == emp, 'voorkeur_nacht'].iloc[0]
-        if night_emp == 'niet':
-            for s in night_shifts:
-                model.Add(x[(s, emp)] == 0)
-        elif night_emp == 'uitsluitend':
-            for s in shifts['shift_id']:
-                if s not in night_shifts:
-                    model.Add(x[(s, emp)] == 0)
-    
+    # All four only forbid single assignments and are handled by compute_eligible_pairs
+
     # 11.2) pattern constraint for employees with non empty 'patroon' field
     for emp in emp_ids:
-        patroon = workers.loc[workers['medewerker_id'] == emp, 'patroon'].iloc[0]
-        night_emp = workers.loc[workers['medewerker_id'] == emp, 'voorkeur_nacht'].iloc[0]
+        patroon = emp_attr(emp, 'patroon')
+        night_emp = emp_attr(emp, 'voorkeur_nacht')
         
         if patroon and patroon != []:
             print(f'Applying pattern constraint for employee {emp} with pattern {patroon}')
         else:
             continue
             
-        if night_emp == 'uitsluitend':
-            night = True
-        else:
-            night = False
+        night = night_emp == 'uitsluitend'
         on_days = patroon[0]
         off_days = patroon[1]
-        pattern_length = on_days + off_days
-                    
-        # forbid non-night shifts if applicable
-        if night_emp == 'uitsluitend':
-            night = True
-            for s in shifts['shift_id']:
-                if s not in night_shifts:
-                    model.Add(x[(s, emp)] == 0)
-            # day-level night bools (already have n_emp_date)
-            #work_day_bool = {d: emp_date[(emp, d)] for d in dates_list}
-        else:
-            night = False
-        # day-level night bools (already have n_emp_date)
-        work_day = {d: emp_date[(emp, d)] for d in dates_list}
+        period = on_days + off_days
+
+        # non-night shifts of 'uitsluitend' night workers are not eligible (see compute_eligible_pairs)
+        # day-level work bools (shared channels)
+        work_day = {d: channels.works_on(emp, d) for d in dates_list}
 
-        # find last consecutive night block in prev_assignments (dates)
-        prev_shift_block = get_last_consecutive_block_dates(prev_assignments, emp, is_night=night)
-        period = pattern_length
         # compute offset if we have prior info that constitutes a consistent phase
-        prev_phase_offset = None
-        if prev_shift_block:
-            # if prev tail has at least one day, we can compute candidate offset: (last_day_index mod 14)
-            # choose earliest prev_night for offset calculation
-            # offset = (date_index_of_prev_first - date0_index) % 14 where date_index_of_prev_first relates to a continuous day index
-            # simpler: take numeric days since reference date0
-            try:
-                base = pd.to_datetime(dates_list[0])
-                prev_first = pd.to_datetime(prev_shift_block[0])
-                prev_phase_offset = (prev_first - base).days % period
-            except Exception:
-                prev_phase_offset = None
-
-        # unavailable dates for this emp
-        unavailable_dates = set()
-        onb_emp = onb[onb['Medewerker id'] == emp]
-        for _, r in onb_emp.iterrows():
-            date_unb = pd.to_datetime(r['Datum']).date()
-            besch = str(r['Beschikbaarheid']).lower()
-            if besch != 'beschikbaar':
-                unavailable_dates.add(date_unb)
+        prev_phase_offset = get_pattern_phase_offset(prev_assignments, emp, dates_list, period, is_night=night)
         if prev_phase_offset is not None:
-            # enforce exact pattern consistent with prev_phase_offset
+            # enforce exact pattern consistent with prev_phase_offset;
+            # off days and unavailable on days have no eligible shifts already
+            emp_unavailable = unavailable_dates.get(emp, set())
             for d in dates_list:
                 pos = ((pd.to_datetime(d) - pd.to_datetime(dates_list[0])).days - prev_phase_offset) % period
-                if pos < on_days:
-                    # check if date is in unavailable dates
-                    if d in unavailable_dates:
-                        model.Add(work_day[d] == 0)
-                    else:
-                        model.Add(work_day[d] == 1)
-                else:
-                    model.Add(work_day[d] == 0)
+                if pos < on_days and d not in emp_unavailable:
+                    model.Add(work_day[d] == 1)
         else:
             # allow solver to choose a phase
             offsets = [model.NewBoolVar(f"teuna_phase_{k}") for k in range(period)]
@@ -499,13 +517,14 @@ def auto_rooster(data, time_limit_s=60):
                         model.Add(work_day[d] == 1).OnlyEnforceIf(vk)
                     else:
                         model.Add(work_day[d] == 0).OnlyEnforceIf(vk)
+    prof.mark("C11.2 pattern")
     
     # 11.3) Achtereenvolgende diensten constraint for employees with either 'min_achtereenvolgende_diensten' or 'max_achtereenvolgende_diensten'
     for emp in emp_ids:
 
-        minc = workers.loc[workers['medewerker_id'] == emp, 'min_achtereenvolgende_diensten'].iloc[0]
-        maxc = workers.loc[workers['medewerker_id'] == emp, 'max_achtereenvolgende_diensten'].iloc[0]  # FIXED: use max column
-        rest_after = workers.loc[workers['medewerker_id'] == emp, 'rust_na_werkperiode'].iloc[0]
+        minc = emp_attr(emp, 'min_achtereenvolgende_diensten')
+        maxc = emp_attr(emp, 'max_achtereenvolgende_diensten')  # FIXED: use max column
+        rest_after = emp_attr(emp, 'rust_na_werkperiode')
 
         # If all constraints are absent or non-positive, skip
         if (pd.isna(minc) or minc <= 0) and (pd.isna(maxc) or maxc <= 0) and (pd.isna(rest_after) or rest_after <= 0):
@@ -517,17 +536,8 @@ def auto_rooster(data, time_limit_s=60):
         R = int(rest_after) if not pd.isna(rest_after) else 0
         
         print(f'Applying achtereenvolgende diensten for employee {emp}: minc={minc}, maxc={maxc}, rest_after={R}')
-        # Create day-level work variables and link to x
-        work_day = {}
-        for d in dates_list:
-            w = model.NewBoolVar(f"work_{emp}_{d.isoformat()}")
-            work_day[d] = w
-            shifts_today = shifts_by_date.get(d, [])
-            if shifts_today:
-                model.Add(sum(x[(s, emp)] for s in shifts_today) >= 1).OnlyEnforceIf(w)
-                model.Add(sum(x[(s, emp)] for s in shifts_today) == 0).OnlyEnforceIf(w.Not())
-            else:
-                model.Add(w == 0)
+        # day-level work bools (shared channels)
+        work_day = {d: channels.works_on(emp, d) for d in dates_list}
 
         # -----------------------
         # MAX consecutive constraint
@@ -554,11 +564,8 @@ def auto_rooster(data, time_limit_s=60):
                 d_prev = dates_list[i - 1]
                 d = dates_list[i]
 
-                block_start = model.NewBoolVar(f"block_start_{emp}_{d.isoformat()}")
-
                 # block_start <=> (work_today AND NOT work_yesterday)
-                model.AddBoolAnd([work_day[d], work_day[d_prev].Not()]).OnlyEnforceIf(block_start)
-                model.AddBoolOr([work_day[d].Not(), work_day[d_prev]]).OnlyEnforceIf(block_start.Not())
+                block_start = channels.block_start(emp, d_prev, d)
 
                 # enforce minimum continuation: if block_start then next minc-1 days must be working
                 for k in range(minc - 1):
@@ -582,84 +589,60 @@ def auto_rooster(data, time_limit_s=60):
             for i in range(len(dates_list) - 1):
                 d = dates_list[i]
                 d1 = dates_list[i + 1]
-                end_block = model.NewBoolVar(f"end_block_{emp}_{d.isoformat()}")
-
                 # end_block <=> (work_today AND NOT work_tomorrow)
-                model.AddBoolAnd([work_day[d], work_day[d1].Not()]).OnlyEnforceIf(end_block)
-                model.AddBoolOr([work_day[d].Not(), work_day[d1]]).OnlyEnforceIf(end_block.Not())
+                end_block = channels.block_end(emp, d, d1)
 
                 for r in range(1, R + 1):
                     if i + r < len(dates_list):
                         model.Add(work_day[dates_list[i + r]] == 0).OnlyEnforceIf(end_block)
+    prof.mark("C11.3 consecutive shifts")
 
 
     ### Objective ###
     
+    weights = get_weights(weights)
+
     # 1) Uncovered shifts penalties with lower weight for non-required shifts
-    uncovered_terms = []
-    for _, r in shifts.iterrows():
-        sid = int(r['shift_id'])
-        if r['required'] == 0.5:
-            weight = 0.5 
-        else:
-            weight = 1.0
-        
-        uncovered_terms.append(weight * u[sid])
+    uncovered_terms = [u[int(sid)] for sid, req in zip(shifts['shift_id'], shifts['required']) if req != 0.5]
+    uncovered_optional_terms = [u[int(sid)] for sid, req in zip(shifts['shift_id'], shifts['required']) if req == 0.5]
+    prof.mark("O1 uncovered shifts")
 
-    # 2) Under-coverage penalties for non weekend workers
+    # 2) Under-coverage penalties for non weekend workers, squared in hours (convex table)
     under_coverage_terms = []
     under_coverage_weekend_terms = []
-    wensen_map = {emp: str(workers.loc[workers['medewerker_id'] == emp, 'wensen']).lower() for emp in emp_ids}
-    employees_no_weekend_pref = [e for e in emp_ids if 'weekend' not in wensen_map[e]]
-    employees_weekend_pref = [e for e in emp_ids if 'weekend' in wensen_map[e]]      
+    employees_no_weekend_pref = [e for e in emp_ids if not emp_attr(e, 'weekend_pref')]
+    employees_weekend_pref = [e for e in emp_ids if emp_attr(e, 'weekend_pref')]
     for emp in employees_no_weekend_pref:
-        cap_minutes = int(workers.loc[workers['medewerker_id'] == emp, 'contract_minutes'].iloc[0])
+        cap_minutes = int(emp_attr(emp, 'contract_minutes'))
         total_shifts = list(shifts['shift_id'].tolist())
         under_coverage = model.NewIntVar(0, cap_minutes * num_weeks, f"under_coverage_e{emp}")
-        squared_under_coverage = model.NewIntVar(0, cap_minutes * cap_minutes * num_weeks * num_weeks, f"squared_under_coverage_e{emp}")
-        model.Add(sum(dur_min[s] * x[(s, emp)] for s in total_shifts) + under_coverage >= cap_minutes * num_weeks)        
-        #under_coverage_terms.append(under_coverage)
-        under_coverage_terms.append(squared_under_coverage)  
+        model.Add(sum(dur_min[s] * x[(s, emp)] for s in total_shifts if (s, emp) in x) + under_coverage >= cap_minutes * num_weeks)
+        points, values = square_table(cap_minutes * num_weeks, **UNDER_COVERAGE_TABLE)
+        under_coverage_terms.append(add_convex_penalty(model, under_coverage, points, values, f"squared_under_coverage_e{emp}"))
  
 
     for emp in employees_weekend_pref:
-        cap_minutes = int(workers.loc[workers['medewerker_id'] == emp, 'contract_minutes'].iloc[0])
+        cap_minutes = int(emp_attr(emp, 'contract_minutes'))
         total_shifts = list(shifts['shift_id'].tolist())
         under_coverage = model.NewIntVar(0, cap_minutes * num_weeks, f"under_coverage_e{emp}")
-        squared_under_coverage = model.NewIntVar(0, cap_minutes * cap_minutes * num_weeks * num_weeks, f"squared_under_coverage_e{emp}")
-        model.Add(sum(dur_min[s] * x[(s, emp)] for s in total_shifts) + under_coverage >= cap_minutes * num_weeks)        
-        #under_coverage_weekend_terms.append(under_coverage)
-        under_coverage_weekend_terms.append(squared_under_coverage)
+        model.Add(sum(dur_min[s] * x[(s, emp)] for s in total_shifts if (s, emp) in x) + under_coverage >= cap_minutes * num_weeks)
+        points, values = square_table(cap_minutes * num_weeks, **UNDER_COVERAGE_TABLE)
+        under_coverage_weekend_terms.append(add_convex_penalty(model, under_coverage, points, values, f"squared_under_coverage_e{emp}"))
+    prof.mark("O2 under-coverage")
 
         
     
     # 3) Penalty for consecutive weekends worked for fixed-contract workers
     # weekendWorked[(emp, week)] = 1 if employee emp works any shift on Saturday(5) or Sunday(6) in that week
+    # (weekend shift ids per week are precomputed for the channel registry)
     weekendWorked = {}
-    weekend_days = [5, 6]  # day_of_week indices for Saturday and Sunday
-    
-
-    # Precompute weekend shift ids per week for speed
-    weekend_shifts_by_week = {}
-    for w in weeks:
-        weekend_shifts = shifts.loc[(shifts['week'] == w) & (shifts['day_of_week'].isin(weekend_days)), 'shift_id'].tolist()
-        weekend_shifts_by_week[w] = weekend_shifts
 
     # Only consider employees with contract soort == 'vaste uren'
     #vaste_uren_employees = [e for e in emp_ids if workers.loc[workers['medewerker_id'] == e, 'contract soort'].iloc[0] == 'vaste uren']
     
     for emp in employees_no_weekend_pref:
         for w in weeks:
-            w_shifts = weekend_shifts_by_week.get(w, [])
-            var = model.NewBoolVar(f"weekendWorked_e{emp}_w{w}")
-            weekendWorked[(emp, w)] = var
-            if w_shifts:
-                # If var True => sum(x[s,emp]) >= 1 ; if var False => sum == 0
-                model.Add(sum(x[(s, emp)] for s in w_shifts) >= 1).OnlyEnforceIf(var)
-                model.Add(sum(x[(s, emp)] for s in w_shifts) == 0).OnlyEnforceIf(var.Not())
-            else:
-                # no weekend shifts this week => cannot work weekend
-                model.Add(var == 0)
+            weekendWorked[(emp, w)] = channels.works_weekend(emp, w)
 
     # Create consec weekend penalty booleans where we can compare week w and w+1
     consec_weekend_penalties = []
@@ -690,22 +673,11 @@ def auto_rooster(data, time_limit_s=60):
             model.AddBoolAnd([weekendWorked[(emp, weeks[0])]]).OnlyEnforceIf(consec_prev)
             model.AddBoolOr([weekendWorked[(emp, weeks[0])].Not()]).OnlyEnforceIf(consec_prev.Not())
             consec_weekend_penalties.append(consec_prev) 
+    prof.mark("O3 consecutive weekends")
 
     # 4) Penalty for isolated shifts
-    # Create day-level work variables: work_day[(emp, date)] = 1 if employee works any shift on that date
-    work_day = {}
-    for emp in emp_ids:
-        for d in dates_list:
-            shifts_today = shifts_by_date.get(d, [])
-            var = model.NewBoolVar(f"workDay_e{emp}_d{d.isoformat()}")
-            work_day[(emp, d)] = var
-            if shifts_today:
-                # If var True => works at least one shift; If var False => works 0 shifts
-                model.Add(sum(x[(s, emp)] for s in shifts_today) >= 1).OnlyEnforceIf(var)
-                model.Add(sum(x[(s, emp)] for s in shifts_today) == 0).OnlyEnforceIf(var.Not())
-            else:
-                # No shifts on this date => cannot work
-                model.Add(var == 0)
+    # Day-level work variables: work_day[(emp, date)] = 1 if employee works any shift on that date (shared channels)
+    work_day = {(emp, d): channels.works_on(emp, d) for emp in emp_ids for d in dates_list}
 
     # Precompute last day worked from previous schedule
     last_prev_day_worked = {}
@@ -754,6 +726,7 @@ def auto_rooster(data, time_limit_s=60):
 
             # Add to list for objective
             isolated_shift_penalties.append(iso_var)
+    prof.mark("O4 isolated shifts")
 
     # 5): insufficient rest after night shift blocks
     rest_after_night_penalties = []
@@ -784,12 +757,9 @@ def auto_rooster(data, time_limit_s=60):
                 for k in range(2):  # check next 2 days
                     if i + k < len(dates_list):
                         d_check = dates_list[i + k]
-                        # create penalty variable
-                        pen_var = model.NewBoolVar(f"restAfterNight_e{emp}_d{d_check.isoformat()}")
-                        # penalize if employee works
-                        model.Add(pen_var == 1).OnlyEnforceIf(work_day[(emp, d_check)])
-                        model.Add(pen_var == 0).OnlyEnforceIf(work_day[(emp, d_check)].Not())
-                        rest_after_night_penalties.append(pen_var)
+                        # penalize if employee works (the shared day channel is the penalty)
+                        rest_after_night_penalties.append(work_day[(emp, d_check)])
+    prof.mark("O5 rest after night block")
     
     # 6): Penalty for uneven distribution of type of shift per employee
     shift_type_count = {}
@@ -799,9 +769,9 @@ def auto_rooster(data, time_limit_s=60):
 
         # Sum assignments for each type
         for t in ['D', 'A', 'N']:
-            type_shifts = [s for s in shifts['shift_id'] if shift_type_map[s] == t]
-            if type_shifts:
-                model.Add(shift_type_count[(emp, t)] == sum(x[(s, emp)] for s in type_shifts))
+            type_vars = xs([s for s in shifts['shift_id'] if shift_type_map[s] == t], emp)
+            if type_vars:
+                model.Add(shift_type_count[(emp, t)] == sum(type_vars))
             else:
                 # if no shifts of this type exist, count = 0
                 model.Add(shift_type_count[(emp, t)] == 0)
@@ -823,6 +793,7 @@ def auto_rooster(data, time_limit_s=60):
         model.Add(max_shift_count[emp] * 2 <= total_shifts).OnlyEnforceIf(pen_var.Not())
         
         unequal_shift_penalties.append(pen_var)
+    prof.mark("O6 shift type balance")
     
     # 7) Equal distribution of amount of shifts per week per employee
     
@@ -835,8 +806,9 @@ def auto_rooster(data, time_limit_s=60):
         for w in weeks:
             week_shifts = shifts.loc[shifts['week'] == w, 'shift_id'].tolist()
             shifts_per_week[(emp, w)] = model.NewIntVar(0, len(week_shifts), f"shiftsPerWeek_e{emp}_w{w}")
-            if week_shifts:
-                model.Add(shifts_per_week[(emp, w)] == sum(x[(s, emp)] for s in week_shifts))
+            week_vars = xs(week_shifts, emp)
+            if week_vars:
+                model.Add(shifts_per_week[(emp, w)] == sum(week_vars))
             else:
                 model.Add(shifts_per_week[(emp, w)] == 0)
 
@@ -848,73 +820,52 @@ def auto_rooster(data, time_limit_s=60):
 
     # Create deviation variables per week (fractional average fairness)
     week_balance_penalties = {}
-    num_weeks = len(weeks)
 
+    # at most one shift per day, so |week_shifts * num_weeks - total_shifts| <= 7 * num_weeks
+    max_dev = 7 * num_weeks
+    # exact squares up to 8, doubling beyond: O(log(num_weeks)) segments per (emp, week)
+    dev_points, dev_values = square_table(max_dev)
     for emp in equal_dist_emp_ids:
         for w in weeks:
             # expr = week_shifts * num_weeks - total_shifts
             expr = shifts_per_week[(emp, w)] * num_weeks - total_shifts_emp[emp]
 
-            dev_pos = model.NewIntVar(0, len(shifts) * num_weeks, f"weekDevPos_e{emp}_w{w}")
-            dev_neg = model.NewIntVar(0, len(shifts) * num_weeks, f"weekDevNeg_e{emp}_w{w}")
-
-            model.Add(expr == dev_pos - dev_neg)
-            week_dev = model.NewIntVar(0, len(shifts) * num_weeks, f"weekDevAbs_e{emp}_w{w}")
-            model.Add(week_dev == dev_pos + dev_neg)
+            # |expr| (the penalty only grows with week_dev, so two lower bounds suffice)
+            week_dev = model.NewIntVar(0, max_dev, f"weekDevAbs_e{emp}_w{w}")
+            model.Add(week_dev >= expr)
+            model.Add(week_dev >= -expr)
 
-            # Create a squared penalty using AddMultiplicationEquality
-            week_dev_sq = model.NewIntVar(0, (len(shifts) * num_weeks) ** 2, f"weekDevSq_e{emp}_w{w}")
-            model.AddMultiplicationEquality(week_dev_sq, [week_dev, week_dev])
-
-            week_balance_penalties[(emp, w)] = week_dev_sq        
+            # squared penalty as a piecewise-linear table
+            week_balance_penalties[(emp, w)] = add_convex_penalty(model, week_dev, dev_points, dev_values, f"weekDevSq_e{emp}_w{w}")
+    prof.mark("O7 week balance")
 
     # 8) Use 'voorkeur' columns to penalize employees with 'overig' for each shift they are assigned to
+    # (the assignment variables themselves are the penalty terms)
     overig_penalties = []
     for emp in emp_ids:
-        night_emp = workers.loc[workers['medewerker_id'] == emp, 'voorkeur_nacht'].iloc[0]
+        night_emp = emp_attr(emp, 'voorkeur_nacht')
         if night_emp == 'overig':
-            for s in night_shifts:
-                pen_var = model.NewBoolVar(f"overigNightPenalty_e{emp}_s{s}")
-                model.Add(pen_var == x[(s, emp)])
-                overig_penalties.append(pen_var)
-        
-        day_emp = workers.loc[workers['medewerker_id'] == emp, 'voorkeur_dag'].iloc[0]
+            overig_penalties.extend(xs(night_shifts, emp))
+
+        day_emp = emp_attr(emp, 'voorkeur_dag')
         if day_emp == 'overig':
-            for s in shifts['shift_id']:
-                shift_type_map_value = shift_type_map.get(s, 'Other')
-                if shift_type_map_value in {'D'}:
-                    pen_var = model.NewBoolVar(f"overigDayPenalty_e{emp}_s{s}")
-                    model.Add(pen_var == x[(s, emp)])
-                    overig_penalties.append(pen_var)
-        
-        evening_emp = workers.loc[workers['medewerker_id'] == emp, 'voorkeur_avond'].iloc[0]
+            overig_penalties.extend(xs([s for s in shifts['shift_id'] if shift_type_map.get(s, 'Other') == 'D'], emp))
+
+        evening_emp = emp_attr(emp, 'voorkeur_avond')
         if evening_emp == 'overig':
-            for s in shifts['shift_id']:
-                shift_type_map_value = shift_type_map.get(s, 'Other')
-                if shift_type_map_value in {'A'}:
-                    pen_var = model.NewBoolVar(f"overigEveningPenalty_e{emp}_s{s}")
-                    model.Add(pen_var == x[(s, emp)])
-                    overig_penalties.append(pen_var)
+            overig_penalties.extend(xs([s for s in shifts['shift_id'] if shift_type_map.get(s, 'Other') == 'A'], emp))
+    prof.mark("O8 overig nights")
     
     
     # 9) Give a small bonus for employees working their preferred shifts
     preferred_shift_bonus = []
     
-    for _, r in onb.iterrows():
-        emp = r['Medewerker id']
-        if emp not in emp_ids:
-            continue
-        date_unb = pd.to_datetime(r['Datum']).date()
-        besch = str(r['Beschikbaarheid']).lower()
-        if besch == 'beschikbaar':
-            # find shifts on that date
-            shifts_on_date = shifts_by_date.get(date_unb, [])
-            for s in shifts_on_date:
-                # create a bonus variable
-                bonus_var = model.NewBoolVar(f"bonus_e{emp}_s{s}")
-                model.Add(bonus_var == x[(s, emp)])  # bonus_var = 1 iff employee works shift
-                preferred_shift_bonus.append(bonus_var)
-                
+    # (shift, employee) pairs on dates marked 'beschikbaar' come from preprocessing
+    for (s, emp) in sorted(preferred_pairs):
+        if (s, emp) in x:
+            preferred_shift_bonus.append(x[(s, emp)])  # bonus iff employee works shift
+    prof.mark("O9 preferred shifts")
+
     # 10) Penalty for deskundigheid level higher than required (to prefer lower levels when possible)
     deskundigheid_penalties = []
     for _, shift_row in shifts.iterrows():
@@ -923,23 +874,16 @@ def auto_rooster(data, time_limit_s=60):
         req_quals = shift_row['qualification']
         req_level = max(req_quals) if isinstance(req_quals, list) else int(req_quals)
 
-        for emp in emp_ids:
-            emp_level = workers.loc[workers['medewerker_id'] == emp, 'deskundigheid'].iloc[0]
-
+        for emp in emps_by_shift[sid]:
             # Allowed assignments only (because emp_level ≤ req_level)
-            if min(emp_level) <= req_level:
-                diff = req_level - max(emp_level)    # e.g. 3 - 1 = 2
+            if emp_attr(emp, 'min_deskundigheid') <= req_level:
+                diff = int(req_level - emp_attr(emp, 'max_deskundigheid'))    # e.g. 3 - 1 = 2
                 penalty_value = diff * diff      # quadratic
 
-                # Create an integer penalty variable for this assignment
-                p = model.NewIntVar(0, penalty_value, f"penalty_s{sid}_e{emp}")
-
-                # Link penalty to assignment:
-                # p = penalty_value * x[sid, emp]
-                # CP-SAT cannot multiply IntVar * IntVar → linearize with AddMultiplicationEquality
-                model.AddMultiplicationEquality(p, [x[(sid, emp)], penalty_value])
-
-                deskundigheid_penalties.append(p)
+                # constant times the assignment, a linear term without extra variable
+                if penalty_value:
+                    deskundigheid_penalties.append(penalty_value * x[(sid, emp)])
+    prof.mark("O10 deskundigheid")
     
     #11) If qualification has two levels, prefer the first level when possible
     preferred_qualification_bonus = []
@@ -952,51 +896,137 @@ def auto_rooster(data, time_limit_s=60):
         if isinstance(req_quals, list) and len(req_quals) > 1:
             preferred_level = min(req_quals)
             
-            for emp in emp_ids:
-                emp_level = workers.loc[workers['medewerker_id'] == emp, 'deskundigheid'].iloc[0][0]
+            for emp in emps_by_shift[sid]:
+                emp_level = emp_attr(emp, 'first_deskundigheid')
                 
-                # Only employees that satisfy the qualification requirements
-                if emp_level in req_quals:
-                    
-                    # Create bonus var
-                    b = model.NewBoolVar(f"preferredQualBonus_s{sid}_e{emp}")
-
-                    # If emp has preferred qualification → bonus follows assignment
-                    if emp_level == preferred_level:
-                        model.Add(b == x[sid, emp])
-                    else:
-                        model.Add(b == 0)
-
-
-                    preferred_qualification_bonus.append(b)
+                # Only employees with the preferred qualification earn the bonus
+                if emp_level in req_quals and emp_level == preferred_level:
+                    preferred_qualification_bonus.append(x[sid, emp])  # bonus follows assignment
+    prof.mark("O11 preferred qualification")
     
-    # Combine all into one objective
-    model.Minimize(
-        100 * sum(uncovered_terms) +                     # main uncovered penalty
-        0.005 * sum(under_coverage_terms) +             # soft penalty for under-coverage
-        0.001 * sum(under_coverage_weekend_terms) +     # soft penalty for under-coverage weekend pref
-        5 * sum(consec_weekend_penalties) +             # soft penalty for consecutive weekends
-        1 * sum(isolated_shift_penalties) +             # soft penalty for isolated shifts
-        0.5 * sum(rest_after_night_penalties) +         # soft penalty for insufficient rest after night blocks
-        0.1 * sum(unequal_shift_penalties) +            # soft penalty for uneven shift type distribution
-        0.1 * sum(week_balance_penalties.values()) +    # soft penalty for unequal distribution of shifts per week
-        1 * sum(overig_penalties) -                     # soft penalty for 'overig' night shifts
-        0.1 * sum(preferred_shift_bonus) +              # small bonus for preferred shifts
-        0.1 * sum(deskundigheid_penalties) -            # soft penalty for higher than required deskundigheid
-        0.5 * sum(preferred_qualification_bonus)        # small bonus for preferred qualification level
-    )
+    # Combine all into one integer-weighted objective (weight profiles in app/objective.py)
+    objective_terms = {
+        "uncovered": uncovered_terms,
+        "uncovered_optional": uncovered_optional_terms,
+        "under_coverage": under_coverage_terms,
+        "under_coverage_weekend": under_coverage_weekend_terms,
+        "consecutive_weekends": consec_weekend_penalties,
+        "isolated_shifts": isolated_shift_penalties,
+        "rest_after_night": rest_after_night_penalties,
+        "unequal_shift_types": unequal_shift_penalties,
+        "week_balance": list(week_balance_penalties.values()),
+        "overig": overig_penalties,
+        "preferred_shift": preferred_shift_bonus,
+        "deskundigheid": deskundigheid_penalties,
+        "preferred_qualification": preferred_qualification_bonus,
+    }
+    model.Minimize(weighted_objective(objective_terms, weights))
+    prof.mark("objective")
+
+    build_profile = prof.report()
+    build_total = build_profile['total']
+    print(f"Model built in {build_total['time_s']:.2f}s: {build_total['variables']} variables, {build_total['constraints']} constraints")
+    print(format_build_report(build_profile))
+    print(f"Shared day-level channels: {channels.counts()}")
 
     ### Solve ###
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = time_limit_s
-    solver.parameters.num_search_workers = 16
-    try:
-        status = solver.Solve(model)
-    except Exception as e:
-        import traceback
-        print("Solver exception caught!")
-        traceback.print_exc()
-        raise
+    if num_workers is None:
+        num_workers = solver_workers()
+    print(f"Solving with {num_workers} workers, parameters {solver_params or {}}")
+
+    # Early termination: the coverage terms cannot go below coverage_lb
+    stop = stop or {}
+    coverage_weight = {int(sid): weights["uncovered_optional"] if req == 0.5 else weights["uncovered"]
+                       for sid, req in zip(shifts['shift_id'], shifts['required'])}
+    coverage_vars = [(u[s], coverage_weight[s]) for s in u]
+    coverage_lb = coverage_lower_bound(shifts_by_date, emps_by_shift, coverage_weight)
+    print(f"Coverage lower bound: {coverage_lb}, stop criteria: {stop}")
+
+    def make_solver(limit_s, log):
+        solver = cp_model.CpSolver()
+        for name, value in (solver_params or {}).items():
+            setattr(solver.parameters, name, value)
+        solver.parameters.max_time_in_seconds = limit_s
+        solver.parameters.num_search_workers = num_workers
+        # keep the search log (not printed) to report the presolve time
+        solver.parameters.log_search_progress = True
+        solver.parameters.log_to_stdout = False
+        solver.log_callback = log.append
+        return solver
+
+    def run(solver, callback):
+        done = stop_without_improvement(solver, callback, stop.get("no_improvement_s"))
+        try:
+            return solver.Solve(model, callback)
+        except Exception as e:
+            import traceback
+            print("Solver exception caught!")
+            traceback.print_exc()
+            raise
+        finally:
+            done.set()
+
+    phases = []
+    incumbents = []
+    presolve_s = 0.0
+    elapsed = 0.0
+    if staged:
+        # Phase 1: coverage only, under a short share of the budget
+        coverage = weighted_objective({t: objective_terms[t] for t in ("uncovered", "uncovered_optional")}, weights)
+        model.Minimize(coverage)
+        phase_log = []
+        solver = make_solver(time_limit_s * phase1_share, phase_log)
+        callback = StopCallback(u.values(), on_incumbent, phase="coverage", coverage=coverage_vars, coverage_lb=coverage_lb)
+        status = run(solver, callback)
+        elapsed = solver.WallTime()
+        presolve_s += presolve_time(phase_log) or 0.0
+        incumbents += callback.events
+        found = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        phases.append({
+            "phase": "coverage",
+            "time_limit_s": time_limit_s * phase1_share,
+            "solver_status": solver.StatusName(status),
+            "objective": solver.ObjectiveValue() if found else None,
+            "best_bound": solver.BestObjectiveBound() if found else None,
+            "solve_time_s": elapsed,
+            "stop_reason": stop_reason(solver.StatusName(status), callback),
+        })
+        print(f"Phase 1 (coverage): {phases[-1]}")
+
+        # Phase 2: keep the coverage reached and start from the phase-1 solution
+        if found:
+            if status == cp_model.OPTIMAL:
+                coverage_lb = max(coverage_lb, round(solver.ObjectiveValue()))
+            model.Add(coverage <= round(solver.ObjectiveValue()))
+            model.ClearHints()
+            for var in list(x.values()) + list(u.values()):
+                model.AddHint(var, solver.Value(var))
+        model.Minimize(weighted_objective(objective_terms, weights))
+
+    phase_log = []
+    phase_limit_s = max(1.0, time_limit_s - elapsed)
+    solver = make_solver(phase_limit_s, phase_log)
+    incumbent_callback = StopCallback(u.values(), on_incumbent, offset_s=elapsed, phase="quality" if staged else None,
+                                      coverage=coverage_vars,
+                                      coverage_lb=coverage_lb if stop.get("soft_gap") is not None else None,
+                                      soft_gap=stop.get("soft_gap"), objective_target=stop.get("objective_target"))
+    status = run(solver, incumbent_callback)
+    reason = stop_reason(solver.StatusName(status), incumbent_callback)
+    print(f"Solve ended: {reason}")
+    presolve_s += presolve_time(phase_log) or 0.0
+    incumbents += incumbent_callback.events
+    if staged:
+        found = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        phases.append({
+            "phase": "quality",
+            "time_limit_s": phase_limit_s,
+            "solver_status": solver.StatusName(status),
+            "objective": solver.ObjectiveValue() if found else None,
+            "best_bound": solver.BestObjectiveBound() if found else None,
+            "solve_time_s": solver.WallTime(),
+            "stop_reason": reason,
+        })
+        print(f"Phase 2 (quality): {phases[-1]}")
 
     if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
         assignments = []
@@ -1004,13 +1034,15 @@ def auto_rooster(data, time_limit_s=60):
         for _, r in shifts.iterrows():
             sid = int(r['shift_id'])
             assigned = False
-            for emp in emp_ids:
+            for emp in emps_by_shift[sid]:
                 if solver.Value(x[(sid, emp)]) == 1:
                     assignments.append({
                         'shift_id': sid,
                         'shift_name': r['shift_name'],
                         'start_time': r['start_time'],
                         'end_time': r['end_time'],
+                        'start_min': int(r['start_min']),
+                        'end_min': int(r['end_min']),
                         'shift_date': r['shift_date'],
                         'is_night': r['is_night'],
                         'week': int(r['week']),
@@ -1019,9 +1051,9 @@ def auto_rooster(data, time_limit_s=60):
                         'absolute_day': int(r['absolute_day']),
                         'duration_min': int(r['duration_min']),
                         'employee_id': str(emp),
-                        'employee_name': workers.loc[workers['medewerker_id'] == emp, 'medewerker_naam'].iloc[0],
+                        'employee_name': emp_attr(emp, 'medewerker_naam'),
                         'qualification': r['qualification'],
-                        'deskundigheid': workers.loc[workers['medewerker_id'] == emp, 'deskundigheid'].iloc[0],
+                        'deskundigheid': emp_attr(emp, 'deskundigheid'),
                         'shift_filled': True
                     })
                     assigned = True
@@ -1033,6 +1065,8 @@ def auto_rooster(data, time_limit_s=60):
                     'shift_name': r['shift_name'],
                     'start_time': r['start_time'],
                     'end_time': r['end_time'],
+                    'start_min': int(r['start_min']),
+                    'end_min': int(r['end_min']),
                     'shift_date': r['shift_date'],
                     'is_night': r['is_night'],
                     'week': int(r['week']),
@@ -1053,17 +1087,9 @@ def auto_rooster(data, time_limit_s=60):
         print('==== Solution Summary ====')
         print(f"Solution found with objective value {solver.ObjectiveValue()}")
         print(f"Total uncovered shifts: {len(uncovered)}")
-        print(f"Total under-coverage penalties: {sum(solver.Value(v) for v in under_coverage_terms)}")
-        print("Total consecutive weekend penalties:", sum(solver.Value(v) for v in consec_weekend_penalties))
-        print("Total isolated shift penalties:", sum(solver.Value(v) for v in isolated_shift_penalties))
-        print("Total insufficient rest after night penalties:", sum(solver.Value(v) for v in rest_after_night_penalties))
-        print("Total unequal shift type distribution penalties:", sum(solver.Value(v) for v in unequal_shift_penalties))
-        print("Total weekly balance penalties:", sum(solver.Value(v) for v in week_balance_penalties.values()))
-        print("Total 'overig' shift penalties:", sum(solver.Value(v) for v in overig_penalties))
-        print("Total preferred shift bonuses:", sum(solver.Value(v) for v in preferred_shift_bonus))
-        print("Total deskundigheid penalties:", sum(solver.Value(v) for v in deskundigheid_penalties))
-        print("Total preferred qualification bonuses:", sum(solver.Value(v) for v in preferred_qualification_bonus))        
-                
+        breakdown = objective_breakdown(solver, objective_terms, weights)
+        print(format_breakdown(breakdown))
+
         # ---- Debug print for weekly distribution ----
         print("\n--- Weekly shift distribution (balanced) ---")
         for emp in equal_dist_emp_ids:
@@ -1077,19 +1103,19 @@ def auto_rooster(data, time_limit_s=60):
         for emp in employees_no_weekend_pref:
             under_cov = solver.Value(under_coverage_terms[employees_no_weekend_pref.index(emp)])
             if under_cov > 0:
-                print(f"Employee {emp} ({workers.loc[workers['medewerker_id'] == emp, 'medewerker_naam'].iloc[0]}): under-coverage penalty = {under_cov} minutes")
+                print(f"Employee {emp} ({emp_attr(emp, 'medewerker_naam')}): under-coverage penalty = {under_cov} (hours²)")
         
         # ---- Debug print for weekend under-coverage ----
         print("\n--- Weekend preference under-coverage details ---")
         for emp in employees_weekend_pref:
             under_cov = solver.Value(under_coverage_weekend_terms[employees_weekend_pref.index(emp)])
             if under_cov > 0:
-                print(f"Employee {emp} ({workers.loc[workers['medewerker_id'] == emp, 'medewerker_naam'].iloc[0]}): weekend pref under-coverage penalty = {under_cov} minutes")
+                print(f"Employee {emp} ({emp_attr(emp, 'medewerker_naam')}): weekend pref under-coverage penalty = {under_cov} (hours²)")
         
         print("All employees with their number of assigned shifts:")
         for emp in emp_ids:
-            num_assigned = sum(1 for s in shifts['shift_id'] if solver.Value(x[(s, emp)]) == 1)
-            print(f"Employee {emp} ({workers.loc[workers['medewerker_id'] == emp, 'medewerker_naam'].iloc[0]}): assigned shifts = {num_assigned}")
+            num_assigned = sum(1 for v in xs(shifts['shift_id'], emp) if solver.Value(v) == 1)
+            print(f"Employee {emp} ({emp_attr(emp, 'medewerker_naam')}): assigned shifts = {num_assigned}")
         
         #save to CSV
         assignments_df = pd.DataFrame(assignments)        
@@ -1099,7 +1125,17 @@ def auto_rooster(data, time_limit_s=60):
             "all_assignments_df": all_assignments,
             "uncovered_shifts": uncovered,
             "objective_value": solver.ObjectiveValue(),
-            "solver_status": solver.StatusName(status)
+            "best_bound": solver.BestObjectiveBound(),
+            "solver_status": solver.StatusName(status),
+            "solve_time_s": elapsed + solver.WallTime(),
+            "incumbents": incumbents,
+            "build_profile": build_profile,
+            "hinted_shifts": hinted_shifts,
+            "objective_breakdown": breakdown,
+            "presolve_s": presolve_s,
+            "phases": phases,
+            "num_workers": num_workers,
+            "stop_reason": reason,
         }
     else:
         print("No solution found:", solver.StatusName(status))
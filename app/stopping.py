@@ -0,0 +1,105 @@
+import threading
+import time
+
+from .progress import IncumbentCallback, print_incumbent
+
+# Early termination of a solve. Most runs plateau well before the time limit, so the search
+# is stopped when one of the stop criteria holds (all optional, see the 'stop' option of
+# auto_rooster and the solver profiles in app/params.py):
+# - soft_gap: the coverage terms reached their lower bound (coverage_lower_bound) and the
+#   gap relative to the remaining (soft) terms is at most soft_gap
+# - no_improvement_s: no improving solution for this many seconds
+# - objective_target: the objective is at or below this value
+STOP_CRITERIA = ("soft_gap", "no_improvement_s", "objective_target")
+
+
+def coverage_lower_bound(shifts_by_date, emps_by_shift, coverage_weight):
+    """
+    Lower bound on the weighted coverage terms (coverage_weight: shift_id -> weight of its
+    u variable). Per day, shifts without an eligible employee stay uncovered, and since an
+    employee works at most one shift per day (C2) so do all shifts beyond the number of
+    eligible employees that day, counted at the lowest weight of that day.
+    """
+    bound = 0
+    for s_list in shifts_by_date.values():
+        open_shifts = [s for s in s_list if emps_by_shift[s]]
+        bound += sum(coverage_weight[s] for s in s_list if not emps_by_shift[s])
+        employees = {emp for s in open_shifts for emp in emps_by_shift[s]}
+        excess = len(open_shifts) - len(employees)
+        if excess > 0:
+            bound += excess * min(coverage_weight[s] for s in open_shifts)
+    return bound
+
+
+class StopCallback(IncumbentCallback):
+    """
+    IncumbentCallback that stops the search as soon as a stop criterion holds and records
+    the criterion in stop_reason. coverage is a list of (u variable, weight); with
+    coverage_lb the search stops once the coverage reaches it and, when soft_gap is given,
+    (objective - bound) / |objective - coverage| <= soft_gap. last_improvement
+    (time.monotonic()) is used by stop_without_improvement.
+    """
+
+    def __init__(self, uncovered_vars, on_incumbent=print_incumbent, offset_s=0.0, phase=None,
+                 coverage=(), coverage_lb=None, soft_gap=None, objective_target=None):
+        super().__init__(uncovered_vars, on_incumbent, offset_s, phase)
+        self.coverage = list(coverage)
+        self.coverage_lb = coverage_lb
+        self.soft_gap = soft_gap
+        self.objective_target = objective_target
+        self.stop_reason = None
+        self.last_improvement = None
+
+    def on_solution_callback(self):
+        improvements = len(self.events)
+        super().on_solution_callback()
+        if len(self.events) == improvements or self.stop_reason is not None:
+            return
+        self.last_improvement = time.monotonic()
+        objective = self.events[-1]['objective']
+        if self.objective_target is not None and objective <= self.objective_target:
+            self.stop("objective_target")
+        elif self.coverage_lb is not None:
+            coverage = sum(w * self.Value(v) for v, w in self.coverage)
+            if coverage > self.coverage_lb:
+                return
+            if self.soft_gap is None:
+                self.stop("coverage_bound")
+            elif (objective - self.events[-1]['best_bound']) / max(1.0, abs(objective - coverage)) <= self.soft_gap:
+                self.stop("soft_gap")
+
+    def stop(self, reason):
+        self.stop_reason = reason
+        self.StopSearch()
+
+
+def stop_without_improvement(solver, callback, no_improvement_s, poll_s=0.5):
+    """
+    Starts a thread that stops solver once callback (a StopCallback) has found no improving
+    solution for no_improvement_s seconds; it only counts after the first solution. Returns
+    an event to set when the solve is done.
+    """
+    done = threading.Event()
+
+    def watch():
+        while not done.wait(poll_s):
+            last = callback.last_improvement
+            if last is not None and time.monotonic() - last >= no_improvement_s and callback.stop_reason is None:
+                callback.stop_reason = "no_improvement"
+                solver.StopSearch()
+                return
+
+    if no_improvement_s:
+        threading.Thread(target=watch, daemon=True).start()
+    return done
+
+
+def stop_reason(status_name, callback):
+    """Why a solve ended: the stop criterion that fired, else optimal, infeasible or time_limit."""
+    if status_name == "OPTIMAL":
+        return "optimal"
+    if callback.stop_reason is not None:
+        return callback.stop_reason
+    if status_name in ("INFEASIBLE", "MODEL_INVALID"):
+        return status_name.lower()
+    return "time_limit"
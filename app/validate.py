@@ -11,11 +11,14 @@ def validate_auto_rooster(data, result):
     
     errors = []
 
-    shifts = data['shifts'].copy()
-    workers = data['workers'].copy()
-    onb = data['onb'].copy()
+    shifts = data['shifts']
+    emp_table = data['emp_table']
+    emp_index = data['emp_index']
     emp_ids = data['emp_ids']
 
+    def emp_attr(emp, col):
+        return emp_table[col][emp_index[emp]]
+
     assignments_df = result['assignments_df']
         
     
@@ -30,8 +33,8 @@ def validate_auto_rooster(data, result):
 
     for emp in emp_ids:
         max_consec = 5
-        patroon = workers.loc[workers['medewerker_id'] == emp, 'patroon'].iloc[0]
-        voorkeur_nacht = workers.loc[workers['medewerker_id'] == emp, 'voorkeur_nacht'].iloc[0]
+        patroon = emp_attr(emp, 'patroon')
+        voorkeur_nacht = emp_attr(emp, 'voorkeur_nacht')
         print(f"Employee {emp} has voorkeur_nacht: {voorkeur_nacht}, patroon: {patroon}")
         
         if voorkeur_nacht == 'uitsluitend' and patroon != []:
@@ -39,7 +42,7 @@ def validate_auto_rooster(data, result):
             print(f"Employee {emp} has voorkeur_nacht 'uitsluitend' with patroon {patroon}, setting max_consec to {max_consec}.")
             COA_7_1_exempt.add(emp)
             
-    CAO_7_4_exempt = workers[workers['voorkeur_nacht'] != 'niet']['medewerker_id'].astype(str).tolist()
+    CAO_7_4_exempt = {emp for emp in emp_ids if emp_attr(emp, 'voorkeur_nacht') != 'niet'}
 
     ## 1) Coverage: each shift has <= 1 assigned employee
     for sid, group in assignments_df.groupby("shift_id"):
@@ -51,19 +54,17 @@ def validate_auto_rooster(data, result):
         if len(group) > 1:
             errors.append(f"Employee {emp} works {len(group)} shifts on {date}: {group['shift_id'].tolist()}")
 
-    ## 3) After night shift, no day/evening shift next day
-    for emp, group in assignments_df.groupby("employee_id"):
-        nights = group[group["is_night"]]
-        for _, ns in nights.iterrows():
-            next_day = ns['shift_date'] + timedelta(days=1)
-            next_day_shifts = group[group['shift_date'] == next_day]
-            next_day_shifts = next_day_shifts[next_day_shifts['is_night'] == False]
-            if len(next_day_shifts) > 0:
-                errors.append(f"Employee {emp} has day/evening shift(s) on {next_day} after a night shift on {ns['shift_date']}.")
+    ## 3) After night shift, no day/evening shift next day (day numbers as integers)
+    nights = assignments_df.loc[assignments_df['is_night'], ['employee_id', 'absolute_day', 'shift_date']]
+    days = assignments_df.loc[~assignments_df['is_night'].astype(bool), ['employee_id', 'absolute_day']]
+    after = nights.assign(absolute_day=nights['absolute_day'] + 1).merge(days, on=['employee_id', 'absolute_day'])
+    for emp, night_date in zip(after['employee_id'], after['shift_date']):
+        next_day = night_date + timedelta(days=1)
+        errors.append(f"Employee {emp} has day/evening shift(s) on {next_day} after a night shift on {night_date}.")
 
     ## 4) Max work days per week
     for emp, group in assignments_df.groupby("employee_id"):
-        max_days = int(workers.loc[workers['medewerker_id'] == emp, 'max_days_per_week'].iloc[0])
+        max_days = int(emp_attr(emp, 'max_days_per_week'))
         for week, week_group in group.groupby("week"):
             worked_days = week_group['shift_date'].nunique()
             if worked_days > max_days:
@@ -72,7 +73,7 @@ def validate_auto_rooster(data, result):
     ## 5) Contract hours on average across all weeks
     num_weeks = assignments_df['week'].nunique()
     for emp, group in assignments_df.groupby("employee_id"):
-        cap_minutes = int(workers.loc[workers['medewerker_id'] == emp, 'contract_minutes'].iloc[0])
+        cap_minutes = int(emp_attr(emp, 'contract_minutes'))
         total_minutes = group['duration_min'].sum()
         allowed_total = cap_minutes * num_weeks
         if total_minutes > allowed_total:
@@ -81,35 +82,11 @@ def validate_auto_rooster(data, result):
                 f"{total_minutes} min worked > {allowed_total} min allowed over {num_weeks} weeks"
             )
 
-    ## 6) No shifts overlapping with unavailable times
-    for _, r in onb.iterrows():
-        emp = r['Medewerker id']
-        if emp not in workers['medewerker_id'].values:
-            continue
-
-        besch = r['Beschikbaarheid'].lower()
-        if besch == 'beschikbaar':
-            continue
-
-        date_unb = r['Datum']
-        start_unb = r.get('Beschikbaarheid_tijd_vanaf')
-        end_unb = r.get('Beschikbaarheid_tijd_tm')
-
-        emp_shifts = assignments_df[assignments_df["employee_id"] == emp]
-        for _, sr in emp_shifts.iterrows():
-            if sr['shift_date'] != date_unb:
-                continue
-
-            if pd.isna(start_unb) or pd.isna(end_unb):
-                errors.append(f"Employee {emp} scheduled on fully unavailable day {date_unb}, shift {sr['shift_id']}.")
-                continue
-
-            overlap = not (sr['end_time'] <= start_unb or sr['start_time'] >= end_unb)
-            if overlap:
-                errors.append(
-                    f"Employee {emp} scheduled during unavailable time on {date_unb}, "
-                    f"shift {sr['shift_id']} ({sr['start_time']}–{sr['end_time']} overlaps with {start_unb}–{end_unb})."
-                )
+    ## 6) No shifts overlapping with unavailable times (pairs joined in preprocessing)
+    blocked_pairs = data['blocked_pairs']
+    for sid, emp, date in zip(assignments_df['shift_id'], assignments_df['employee_id'], assignments_df['shift_date']):
+        if (sid, emp) in blocked_pairs:
+            errors.append(f"Employee {emp} scheduled during unavailable time on {pd.Timestamp(date).date()}, shift {sid}.")
 
     ## 7.1) Max 5 consecutive nights
     for emp, group in assignments_df.groupby("employee_id"):
@@ -121,22 +98,21 @@ def validate_auto_rooster(data, result):
             if (window[-1] - window[0]).days == max_consec:
                 errors.append(f"Employee {emp} works >{max_consec} consecutive nights: {window}")
 
-    ## 7.2) After ≥3 consecutive nights → 46h rest (next 2 days off)
+    ## 7.2) After ≥3 consecutive nights → 46h rest: the next 2 days off, the days C7.2 of auto_rooster blocks
     for emp, group in assignments_df.groupby("employee_id"):
-        emp_nights = group[group['is_night']].sort_values("shift_date")
-        night_dates = emp_nights["shift_date"].tolist()
+        emp_nights = group[group['is_night']].sort_values("absolute_day")
+        night_days = emp_nights['absolute_day'].tolist()
 
-        for i in range(len(night_dates) - 2):
-            d0, d1, d2 = night_dates[i:i+3]
-            if d1 == d0 + timedelta(days=1) and d2 == d1 + timedelta(days=1):
-                next_day = d2 + timedelta(days=1)
-                if next_day in night_dates:  # still part of a longer block
+        for i in range(len(night_days) - 2):
+            d0, d1, d2 = night_days[i:i+3]
+            if d1 == d0 + 1 and d2 == d1 + 1:
+                if d2 + 1 in night_days:  # still part of a longer block
                     continue
-                blocked_days = [next_day, next_day + timedelta(days=1)]
-                next_shifts = group[group["shift_date"].isin(blocked_days)]
+                next_shifts = group[group['absolute_day'].isin([d2 + 1, d2 + 2])]
                 if len(next_shifts) > 0:
+                    dates = emp_nights['shift_date'].tolist()[i:i+3]
                     errors.append(
-                        f"Employee {emp} has shifts {next_shifts['shift_id'].tolist()} within 46h rest after nights {d0}, {d1}, {d2}."
+                        f"Employee {emp} has shifts {next_shifts['shift_id'].tolist()} within 46h rest after nights {dates[0]}, {dates[1]}, {dates[2]}."
                     )
 
     ## 7.3) Max 35 nights per 13 weeks
@@ -151,13 +127,13 @@ def validate_auto_rooster(data, result):
     for emp, group in assignments_df.groupby("employee_id"):
         if emp in CAO_7_4_exempt:
             continue
-        leeftijd = int(workers.loc[workers['medewerker_id'] == emp, 'leeftijd'].iloc[0])
+        leeftijd = int(emp_attr(emp, 'leeftijd'))
         if leeftijd > 55 and group['is_night'].any():
             errors.append(f"Employee {emp} (age {leeftijd}) assigned to night shifts: {group[group['is_night']==True]['shift_id'].tolist()}")
     
     # If voorkeur_nacht is 'niet', no night shifts
     for emp, group in assignments_df.groupby("employee_id"):
-        voorkeur_nacht = workers.loc[workers['medewerker_id'] == emp, 'voorkeur_nacht'].iloc[0]
+        voorkeur_nacht = emp_attr(emp, 'voorkeur_nacht')
         if voorkeur_nacht == 'niet' and group['is_night'].any():
             errors.append(f"Employee {emp} has 'niet' voorkeur_nacht but assigned to night shifts: {group[group['is_night']==True]['shift_id'].tolist()}")
     
@@ -166,4 +142,5 @@ def validate_auto_rooster(data, result):
         for e in errors:
             print("❌", e)
     else:
-        print("✅ All constraints satisfied!")
\ No newline at end of file
+        print("✅ All constraints satisfied!")
+    return errors
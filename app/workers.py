@@ -0,0 +1,167 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from .loaders import WORKERS_WORKBOOK_FRAMES
+
+# Columnar parser for the worker block of the 'Tabellen' sheet (T:AH). Every column is converted
+# on whole arrays, and values that cannot be converted are collected with their Excel row number
+# into one report instead of failing on the first one somewhere later in preprocess_data.
+
+# Excel row of the first worker: below the skipped rows and the header
+FIRST_ROW = WORKERS_WORKBOOK_FRAMES["workers"][2] + 2
+
+REQUIRED_COLUMNS = [
+    'medewerker_id', 'medewerker_naam', 'wensen', 'datum indienst', 'datum uit dienst', 'deskundigheid.1',
+    'contract soort', 'contracturen', 'max_werkdgn_pw', 'geboortedatum', 'voorkeur dagdelen (dag, avond, nacht)',
+    'patroon', 'achtereenvolgende diensten', 'rust na werkperiode',
+]
+
+# values the solver understands in 'voorkeur dagdelen (dag, avond, nacht)'
+PREFERENCE_VALUES = {'', 'niet', 'overig', 'uitsluitend'}
+
+
+class WorkerSheetError(ValueError):
+    """The worker sheet has values that cannot be converted; report lists all schema violations."""
+
+    def __init__(self, report):
+        self.report = report
+        super().__init__(format_worker_report(report))
+
+
+def format_worker_report(report):
+    """One line per schema violation, errors first, by row."""
+    errors = [r for r in report if r['fatal']]
+    lines = [f"Werknemersblad (Tabellen T:AH): {len(errors)} fout(en), {len(report) - len(errors)} waarschuwing(en)"]
+    for r in sorted(report, key=lambda r: (not r['fatal'], r['row'] or 0)):
+        where = f"rij {r['row']}, " if r['row'] is not None else ""
+        kind = "fout" if r['fatal'] else "waarschuwing"
+        value = f" ({r['value']!r})" if r['value'] is not None else ""
+        lines.append(f"{kind}: {where}kolom '{r['column']}': {r['problem']}{value}")
+    return "\n".join(lines)
+
+
+def _flag(report, raw, mask, column, problem, fatal=True):
+    """Adds a report entry for every row where mask holds."""
+    for idx in raw.index[np.asarray(mask, dtype=bool)]:
+        value = raw.at[idx, column]
+        report.append({
+            "row": int(idx) + FIRST_ROW,
+            "column": column,
+            "value": None if pd.isna(value) else str(value),
+            "problem": problem,
+            "fatal": fatal,
+        })
+
+
+def _number(raw, report, column, problem="geen getal"):
+    """Column as float (NaN where empty); text that is not a number is reported."""
+    values = pd.to_numeric(raw[column], errors='coerce')
+    blank = raw[column].isna() | (raw[column].astype(str).str.strip() == '')
+    _flag(report, raw, values.isna() & ~blank, column, problem)
+    return values
+
+
+def _split(raw, column, width=None):
+    """Comma separated column → DataFrame of stripped parts ('' where missing), one column per position."""
+    text = raw[column].astype('string').fillna('').str.strip()
+    parts = text.str.split(',', expand=True)
+    if width is not None:
+        parts = parts.reindex(columns=range(width))
+    return parts.fillna('').apply(lambda col: col.str.strip()), text == ''
+
+
+def _int_lists(raw, report, column):
+    """Comma separated integers → (list per row, 2D float array of the parts, NaN-padded)."""
+    parts, blank = _split(raw, column)
+    numbers = parts.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    bad = ((parts != '').to_numpy() & (np.isnan(numbers) | (numbers != np.round(numbers)))).any(axis=1) & ~blank.to_numpy()
+    _flag(report, raw, bad, column, "geen lijst van gehele getallen, bijvoorbeeld '7,7'")
+    lists = [[] if empty else [int(v) for v in row if not np.isnan(v)]
+             for row, empty in zip(numbers, blank)]
+    return lists, numbers
+
+
+def parse_workers(df_werknemers: pd.DataFrame, today=None):
+    """
+    Converts the raw worker block (see loaders.read_workers) into the typed workers frame of
+    preprocess_data: empty rows and rows with wensen 'niet plannen' or deskundigheid 5/6 are
+    dropped, dates, numbers and comma separated lists are parsed column-wise and leeftijd is
+    computed from geboortedatum on today (default: the current date).
+    Returns (workers, report): report lists the schema violations as dicts with row (Excel
+    row), column, value, problem and fatal. Raises WorkerSheetError when a column is missing
+    or any value cannot be converted (fatal), with all violations in one message.
+    """
+    report = []
+    missing = [c for c in REQUIRED_COLUMNS if c not in df_werknemers.columns]
+    if missing:
+        raise WorkerSheetError([{"row": None, "column": c, "value": None, "problem": "kolom ontbreekt", "fatal": True}
+                                for c in missing])
+    today = today or dt.datetime.now().date()
+
+    raw = df_werknemers.reset_index(drop=True)
+    # T:AH is read as deep as the longest block of the sheet, so shorter worker lists end in empty rows
+    raw = raw[raw[REQUIRED_COLUMNS].notna().any(axis=1)]
+    raw = raw[raw['wensen'] != 'niet plannen']
+    workers = raw.copy()
+    workers['medewerker_id'] = workers['medewerker_id'].astype(str)
+    _flag(report, raw, raw['medewerker_id'].isna(), 'medewerker_id', "medewerker_id ontbreekt")
+
+    # contract dates (dd/mm/yyyy), no end date: 31-12-2099
+    workers = workers.rename(columns={'datum indienst': 'contact vanaf', 'datum uit dienst': 'contract tm', 'deskundigheid.1': 'deskundigheid'})
+    for column, target in (('datum indienst', 'contract_vanaf'), ('datum uit dienst', 'contract_tm')):
+        dates = pd.to_datetime(raw[column], format='%d/%m/%Y', errors='coerce')
+        _flag(report, raw, dates.isna() & raw[column].notna(), column, "geen datum (dd/mm/jjjj)")
+        workers[target] = dates
+    workers['contract_tm'] = workers['contract_tm'].fillna(pd.Timestamp('2099-12-31'))
+    workers = workers.drop(columns=['contact vanaf', 'contract tm'])
+
+    # deskundigheid: one level per digit (12 -> [1, 2])
+    levels = _number(raw, report, 'deskundigheid.1')
+    bad = levels.notna() & ((levels <= 0) | (levels != levels.round()))
+    _flag(report, raw, bad | raw['deskundigheid.1'].isna(), 'deskundigheid.1', "geen positief geheel getal")
+    digits = levels.where(~bad).fillna(0).astype(np.int64).astype(str)
+    workers['deskundigheid'] = [[int(c) for c in d] for d in digits]
+    _flag(report, raw, digits.str.contains('[089]') & levels.notna() & ~bad, 'deskundigheid.1', "onbekend niveau (8, 9 of 0)", fatal=False)
+
+    # contract hours: 0 for oproep, 9 hours per work day when empty or 0
+    workers.loc[workers['contract soort'] == 'oproep', 'contracturen'] = 0
+    contracturen = _number(workers, report, 'contracturen')
+    max_days = _number(raw, report, 'max_werkdgn_pw')
+    workers['max_days_per_week'] = max_days.fillna(0).astype(int)
+    workers['contract_hours'] = contracturen.fillna(0).astype(float)
+    workers.loc[workers['contract_hours'] == 0, 'contract_hours'] = workers['max_days_per_week'] * 9
+    workers['contract_minutes'] = (workers['contract_hours'] * 60).round().astype(int)
+
+    # leeftijd on today, one year less when the birthday has not been reached yet
+    birth = pd.to_datetime(raw['geboortedatum'], errors='coerce')
+    _flag(report, raw, birth.isna(), 'geboortedatum', "geen datum")
+    before_birthday = (birth.dt.month > today.month) | ((birth.dt.month == today.month) & (birth.dt.day > today.day))
+    workers['leeftijd'] = (today.year - birth.dt.year - before_birthday.astype(int)).fillna(0).astype(int)
+
+    # voorkeur dagdelen: 'dag, avond, nacht'
+    column = 'voorkeur dagdelen (dag, avond, nacht)'
+    parts, blank = _split(raw, column, width=3)
+    workers['voorkeur_dagdelen'] = [[] if empty else [p.strip() for p in str(text).split(',')]
+                                    for text, empty in zip(raw[column], blank)]
+    for i, name in enumerate(['voorkeur_dag', 'voorkeur_avond', 'voorkeur_nacht']):
+        workers[name] = parts[i]
+        _flag(report, raw, ~parts[i].str.lower().isin(PREFERENCE_VALUES), column,
+              f"onbekende voorkeur voor {name.split('_')[1]} (niet, overig of uitsluitend)", fatal=False)
+
+    workers['patroon'], _ = _int_lists(raw, report, 'patroon')
+    workers['achtereenvolgende_diensten'], consecutive = _int_lists(raw, report, 'achtereenvolgende diensten')
+    consecutive = np.pad(consecutive, ((0, 0), (0, max(0, 2 - consecutive.shape[1]))), constant_values=np.nan)
+    workers['min_achtereenvolgende_diensten'] = np.nan_to_num(consecutive[:, 0]).astype(int)
+    workers['max_achtereenvolgende_diensten'] = np.nan_to_num(consecutive[:, 1]).astype(int)
+
+    workers['rust_na_werkperiode'] = _number(raw, report, 'rust na werkperiode').fillna(0).astype(int)
+
+    if any(r['fatal'] for r in report):
+        raise WorkerSheetError(report)
+
+    # Delete all employees with deskundigheid = 5 or 6, and add 3 where there is a 7
+    workers = workers[[not (5 in d or 6 in d) for d in workers['deskundigheid']]].reset_index(drop=True)
+    workers['deskundigheid'] = [d + [3] if 7 in d and 3 not in d else d for d in workers['deskundigheid']]
+    return workers, report
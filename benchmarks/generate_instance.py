@@ -0,0 +1,217 @@
+import argparse
+import datetime as dt
+import os
+import random
+
+from openpyxl import Workbook
+from openpyxl.utils import column_index_from_string
+
+
+# Shift template modelled on a typical Gastenhuis location (Tabellen E:P)
+SHIFT_TEMPLATE = [
+    # (dienst, actie, begin, eind, deskundigheid, dagen ma..zo)
+    ("D1", "plannen", "07:00:00", "15:00:00", "2. Verzorgende", ["Ja"] * 7),
+    ("D2", "plannen", "07:30:00", "15:00:00", "2. Verzorgende", ["Ja"] * 7),
+    ("D3", "plannen", "07:30:00", "14:00:00", "3. Medewerker woonzorg", ["Ja"] * 7),
+    ("D4", "plannen", "08:45:00", "12:45:00", "3. Medewerker woonzorg", ["Ja", "Ja", "Ja", "Nee", "Nee", "Nee", "Ja"]),
+    ("E1", "niet plannen", "07:30:00", "14:30:00", "99. NVT", ["Nee"] * 7),
+    ("FM", "plannen", "08:00:00", "12:30:00", "6. Facilitair", ["Ja"] * 5 + ["Nee"] * 2),
+    ("GD", "plannen", "08:00:00", "14:00:00", "4. Gastvrouw", ["Ja"] * 7),
+    ("KOK", "plannen", "15:00:00", "19:30:00", "5. Kok", ["Ja"] * 7),
+    ("A1", "plannen", "15:00:00", "23:00:00", "2. Verzorgende", ["Ja"] * 7),
+    ("A2", "plannen", "15:30:00", "22:30:00", "2. Verzorgende, 3. Medewerker woonzorg", ["Ja"] * 7),
+    ("A3", "plannen", "18:30:00", "02:30:00", "3. Medewerker woonzorg", ["Facultatief"] * 7),
+    ("GA", "plannen", "16:00:00", "22:00:00", "4. Gastvrouw", ["Ja"] * 7),
+    ("N", "plannen", "22:45:00", "07:00:00", "2. Verzorgende", ["Ja"] * 7),
+]
+
+WORKER_COLUMNS = [
+    "medewerker_id", "medewerker_naam", "wensen", "datum indienst", "datum uit dienst",
+    "functie", "deskundigheid", "contract soort", "contracturen", "max_werkdgn_pw",
+    "geboortedatum", "voorkeur dagdelen (dag, avond, nacht)", "patroon",
+    "achtereenvolgende diensten", "rust na werkperiode",
+]
+
+DESKUNDIGHEID_LABELS = {1: "1. Verpleegkundige", 2: "2. Verzorgende", 3: "3. Medewerker woonzorg", 4: "4. Gastvrouw"}
+DAY_NAMES = ["maandag", "dinsdag", "woensdag", "donderdag", "vrijdag", "zaterdag", "zondag"]
+
+
+def _write_block(ws, first_col, header_row, header, rows):
+    """Write a header + rows block starting at column letter first_col."""
+    col0 = column_index_from_string(first_col)
+    for j, name in enumerate(header):
+        ws.cell(row=header_row, column=col0 + j, value=name)
+    for i, row in enumerate(rows, start=1):
+        for j, value in enumerate(row):
+            if value is not None:
+                ws.cell(row=header_row + i, column=col0 + j, value=value)
+
+
+def _random_worker(rng, i, team, night_only=False, pattern=False):
+    emp_id = f"{600000 + i}-1"
+    level = 2 if night_only else rng.choices([1, 2, 3, 4], weights=[1, 4, 4, 2])[0]
+    # deskundigheid code is stored as concatenated digits (e.g. 23 → [2, 3])
+    code = level * 10 + level + 1 if level < 4 and rng.random() < 0.3 else level
+    hours = rng.choice([16, 20, 24, 28, 32, 36])
+    soort = "oproep" if rng.random() < 0.1 else "vaste uren"
+    birth = dt.date(rng.randint(1962, 2004), rng.randint(1, 12), rng.randint(1, 28))
+    dag, avond, nacht = (rng.choice(["", "", "overig", "niet"]) for _ in range(3))
+    patroon = None
+    if night_only:
+        dag, avond, nacht = "niet", "niet", "uitsluitend"
+        if pattern:
+            patroon = "7,7"
+    elif pattern:
+        patroon = rng.choice(["4,3", "5,2"])
+    consec = None if pattern else rng.choice([None, None, "2,5", "1,4"])
+    rust = rng.choice([None, None, 2]) if consec else None
+    if pattern:
+        hours, soort = 36, "vaste uren"
+    wensen = rng.choice(["", "", "", "weekend"])
+    return [
+        emp_id, f"Medewerker {i} ({team})", wensen,
+        "01/01/2020", None,
+        DESKUNDIGHEID_LABELS[level], code,
+        soort, hours, 7 if pattern else rng.choice([3, 4, 5]),
+        birth, f"{dag}, {avond}, {nacht}", patroon, consec, rust,
+    ]
+
+
+def _template_rows(shift_sets):
+    # every extra shift set repeats the plannable shifts (except the fixed KOK/FM rosters)
+    rows = list(SHIFT_TEMPLATE)
+    for k in range(2, shift_sets + 1):
+        rows += [(f"{name}-{k}", *rest) for name, *rest in SHIFT_TEMPLATE
+                 if rest[0] == "plannen" and name not in ("KOK", "FM")]
+    return rows
+
+
+def _shift_set(name):
+    """Shift set of a template shift name: 1 for the base template, k for the copies named '<name>-k'."""
+    return int(name.rsplit("-", 1)[1]) if "-" in name else 1
+
+
+def generate_instance(out_dir, employees=25, teams=1, weeks=4, unavailability=0.1,
+                      pattern_workers=0, night_only_workers=0, shift_sets=1, seed=0, start_date=None):
+    """
+    Writes a synthetic pair of workbooks to out_dir that matches the layout read by
+    app.loaders (read_workers, read_rooster_template, read_vast_rooster, read_onb,
+    read_prev_assignments). shift_sets > 1 repeats the shift template to scale the
+    number of shifts with the number of employees. Returns the paths of both workbooks.
+    """
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+
+    if start_date is None:
+        today = dt.date.today()
+        start_date = today + dt.timedelta(days=(7 - today.weekday()) % 7)
+    prev_start = start_date - dt.timedelta(days=7 * weeks)
+
+    team_names = [f"Team {t + 1}" for t in range(teams)]
+    template = _template_rows(shift_sets)
+
+    # --- workers ---
+    workers = []
+    emp_team = {}
+    for i in range(employees):
+        team = team_names[i % teams]
+        night_only = i < night_only_workers
+        pattern = i < pattern_workers
+        row = _random_worker(rng, i, team, night_only=night_only, pattern=pattern)
+        if i >= employees - 2:
+            # fixed KOK/FM rosters are subtracted from the contract, keep it large enough
+            row[8], row[7] = 36, "vaste uren"
+        workers.append(row)
+        emp_team[row[0]] = team
+
+    # --- workbook 1: Tabellen + Vaste roosters ---
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Tabellen"
+    ws.cell(row=1, column=5, value="Rooster template")
+    ws.cell(row=1, column=20, value="Medewerkers")
+    template_header = ["diensten", "actie", "begin", "eind", "deskundigheid",
+                       "maandag", "dinsdag", "woensdag", "donderdag", "vrijdag", "zaterdag", "zondag"]
+    template_rows = [[name, actie, begin, eind, desk, *days] for name, actie, begin, eind, desk, days in template]
+    _write_block(ws, "E", 2, template_header, template_rows)
+    _write_block(ws, "T", 2, WORKER_COLUMNS, workers)
+
+    ws_vast = wb.create_sheet("Vaste roosters")
+    ws_vast.cell(row=1, column=1, value="Vaste roosters")
+    vast_rows = []
+    for i in range(employees - min(2, employees), employees):
+        for week in range(1, weeks + 1):
+            for dow in range(5):
+                vast_rows.append([workers[i][0], workers[i][1], week, DAY_NAMES[dow], "KOK" if i == employees - 1 else "FM"])
+    _write_block(ws_vast, "A", 2, ["medewerker_id", "naam", "weekvolgnr", "dag", "dienst"], vast_rows)
+
+    workers_path = os.path.join(out_dir, "werknemers_rooster_template.xlsx")
+    wb.save(workers_path)
+
+    # --- workbook 2: onbeschikbaarheid + vorig rooster ---
+    wb2 = Workbook()
+    ws_onb = wb2.active
+    ws_onb.title = "Aanlevering onbeschikbaarheid p"
+    onb_rows = []
+    pattern_ids = {row[0] for row in workers[:pattern_workers]}
+    for emp_id, team in emp_team.items():
+        if emp_id in pattern_ids:
+            # a fixed pattern without known phase must work every on day, keep it feasible
+            continue
+        for day in range(7 * weeks):
+            r = rng.random()
+            if r >= unavailability:
+                continue
+            date = dt.datetime.combine(start_date + dt.timedelta(days=day), dt.time())
+            if rng.random() < 0.2:
+                onb_rows.append([emp_id, emp_id, team, date, "Beschikbaar", None, None])
+            elif rng.random() < 0.5:
+                onb_rows.append([emp_id, emp_id, team, date, "Niet beschikbaar", None, None])
+            else:
+                onb_rows.append([emp_id, emp_id, team, date, "Niet beschikbaar", "08:00", "13:00"])
+    _write_block(ws_onb, "A", 1, ["Medewerker id", "Mw_id", "Team medewerker", "Datum beschikbaarheid",
+                                  "Beschikbaarheid", "Beschikbaarheid tijd vanaf", "Beschikbaarheid tijd t/m"], onb_rows)
+
+    ws_prev = wb2.create_sheet("Aanlevering diensten")
+    prev_rows = []
+    plannable = [s for s in template if s[1] == "plannen" and s[0] not in ("KOK", "FM")]
+    # pattern workers start without history so the solver may choose their phase
+    emp_list = [row[0] for row in workers[pattern_workers:]]
+    # shift set k is worked by team k (round robin), so like on a real location every shift name
+    # belongs to one team in the previous roster (see app.decompose.team_groups)
+    team_emps = {team: [emp for emp in emp_list if emp_team[emp] == team] for team in team_names}
+    for day in range(7 * weeks):
+        date = prev_start + dt.timedelta(days=day)
+        dow = date.weekday()
+        todays = [s for s in plannable if s[5][dow] == "Ja"]
+        for t, team in enumerate(team_names):
+            team_shifts = [s for s in todays if (_shift_set(s[0]) - 1) % teams == t]
+            workers_today = rng.sample(team_emps[team], min(len(team_shifts), len(team_emps[team])))
+            for shift, emp_id in zip(team_shifts, workers_today):
+                prev_rows.append([emp_id, emp_id, team, date.strftime("%d-%m-%Y"),
+                                  shift[0], shift[2][:5], shift[3][:5]])
+    _write_block(ws_prev, "A", 1, ["Medewerker id", "Mw_id", "Team medewerker", "Datum dienst",
+                                   "Dienst", "Dienst starttijd", "Dienst eindtijd"], prev_rows)
+
+    onb_path = os.path.join(out_dir, "onbeschikbaarheid_vorig_rooster.xlsx")
+    wb2.save(onb_path)
+    return workers_path, onb_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genereer een synthetische roosterinstantie (twee werkboeken).")
+    parser.add_argument("out_dir")
+    parser.add_argument("--employees", type=int, default=25)
+    parser.add_argument("--teams", type=int, default=1)
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--unavailability", type=float, default=0.1)
+    parser.add_argument("--pattern-workers", type=int, default=0)
+    parser.add_argument("--night-only-workers", type=int, default=0)
+    parser.add_argument("--shift-sets", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    paths = generate_instance(args.out_dir, employees=args.employees, teams=args.teams, weeks=args.weeks,
+                              unavailability=args.unavailability, pattern_workers=args.pattern_workers,
+                              night_only_workers=args.night_only_workers, shift_sets=args.shift_sets,
+                              seed=args.seed)
+    print("\n".join(paths))
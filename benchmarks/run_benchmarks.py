@@ -0,0 +1,206 @@
+"""
+Benchmark suite for the scheduling pipeline. For every instance size it generates a
+synthetic pair of workbooks and times parsing, preprocess_data (and the size and save/load
+time of the result as ProblemInstance, app/instance.py), the model build, the
+solve (time to first feasible and the quality reached at the time limit) and
+validate_auto_rooster. With --hints every instance is solved a second time, warm started
+from the projected previous roster (app/hints.py), to compare the time to a good solution.
+Results are written as JSON to benchmarks/results/.
+
+Run from the repository root:
+    python -m benchmarks.run_benchmarks --sizes 25 100 --time-limit 60
+"""
+import argparse
+import contextlib
+import datetime as dt
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import ortools
+
+from app import preprocess_data, auto_rooster, validate_auto_rooster
+from app.hints import build_hint, time_to_good
+from app.instance import ProblemInstance
+from app.loaders import load_workbooks
+from app.objective import WEIGHT_PROFILES
+from app.progress import time_to_gap
+from benchmarks.generate_instance import generate_instance
+
+DEFAULT_SIZES = [25, 100, 300, 1000]
+GAP_TARGETS = [0.5, 0.2, 0.1]  # relative gaps reported as time_to_gap_s
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def instance_params(employees):
+    """Scales teams and shifts with the number of employees (about 25 employees per shift set)."""
+    teams = max(1, employees // 25)
+    return {
+        "employees": employees,
+        "teams": teams,
+        "shift_sets": teams,
+        "pattern_workers": max(1, employees // 50),
+        "night_only_workers": max(1, employees // 25),
+    }
+
+
+def instance_metrics(data):
+    """Size of the preprocessed data as ProblemInstance (arrays and .npz) and its save/load times."""
+    t0 = time.perf_counter()
+    instance = ProblemInstance.from_data(data)
+    t1 = time.perf_counter()
+    buffer = io.BytesIO()
+    instance.save(buffer)
+    t2 = time.perf_counter()
+    buffer.seek(0)
+    ProblemInstance.load(buffer).to_data()
+    t3 = time.perf_counter()
+    return {
+        "array_mb": round(instance.nbytes / 2**20, 3),
+        "file_mb": round(buffer.getbuffer().nbytes / 2**20, 3),
+        "from_data_s": round(t1 - t0, 3),
+        "save_s": round(t2 - t1, 3),
+        "load_s": round(t3 - t2, 3),
+    }
+
+
+def run_instance(employees, time_limit_s, seed, weeks, hints=False, weights="default", staged=False):
+    """Generates one instance and runs the full pipeline on it; returns the timings and quality."""
+    params = instance_params(employees)
+    row = {"params": dict(params, weeks=weeks, seed=seed, time_limit_s=time_limit_s, weights=weights,
+                             staged=staged)}
+    with tempfile.TemporaryDirectory() as out_dir:
+        workers_path, onb_path = generate_instance(out_dir, weeks=weeks, seed=seed, **params)
+
+        # the pipeline prints a lot; keep it out of the benchmark output
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            frames = load_workbooks(workers_path, onb_path)
+            t1 = time.perf_counter()
+            data = preprocess_data(df_werknemers=frames["workers"], df_rooster_template=frames["rooster_template"],
+                                   df_onb=frames["onb"], prev_assignments=frames["prev_assignments"],
+                                   df_vastrooster=frames["vast_rooster"], num_weeks=weeks)
+            t2 = time.perf_counter()
+            result = auto_rooster(data, time_limit_s=time_limit_s, on_incumbent=None, weights=weights, staged=staged)
+            t3 = time.perf_counter()
+            errors = validate_auto_rooster(data, result) if result else None
+            t4 = time.perf_counter()
+            if hints:
+                hint, hint_info = build_hint(data, "previous", repair=True)
+                hinted = auto_rooster(data, time_limit_s=time_limit_s, on_incumbent=None, hint=hint, weights=weights,
+                                      staged=staged)
+
+    row.update({
+        "shifts": len(data["shifts"]),
+        "parse_s": round(t1 - t0, 3),
+        "parse": frames["timings"],
+        "preprocess_s": round(t2 - t1, 3),
+        "instance": instance_metrics(data),
+        "auto_rooster_s": round(t3 - t2, 3),
+        "validate_s": round(t4 - t3, 3),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    })
+    if result is None:
+        row["solver_status"] = "NO_SOLUTION"
+        return row
+
+    build = result["build_profile"]["total"]
+    incumbents = result["incumbents"]
+    objective, bound = result["objective_value"], result["best_bound"]
+    row.update({
+        "solver_status": result["solver_status"],
+        "variables": build["variables"],
+        "constraints": build["constraints"],
+        "build_s": build["time_s"],
+        "build_memory_mb": build["memory_mb"],
+        "presolve_s": result["presolve_s"],
+        "solve_s": round(result["solve_time_s"], 3),
+        "stop_reason": result["stop_reason"],
+        "first_feasible_s": incumbents[0]["elapsed_s"] if incumbents else None,
+        "first_objective": incumbents[0]["objective"] if incumbents else None,
+        "incumbents": len(incumbents),
+        "objective": objective,
+        "best_bound": bound,
+        "gap": abs(objective - bound) / max(1.0, abs(objective)),
+        "time_to_gap_s": {f"{int(100 * g)}%": time_to_gap(incumbents, g) for g in GAP_TARGETS},
+        "uncovered_shifts": len(result["uncovered_shifts"]),
+        "validation_errors": None if errors is None else len(errors),
+        "objective_breakdown": result["objective_breakdown"],
+        "phases": result["phases"],
+        "build_profile": result["build_profile"]["sections"],
+    })
+    if hints and hinted is not None:
+        # "good" is measured against the best objective of both runs
+        reference = min(objective, hinted["objective_value"])
+        row["time_to_good_s"] = time_to_good(incumbents, reference)
+        row["hinted"] = {
+            **hint_info,
+            "hinted_shifts": hinted["hinted_shifts"],
+            "first_feasible_s": hinted["incumbents"][0]["elapsed_s"] if hinted["incumbents"] else None,
+            "first_objective": hinted["incumbents"][0]["objective"] if hinted["incumbents"] else None,
+            "time_to_good_s": time_to_good(hinted["incumbents"], reference),
+            "objective": hinted["objective_value"],
+            "solver_status": hinted["solver_status"],
+        }
+    return row
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, time_limit_s=60, seed=0, weeks=4, out_path=None, hints=False,
+                   weights="default", staged=False):
+    """Runs every size in a fresh process (so peak memory is per size) and writes the JSON report."""
+    report = {
+        "created": dt.datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "ortools": ortools.__version__,
+        "cpu_count": os.cpu_count(),
+        "runs": [],
+    }
+    for employees in sizes:
+        print(f"=== {employees} employees ===", flush=True)
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            try:
+                row = pool.submit(run_instance, employees, time_limit_s, seed, weeks, hints, weights, staged).result()
+            except Exception as e:
+                row = {"params": {"employees": employees}, "error": repr(e)}
+        report["runs"].append(row)
+        print(json.dumps({k: v for k, v in row.items() if k != "build_profile"}), flush=True)
+
+    if out_path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out_path = os.path.join(RESULTS_DIR, f"bench_{dt.datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(out_path, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Results written to {out_path}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de roosterpipeline op synthetische instanties.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="aantallen medewerkers")
+    parser.add_argument("--time-limit", type=float, default=60, help="tijdslimiet per solve in seconden")
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--hints", action="store_true", help="ook oplossen met startoplossing uit het vorige rooster")
+    parser.add_argument("--weights", choices=sorted(WEIGHT_PROFILES), default="default", help="gewichtenprofiel")
+    parser.add_argument("--staged", action="store_true", help="twee fasen: eerst bezetting, dan kwaliteit")
+    parser.add_argument("--out", default=None, help="pad van het JSON-resultaat (standaard benchmarks/results/)")
+    args = parser.parse_args()
+    run_benchmarks(sizes=args.sizes, time_limit_s=args.time_limit, seed=args.seed, weeks=args.weeks, out_path=args.out,
+                   hints=args.hints, weights=args.weights,
+                   staged=args.staged)
@@ -0,0 +1,28 @@
+import contextlib
+import io
+
+import pytest
+
+from app import preprocess_data
+from app.loaders import load_workbooks
+from benchmarks.generate_instance import generate_instance
+
+
+@pytest.fixture(scope="session")
+def workbooks(tmp_path_factory):
+    """Paths of a small synthetic pair of workbooks (see benchmarks/generate_instance.py)."""
+    return generate_instance(str(tmp_path_factory.mktemp("instance")), employees=12, weeks=2, seed=1)
+
+
+@pytest.fixture(scope="session")
+def frames(workbooks):
+    return load_workbooks(*workbooks)
+
+
+@pytest.fixture
+def data(frames):
+    """Freshly preprocessed data for the small instance (the pipeline prints a lot, kept quiet)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return preprocess_data(df_werknemers=frames["workers"].copy(), df_rooster_template=frames["rooster_template"].copy(),
+                               df_onb=frames["onb"].copy(), prev_assignments=frames["prev_assignments"].copy(),
+                               df_vastrooster=frames["vast_rooster"].copy(), num_weeks=2)
@@ -0,0 +1,25 @@
+import datetime as dt
+
+from app import cache
+from app.preprocessing import next_monday
+
+
+def test_next_monday():
+    assert next_monday(dt.date(2026, 10, 14)) == next_monday(dt.date(2026, 10, 19)) == dt.datetime(2026, 10, 19)
+    assert next_monday(dt.date(2026, 10, 20)) == dt.datetime(2026, 10, 26)
+
+
+def test_entries_outlive_the_day(data, tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path))
+    key = cache.cache_key(b"workers", b"onb")
+
+    # the previous roster fixes the start date, so the entry holds on any later day
+    assert data["default_start_date"] is None
+    cache.put_cached(key, data)
+    assert cache.get_cached(key, today=dt.date.today() + dt.timedelta(days=30)) is not None
+
+    # planned from next Monday without a previous roster: valid until that Monday has passed
+    cache.put_cached(key, dict(data, default_start_date="2026-10-19"))
+    assert cache.get_cached(key, today=dt.date(2026, 10, 14)) is not None
+    assert cache.get_cached(key, today=dt.date(2026, 10, 19)) is not None
+    assert cache.get_cached(key, today=dt.date(2026, 10, 20)) is None
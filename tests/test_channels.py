@@ -0,0 +1,51 @@
+import datetime as dt
+
+from ortools.sat.python import cp_model
+
+from app.channels import ChannelRegistry
+
+MON, TUE = dt.date(2026, 10, 19), dt.date(2026, 10, 20)
+
+
+def _registry():
+    model = cp_model.CpModel()
+    # shifts 0 and 1 on Monday (1 is a night), shift 2 on Tuesday; "b" is not eligible for shift 0
+    x = {(s, emp): model.NewBoolVar(f"x_s{s}_e{emp}") for s in (0, 1, 2) for emp in ("a", "b") if (s, emp) != (0, "b")}
+
+    def xs(shift_ids, emp):
+        return [x[(s, emp)] for s in shift_ids if (s, emp) in x]
+
+    return model, x, ChannelRegistry(model, xs, {MON: [0, 1], TUE: [2]}, {MON: [1]}, {1: [2]})
+
+
+def test_each_indicator_is_created_once():
+    model, _, channels = _registry()
+    assert channels.works_on("a", MON) is channels.works_on("a", MON)
+    assert channels.works_on("a", MON) is not channels.works_on("b", MON)
+
+    size = len(model.Proto().variables)
+    # block start/end reuse the works-on indicators of both days
+    channels.block_start("a", MON, TUE)
+    channels.block_end("a", MON, TUE)
+    channels.block_start("a", MON, TUE)
+    assert len(model.Proto().variables) == size + 3  # works_on(a, TUE), start and end
+    assert channels.counts() == {"work": 3, "block_start": 1, "block_end": 1}
+
+
+def test_indicators_follow_the_assignments():
+    model, x, channels = _registry()
+    model.Add(x[(1, "a")] == 1)
+    model.Add(sum(v for (s, emp), v in x.items() if emp == "b" or s == 2) == 0)
+    indicators = {
+        "works_mon": channels.works_on("a", MON),
+        "night_mon": channels.works_night_on("a", MON),
+        "weekend": channels.works_weekend("a", 1),
+        "start_tue": channels.block_start("a", MON, TUE),
+        "end_mon": channels.block_end("a", MON, TUE),
+        "b_night_free": channels.works_night_on("b", TUE),  # no night on Tuesday: fixed at 0
+    }
+
+    solver = cp_model.CpSolver()
+    assert solver.Solve(model) == cp_model.OPTIMAL
+    assert {name: solver.Value(b) for name, b in indicators.items()} == {
+        "works_mon": 1, "night_mon": 1, "weekend": 0, "start_tue": 0, "end_mon": 1, "b_night_free": 0}
@@ -0,0 +1,37 @@
+import json
+
+import pandas as pd
+import pytest
+
+from app import cache
+from app.__main__ import main, parse_args
+
+
+def test_defaults_and_choices():
+    args = parse_args(["werknemers.xlsx", "onb.xlsx"])
+    assert (args.team, args.split, args.weeks, args.profile, args.hint, args.output) == (
+        None, "none", 4, "standard", "auto", "rooster.csv")
+    assert args.time_limit is None and args.threads is None and not args.staged
+
+    with pytest.raises(SystemExit):
+        parse_args(["werknemers.xlsx", "onb.xlsx", "--profile", "fast"])
+    with pytest.raises(SystemExit):
+        parse_args(["werknemers.xlsx"])
+
+
+def test_writes_roster_and_stats(workbooks, tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path / "cache"))
+    output = tmp_path / "rooster.csv"
+    code = main([*workbooks, "--weeks", "2", "--profile", "draft", "--time-limit", "5", "--threads", "2",
+                 "--hint", "none", "--output", str(output), "--quiet"])
+    assert code == 0
+
+    roster = pd.read_csv(output)
+    with open(tmp_path / "rooster.json") as f:
+        stats = json.load(f)
+    assert stats["total_shifts"] == len(roster)
+    assert stats["shifts_filled"] == roster["shift_filled"].sum()
+    assert (stats["weeks"], stats["profile"], stats["threads"], stats["time_limit_s"]) == (2, "draft", 2, 5)
+    assert stats["validation_errors"] == []
+    # the solution is kept as warm start for the next run on the same inputs
+    assert [p.suffixes for p in (tmp_path / "cache").iterdir()] == [[".hint", ".json"]]
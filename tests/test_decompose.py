@@ -0,0 +1,52 @@
+import contextlib
+import io
+
+import pytest
+
+from app import auto_rooster, preprocess_data
+from app.decompose import eligibility_components, eligible_pairs, solve_decomposed, team_groups
+from app.loaders import load_workbooks
+from benchmarks.generate_instance import generate_instance
+
+
+@pytest.fixture(scope="module")
+def two_teams(tmp_path_factory):
+    """Two teams with a shift set each, every employee is eligible for shifts of both teams."""
+    paths = generate_instance(str(tmp_path_factory.mktemp("teams")), employees=16, teams=2, shift_sets=2, weeks=1, seed=3)
+    frames = load_workbooks(*paths)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return preprocess_data(df_werknemers=frames["workers"], df_rooster_template=frames["rooster_template"],
+                               df_onb=frames["onb"], prev_assignments=frames["prev_assignments"],
+                               df_vastrooster=frames["vast_rooster"], num_weeks=1)
+
+
+def _solve(solve, data, **options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = solve(data, time_limit_s=60, on_incumbent=None, num_workers=2, **options)
+    assert result['solver_status'] == "OPTIMAL"
+    return result['objective_value']
+
+
+def test_cross_team_pairs_stay_in_one_component(two_teams):
+    components = eligibility_components(two_teams)
+    assert len(components) == 1
+    assert components[0]['pairs'] == len(eligible_pairs(two_teams))
+
+    # the team split is opt-in and drops the cross-team pairs
+    assert len(eligibility_components(two_teams, split_teams=True)) == 2
+
+
+def test_components_add_up_to_the_monolithic_objective(two_teams):
+    # block the cross-team pairs, so the eligibility graph itself has two components
+    shift_group, emp_group = team_groups(two_teams)
+    data = dict(two_teams, blocked_pairs=two_teams['blocked_pairs'] | {
+        (s, emp) for s, emp in eligible_pairs(two_teams) if shift_group[s] != emp_group[emp]})
+    assert len(eligibility_components(data)) == 2
+
+    assert _solve(solve_decomposed, data) == _solve(auto_rooster, data)
+
+
+def test_team_split_is_a_constraint(two_teams):
+    monolithic = _solve(auto_rooster, two_teams)
+    assert _solve(solve_decomposed, two_teams) == monolithic
+    assert _solve(solve_decomposed, two_teams, split_teams=True) >= monolithic
@@ -0,0 +1,63 @@
+import contextlib
+import datetime as dt
+import io
+
+import pandas as pd
+
+from app import auto_rooster
+from app.decompose import eligible_pairs
+from app.hints import build_hint, project_previous_period, repair_hint, solution_hint
+
+
+def _quiet(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def _assert_keeps_the_simple_rules(data, hint):
+    shifts = data['shifts'].set_index('shift_id')
+    table, index = data['emp_table'], data['emp_index']
+    assert set(hint.items()) <= eligible_pairs(data)
+
+    rows = shifts.loc[list(hint)].assign(employee_id=list(hint.values()))
+    rows['date'] = pd.to_datetime(rows['shift_date']).dt.date
+    assert not rows.duplicated(['employee_id', 'date']).any()
+    nights = set(zip(rows.loc[rows['is_night'], 'employee_id'], rows.loc[rows['is_night'], 'date']))
+    for emp, d in zip(rows.loc[~rows['is_night'], 'employee_id'], rows.loc[~rows['is_night'], 'date']):
+        assert (emp, d - dt.timedelta(days=1)) not in nights
+    for (emp, _), days in rows.groupby(['employee_id', 'week'])['date'].nunique().items():
+        assert days <= table['max_days_per_week'][index[emp]]
+    for emp, minutes in rows.groupby('employee_id')['duration_min'].sum().items():
+        assert minutes <= table['contract_minutes'][index[emp]] * len(data['weeks'])
+
+
+def test_repaired_previous_period_keeps_the_simple_rules(data):
+    projected = project_previous_period(data)
+    assert projected
+
+    # a day shift right after a night of the same employee is dropped
+    shifts = data['shifts']
+    night = shifts[shifts['is_night']].iloc[0]
+    day = shifts[~shifts['is_night'] & (shifts['absolute_day'] == night['absolute_day'] + 1)].iloc[0]
+    emp = next(e for e in data['emp_ids'] if {(night['shift_id'], e), (day['shift_id'], e)} <= eligible_pairs(data))
+    projected.update({int(night['shift_id']): emp, int(day['shift_id']): emp})
+
+    hint, info = _quiet(build_hint, data, "previous", repair=True)
+    assert info['dropped'] == len(project_previous_period(data)) - len(hint)
+    repaired = _quiet(repair_hint, data, projected)
+    assert not (repaired.get(int(night['shift_id'])) == emp and repaired.get(int(day['shift_id'])) == emp)
+    _assert_keeps_the_simple_rules(data, hint)
+    _assert_keeps_the_simple_rules(data, repaired)
+
+
+def test_last_solution_is_a_complete_hint(data):
+    result = _quiet(auto_rooster, data, time_limit_s=5, on_incumbent=None, num_workers=2)
+    last = solution_hint(result)
+
+    # a solution breaks none of the rules the repair checks, so nothing is dropped
+    hint, info = _quiet(build_hint, data, "auto", last_solution=last, repair=True)
+    assert info == {"source": "last", "shifts": len(last), "repaired": True, "dropped": 0}
+    assert hint == last
+
+    hinted = _quiet(auto_rooster, data, time_limit_s=5, on_incumbent=None, num_workers=2, hint=hint)
+    assert hinted['hinted_shifts'] == len(last)
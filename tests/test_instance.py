@@ -0,0 +1,39 @@
+import io
+
+import pandas as pd
+
+from app import solver
+from app.decompose import eligible_pairs
+from app.instance import ProblemInstance
+
+
+def _round_trip(data):
+    buffer = io.BytesIO()
+    ProblemInstance.from_data(data).save(buffer)
+    buffer.seek(0)
+    return ProblemInstance.load(buffer).to_data()
+
+
+def test_round_trip_restores_the_data(data):
+    loaded = _round_trip(data)
+
+    for name in ("shifts", "workers", "onb", "prev_assignments"):
+        pd.testing.assert_frame_equal(loaded[name], data[name], check_dtype=False)
+    for name in ("emp_ids", "emp_index", "weeks", "night_shifts", "shifts_by_week", "shifts_by_day",
+                 "night_shifts_by_week", "dur_min", "blocked_pairs", "preferred_pairs", "unavailable_dates",
+                 "emp_team", "vast_rooster_unmatched", "worker_report"):
+        assert loaded[name] == data[name], name
+    for column, values in data["emp_table"].items():
+        assert list(loaded["emp_table"][column]) == list(values), column
+
+
+def test_loaded_instance_carries_the_eligible_pairs(data, monkeypatch):
+    loaded = _round_trip(data)
+    assert loaded["eligible_pairs"] == eligible_pairs(data)
+
+    def recompute(*args, **kwargs):
+        raise AssertionError("eligible pairs recomputed")
+
+    monkeypatch.setattr(solver, "compute_eligible_pairs", recompute)
+    result = solver.auto_rooster(loaded, time_limit_s=2, on_incumbent=None, num_workers=2)
+    assert result is not None
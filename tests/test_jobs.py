@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from web import jobs
+from web.app import app
+
+
+@pytest.fixture
+def job_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def client(job_dir):
+    return app.test_client()
+
+
+def test_events_are_paged_from_since(client):
+    job_id = "00000000-0000-4000-8000-000000000001"
+    jobs.update_job(job_id, state="running", phase="solving")
+    for objective in (30, 20, 10):
+        jobs.append_event(job_id, {"objective": objective})
+
+    page = client.get(f"/jobs/{job_id}/events").get_json()
+    assert [e["objective"] for e in page["events"]] == [30, 20, 10]
+    assert page["next"] == 3 and page["state"] == "running"
+
+    jobs.append_event(job_id, {"objective": 5})
+    page = client.get(f"/jobs/{job_id}/events?since=3").get_json()
+    assert [e["objective"] for e in page["events"]] == [5]
+    assert page["next"] == 4
+
+
+def test_purged_job_ends_polling_with_an_error(client, job_dir):
+    job_id = "00000000-0000-4000-8000-000000000002"
+    jobs.update_job(job_id, state="running", phase="solving")
+    assert client.get(f"/jobs/{job_id}/events").status_code == 200
+
+    for path in job_dir.iterdir():
+        path.unlink()
+    for url in (f"/jobs/{job_id}/events", f"/jobs/{job_id}"):
+        response = client.get(url)
+        assert response.status_code == 404
+        assert response.get_json()["error"] == "Unknown job"
+
+
+def _wait_for(job_id, states, timeout_s=5):
+    deadline = time.time() + timeout_s
+    while jobs.get_job(job_id)["state"] not in states:
+        assert time.time() < deadline, jobs.get_job(job_id)
+        time.sleep(0.01)
+
+
+def test_jobs_queue_behind_the_running_one_and_a_full_queue_is_rejected(job_dir, monkeypatch):
+    monkeypatch.setattr(jobs, "MAX_QUEUED_JOBS", 2)
+    release = threading.Event()
+
+    def job(job_id, n):
+        release.wait(5)
+        return {"n": n}
+
+    first = jobs.submit_job(job, 1)
+    second = jobs.submit_job(job, 2)
+    _wait_for(first, {"running"})
+    assert jobs.get_job(second)["state"] == "queued"  # MAX_RUNNING_JOBS is 1
+    with pytest.raises(jobs.JobQueueFull):
+        jobs.submit_job(job, 3)
+
+    release.set()
+    for job_id, n in ((first, 1), (second, 2)):
+        _wait_for(job_id, {"done"})
+        assert jobs.get_job(job_id)["n"] == n
+    # the finished jobs free their places in the queue
+    third = jobs.submit_job(job, 3)
+    _wait_for(third, {"done"})
+
+
+def test_failing_job_is_recorded_as_error(job_dir):
+    def job(job_id):
+        raise RuntimeError("kapot")
+
+    job_id = jobs.submit_job(job)
+    _wait_for(job_id, {"error"})
+    assert jobs.get_job(job_id)["error"] == "kapot"
+
+
+def test_solves_are_sized_for_every_process(monkeypatch):
+    monkeypatch.setattr(jobs, "MAX_RUNNING_JOBS", 2)
+    monkeypatch.setattr(jobs, "WEB_PROCESSES", 3)
+    assert jobs.max_concurrent_solves() == 6
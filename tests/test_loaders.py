@@ -0,0 +1,54 @@
+import datetime as dt
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+from openpyxl.styles import Font
+
+from app import loaders
+from app.loaders import load_workbook_frames, load_workbooks
+from benchmarks.generate_instance import generate_instance
+
+
+def _assert_same_frames(frames, workers_source, onb_source):
+    expected = {
+        "workers": loaders.read_workers(workers_source),
+        "rooster_template": loaders.read_rooster_template(workers_source),
+        "vast_rooster": loaders.read_vast_rooster(workers_source),
+        "onb": loaders.read_onb(onb_source),
+        "prev_assignments": loaders.read_prev_assignments(onb_source),
+    }
+    for name, frame in expected.items():
+        pd.testing.assert_frame_equal(frames[name], frame, obj=name)
+
+
+def test_matches_read_excel_on_generated_workbooks(workbooks, frames, tmp_path):
+    _assert_same_frames(frames, *workbooks)
+
+    paths = generate_instance(str(tmp_path), employees=16, teams=2, shift_sets=2, weeks=1, seed=3)
+    _assert_same_frames(load_workbooks(*paths), *paths)
+
+
+@pytest.mark.parametrize("usecols, skiprows", [(None, None), ("B:F", 1)])
+def test_matches_read_excel_on_awkward_sheets(tmp_path, usecols, skiprows):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Blad"
+    ws.append(["titel"])
+    # a merged and a repeated header, and mixed int/float/text/date columns
+    ws.append(["id", "naam", None, "uren", "uren", "datum"])
+    ws.merge_cells("B2:C2")
+    ws.append([1, "a", None, 36, 7.5, dt.datetime(2026, 10, 19)])
+    ws.append([2, None, None, 24.0, "x", dt.datetime(2026, 10, 20)])
+    ws.append([3, "c", None, None, 6, None])
+    # formatted but empty trailing rows and columns are written as empty cells
+    for row in range(6, 12):
+        for col in range(1, 10):
+            ws.cell(row=row, column=col).font = Font(bold=True)
+    path = tmp_path / "awkward.xlsx"
+    wb.save(path)
+
+    spec = ("Blad", usecols, skiprows)
+    frames, _ = load_workbook_frames(str(path), {"frame": spec})
+    expected = pd.read_excel(path, sheet_name="Blad", usecols=usecols, skiprows=skiprows)
+    pd.testing.assert_frame_equal(frames["frame"], expected)
@@ -0,0 +1,64 @@
+import contextlib
+import io
+
+import pytest
+from ortools.sat.python import cp_model
+
+from app import auto_rooster
+from app.objective import (UNDER_COVERAGE_TABLE, format_breakdown, get_weights, objective_breakdown, square_table,
+                           weighted_objective)
+
+
+@pytest.mark.parametrize("options", [{}, UNDER_COVERAGE_TABLE, dict(UNDER_COVERAGE_TABLE, divisor=3)])
+def test_square_table_is_convex(options):
+    unit, divisor = options.get("unit", 1), options.get("divisor", 1)
+    for max_value in range(0, 60 * 48 * 4, 7):
+        points, values = square_table(max_value, **options)
+        assert points[0] == 0 and points[-1] >= max_value
+        assert all(p % unit == 0 for p in points)
+        assert all(v * divisor >= (p // unit) ** 2 for p, v in zip(points, values))
+        # slopes of consecutive segments do not decrease
+        for (b0, v0), (b1, v1), (b2, v2) in zip(zip(points, values), zip(points[1:], values[1:]), zip(points[2:], values[2:])):
+            assert (v1 - v0) * (b2 - b1) <= (v2 - v1) * (b1 - b0)
+
+
+def test_breakdown_adds_up_to_the_objective():
+    model = cp_model.CpModel()
+    a, b, c = (model.NewBoolVar(name) for name in "abc")
+    model.AddBoolOr([a, b])
+    model.Add(c == 1)
+    terms = {"uncovered": [a], "overig": [2 * b], "preferred_shift": [c], "week_balance": []}
+    weights = get_weights({"uncovered": 7, "overig": 3})
+    model.Minimize(weighted_objective(terms, weights))
+
+    solver = cp_model.CpSolver()
+    assert solver.Solve(model) == cp_model.OPTIMAL
+    breakdown = objective_breakdown(solver, terms, weights)
+    assert breakdown == {
+        "uncovered": {"raw": 0, "weight": 7, "value": 0},
+        "overig": {"raw": 2, "weight": 3, "value": 6},
+        "preferred_shift": {"raw": 1, "weight": -1, "value": -1},
+        "week_balance": {"raw": 0, "weight": 1, "value": 0},
+    }
+    assert sum(row["value"] for row in breakdown.values()) == solver.ObjectiveValue()
+    assert format_breakdown(breakdown).splitlines()[-1].split() == ["total", "5"]
+
+
+def test_weights_are_integers():
+    assert get_weights("fairness")["week_balance"] == 5
+    assert get_weights({"overig": 20.0})["overig"] == 20
+    with pytest.raises(ValueError):
+        get_weights({"overig": 0.5})
+    with pytest.raises(ValueError):
+        get_weights("strict")
+
+
+def test_terms_need_no_multiplication_constraints(data, monkeypatch):
+    def multiply(*args, **kwargs):
+        raise AssertionError("multiplication constraint in the model")
+
+    monkeypatch.setattr(cp_model.CpModel, "AddMultiplicationEquality", multiply)
+    monkeypatch.setattr(cp_model.CpModel, "add_multiplication_equality", multiply)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = auto_rooster(data, time_limit_s=5, on_incumbent=None, num_workers=2)
+    assert sum(row["value"] for row in result["objective_breakdown"].values()) == result["objective_value"]
@@ -0,0 +1,39 @@
+import pytest
+
+from app import params
+from app.params import resolve_profile, solver_workers
+
+
+@pytest.fixture
+def cpus(monkeypatch):
+    def set_cpus(n):
+        monkeypatch.setattr(params, "available_cpus", lambda: n)
+    return set_cpus
+
+
+@pytest.mark.parametrize("available, concurrent, expected", [
+    (4, 1, 4),    # the whole quota for a single solve
+    (4, 2, 2),    # two jobs on a 4-CPU quota do not oversubscribe it
+    (4, 4, 2),    # one CPU each: two workers keep the CP-SAT portfolio
+    (1, 1, 2),
+    (64, 1, 16),  # capped at max_workers
+    (12, 0, 12),  # no running job counts as one
+])
+def test_solver_workers_follow_the_cpu_share(cpus, available, concurrent, expected):
+    cpus(available)
+    assert solver_workers(concurrent) == expected
+
+
+def test_profile_caps_and_overrides(cpus):
+    cpus(32)
+    assert resolve_profile("draft")["num_workers"] == 4
+    assert resolve_profile("standard", concurrent_solves=4)["num_workers"] == 8
+    assert resolve_profile("standard", num_workers=3)["num_workers"] == 3
+
+
+def test_available_cpus_uses_the_cgroup_quota(monkeypatch):
+    monkeypatch.setattr(params.os, "sched_getaffinity", lambda pid: set(range(8)), raising=False)
+    monkeypatch.setattr(params, "_cgroup_cpus", lambda: 2.5)
+    assert params.available_cpus() == 2
+    monkeypatch.setattr(params, "_cgroup_cpus", lambda: None)
+    assert params.available_cpus() == 8
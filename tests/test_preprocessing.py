@@ -0,0 +1,122 @@
+import contextlib
+import datetime as dt
+import io
+
+import pandas as pd
+
+from app.preprocessing import (DAY_COLUMNS, build_availability_pairs, build_shift_requirements, expand_shift_instances,
+                               minutes_of_day, preprocess_data, shift_helper_maps)
+
+MONDAY = dt.date(2024, 1, 1)
+TUESDAY = dt.date(2024, 1, 2)
+
+
+def _shifts():
+    # a night shift into Tuesday morning and a Tuesday day shift
+    return pd.DataFrame({
+        'shift_id': [1, 2],
+        'shift_date': pd.to_datetime([MONDAY, TUESDAY]),
+        'start_min': [22 * 60 + 45, 7 * 60],
+        'end_min': [31 * 60, 15 * 60],
+    })
+
+
+def _onb(date, start, end, availability='Niet beschikbaar'):
+    return pd.DataFrame({'Medewerker id': ['e1'], 'Datum': [date], 'Beschikbaarheid': [availability],
+                         'start_min': [start], 'end_min': [end]})
+
+
+def test_night_shift_overlaps_the_next_morning():
+    pairs = build_availability_pairs(_shifts(), _onb(TUESDAY, 6 * 60, 6 * 60 + 30), ['e1'])
+    assert pairs['blocked_pairs'] == {(1, 'e1')}
+    assert pairs['unavailable_dates'] == {'e1': {TUESDAY}}
+
+
+def test_window_past_midnight_blocks_the_next_day():
+    pairs = build_availability_pairs(_shifts(), _onb(MONDAY, 23 * 60, 8 * 60), ['e1'])
+    assert pairs['blocked_pairs'] == {(1, 'e1'), (2, 'e1')}
+
+
+def test_row_without_times_blocks_the_whole_day_and_beschikbaar_is_preferred():
+    pairs = build_availability_pairs(_shifts(), _onb(TUESDAY, None, None), ['e1'])
+    assert pairs['blocked_pairs'] == {(1, 'e1'), (2, 'e1')}
+
+    pairs = build_availability_pairs(_shifts(), _onb(TUESDAY, None, None, 'Beschikbaar'), ['e1'])
+    assert pairs['blocked_pairs'] == set()
+    assert pairs['preferred_pairs'] == {(2, 'e1')}
+
+
+def _template():
+    rows = [
+        # name, start, end, deskundigheid, Monday..Sunday
+        ("D", dt.time(7, 0), dt.time(15, 0), "[2, 3]", [1, 1, 1, 1, 1, 0, 0]),
+        ("A", dt.time(15, 0), dt.time(23, 0), "[3]", [0, 0.5, 0, 0, 1, 1, 0.5]),
+        ("N", dt.time(23, 0), dt.time(7, 0), "[4]", [1, 0, 0, 0, 0, 0, 1]),
+    ]
+    df = pd.DataFrame([(name, start, end, desk, *days) for name, start, end, desk, days in rows],
+                      columns=["Shifts", "Begintijd", "Eindtijd", "Deskundigheid", *DAY_COLUMNS])
+    df["start_min"] = minutes_of_day(df["Begintijd"])
+    df["duration_min"] = (minutes_of_day(df["Eindtijd"]) - df["start_min"]) % (24 * 60)
+    return df
+
+
+def test_shift_instances_match_a_loop_over_weeks_and_template():
+    template = _template()
+    start, global_start = pd.Timestamp(2026, 10, 21), pd.Timestamp(2026, 10, 19)  # a Wednesday, its Monday
+    shifts = expand_shift_instances(build_shift_requirements(template), start, global_start, num_weeks=3)
+
+    expected = []
+    for week in range(3):
+        for _, row in template.iterrows():
+            for dow, day in enumerate(DAY_COLUMNS):
+                if row[day] in (1, 0.5):
+                    date = start + pd.Timedelta(days=week * 7 + dow)
+                    expected.append((row["Shifts"], date, week + 1, (date - global_start).days // 7 + 1, dow,
+                                     week * 7 + dow, row[day]))
+    assert list(shifts["shift_id"]) == list(range(len(expected)))
+    assert list(zip(shifts["shift_name"], shifts["shift_date"], shifts["week"], shifts["global_week"],
+                    shifts["day_of_week"], shifts["absolute_day"], shifts["required"])) == expected
+
+    flags = shifts.drop_duplicates("shift_name").set_index("shift_name")[["is_day", "is_evening", "is_night"]]
+    assert flags.to_dict("index") == {"D": {"is_day": True, "is_evening": False, "is_night": False},
+                                      "A": {"is_day": False, "is_evening": True, "is_night": False},
+                                      "N": {"is_day": False, "is_evening": False, "is_night": True}}
+    assert shifts.loc[shifts["shift_name"] == "N", "end_min"].eq(31 * 60).all()
+    assert all(q == [2, 3] for q in shifts.loc[shifts["shift_name"] == "D", "qualification"])
+
+    maps = shift_helper_maps(shifts)
+    assert maps["weeks"] == [1, 2, 3]
+    assert maps["night_shifts"] == shifts.index[shifts["is_night"]].tolist()
+    assert sum(len(ids) for ids in maps["shifts_by_week"].values()) == len(shifts)
+    assert all(shifts.loc[ids, "absolute_day"].eq(day).all() for day, ids in maps["shifts_by_day"].items())
+
+
+def _preprocess(frames, vast_rooster):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return preprocess_data(df_werknemers=frames["workers"].copy(), df_rooster_template=frames["rooster_template"].copy(),
+                               df_onb=frames["onb"].copy(), prev_assignments=frames["prev_assignments"].copy(),
+                               df_vastrooster=vast_rooster.copy(), num_weeks=2)
+
+
+def test_fixed_roster_blocks_its_days_and_counts_each_shift_once(frames):
+    vast = frames["vast_rooster"]
+    emp = "600010-1"
+    assert set(vast.loc[vast["medewerker_id"] == emp, "dienst"]) == {"FM"}
+    unknown = pd.DataFrame([{**vast.iloc[0].to_dict(), "dag": "zaterdag", "dienst": "XX"}])
+    without = _preprocess(frames, vast.iloc[0:0])
+    data = _preprocess(frames, pd.concat([vast, unknown], ignore_index=True))
+
+    assert data["vast_rooster_unmatched"] == [{"medewerker_id": emp, "dienst": "XX", "dag": "zaterdag", "weekvolgnr": 1}]
+
+    # FM (08:00-12:30) on Monday to Friday, listed for both weeks, is subtracted once per weekday
+    contract = lambda d: d["workers"].set_index("medewerker_id").loc[emp, "contract_minutes"]
+    assert contract(without) - contract(data) == 5 * 270
+
+    # every listed day is blocked, also the day of the unknown shift
+    shifts = data["shifts"]
+    days = {(week - 1) * 7 + dow for week in (1, 2) for dow in range(5)} | {5}
+    dates = set(shifts.loc[shifts["absolute_day"].isin(days), "shift_date"].dt.date)
+    assert dates <= data["unavailable_dates"][emp]
+    blocked = set(shifts.loc[shifts["absolute_day"].isin(days), "shift_id"])
+    assert {(s, emp) for s in blocked} <= data["blocked_pairs"]
+    assert not {(s, emp) for s in blocked} <= without["blocked_pairs"]
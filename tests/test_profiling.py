@@ -0,0 +1,40 @@
+import contextlib
+import io
+
+from ortools.sat.python import cp_model
+
+from app import auto_rooster
+from app.profiling import BuildProfiler, format_build_report, presolve_time
+
+
+def test_sections_count_what_they_add():
+    model = cp_model.CpModel()
+    prof = BuildProfiler(model)
+    a, b = model.NewBoolVar("a"), model.NewBoolVar("b")
+    prof.mark("variables")
+    model.Add(a + b <= 1)
+    model.AddBoolOr([a, b])
+    prof.mark("constraints")
+
+    report = prof.report()
+    assert [(row["section"], row["variables"], row["constraints"]) for row in report["sections"]] == [
+        ("variables", 2, 0), ("constraints", 0, 2)]
+    assert (report["total"]["variables"], report["total"]["constraints"]) == (2, 2)
+
+    lines = format_build_report(report).splitlines()
+    assert [line.split()[0] for line in lines[1:]] == ["variables", "constraints", "total"]
+
+
+def test_presolve_time_from_the_search_log():
+    log = ["Starting presolve at 0.00s", "Presolved 10 constraints", "Starting search at 0.42s with 2 workers."]
+    assert presolve_time(log) == 0.42
+    assert presolve_time(log[:2]) is None
+
+
+def test_solve_reports_the_build_and_presolve(data):
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = auto_rooster(data, time_limit_s=2, on_incumbent=None, num_workers=2)
+    report = result["build_profile"]
+    assert sum(row["variables"] for row in report["sections"]) == report["total"]["variables"] > 0
+    assert sum(row["constraints"] for row in report["sections"]) == report["total"]["constraints"] > 0
+    assert result["presolve_s"] > 0
@@ -0,0 +1,40 @@
+import contextlib
+import io
+
+import pandas as pd
+
+from app.repair import apply_delta, replan
+
+
+def _unfilled_roster(data):
+    shifts = data["shifts"]
+    return pd.DataFrame({"shift_id": shifts["shift_id"], "employee_id": None, "shift_filled": False})
+
+
+def test_added_shift_gets_the_week_of_its_date(data):
+    shifts = data["shifts"]
+    existing = shifts.iloc[0]
+    delta = {"added_shifts": [{"shift_name": existing["shift_name"], "shift_date": existing["shift_date"]}]}
+    changed, _, _, added_ids = apply_delta(data, delta)
+
+    added = changed["shifts"].set_index("shift_id").loc[added_ids[0]]
+    assert added["week"] == existing["week"]
+    assert added["global_week"] == existing["global_week"]
+    assert added["day_key"] == existing["day_key"]
+    assert changed["weeks"] == data["weeks"]
+
+
+def test_replan_with_added_shift_keeps_the_horizon(data):
+    shifts = data["shifts"]
+    last = shifts.iloc[-1]
+    delta = {"added_shifts": [{"shift_name": last["shift_name"], "shift_date": last["shift_date"]}]}
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = replan(data, _unfilled_roster(data), delta, time_limit_s=5, on_incumbent=None)
+
+    assert result is not None
+    new = result["data"]
+    assert new["weeks"] == data["weeks"]
+    added = new["shifts"].set_index("shift_id").loc[result["replan"]["added_shifts"][0]]
+    same_date = shifts[shifts["shift_date"] == added["shift_date"]].iloc[0]
+    assert (added["week"], added["global_week"], added["day_key"]) == \
+        (same_date["week"], same_date["global_week"], same_date["day_key"])
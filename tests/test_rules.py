@@ -0,0 +1,51 @@
+import contextlib
+import io
+
+from app import auto_rooster
+from app.decompose import eligible_pairs
+from app.validate import validate_auto_rooster
+
+
+def _shift(data, name, day):
+    shifts = data['shifts']
+    return int(shifts.loc[(shifts['shift_name'] == name) & (shifts['absolute_day'] == day), 'shift_id'].iloc[0])
+
+
+def _worker(data, shift_ids):
+    pairs = eligible_pairs(data)
+    return next(emp for emp in data['emp_ids'] if all((s, emp) in pairs for s in shift_ids))
+
+
+def _solve(data, fixed):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return auto_rooster(data, time_limit_s=30, on_incumbent=None, num_workers=2, fixed=fixed)
+
+
+def _validate(data, emp, shift_ids):
+    assignments = data['shifts'][data['shifts']['shift_id'].isin(shift_ids)].assign(employee_id=emp)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return validate_auto_rooster(data, {'assignments_df': assignments})
+
+
+def test_no_day_shift_after_a_night(data):
+    # two night shifts a day: the old bound (<= number of nights that day) let one night plus a day shift through
+    assert (data['shifts'][data['shifts']['is_night']].groupby('absolute_day').size() > 1).all()
+    night, day = _shift(data, 'N', 0), _shift(data, 'D1', 1)
+    emp = _worker(data, [night, day])
+
+    assert _solve(data, {night: emp}) is not None
+    assert _solve(data, {night: emp, day: emp}) is None
+    assert any("after a night shift" in e for e in _validate(data, emp, [night, day]))
+
+
+def test_rest_after_three_nights(data):
+    nights = [_shift(data, 'N', day) for day in (0, 1, 2)]
+    blocked, free = _shift(data, 'D1', 4), _shift(data, 'D1', 5)
+    emp = _worker(data, nights + [blocked, free])
+
+    # solver and validator block the same days: the two days after the block
+    assert _solve(data, dict.fromkeys(nights + [blocked], emp)) is None
+    assert any("46h rest" in e for e in _validate(data, emp, nights + [blocked]))
+
+    assert _solve(data, dict.fromkeys(nights + [free], emp)) is not None
+    assert not any("46h rest" in e for e in _validate(data, emp, nights + [free]))
@@ -0,0 +1,39 @@
+import contextlib
+import io
+
+from app import auto_rooster
+from app.decompose import eligible_pairs
+
+
+def _solve(data, **options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return auto_rooster(data, time_limit_s=5, on_incumbent=None, num_workers=2, **options)
+
+
+def test_variables_only_for_eligible_pairs(data):
+    pairs = eligible_pairs(data)
+    shifts, table, index = data['shifts'], data['emp_table'], data['emp_index']
+    level = dict(zip(shifts['shift_id'], shifts['qualification'].map(lambda q: max(q) if isinstance(q, list) else int(q))))
+    assert not pairs & data['blocked_pairs']
+    for s, emp in pairs:
+        assert table['min_deskundigheid'][index[emp]] <= level[s]
+        assert not (s in data['night_shifts'] and table['voorkeur_nacht'][index[emp]] == 'niet')
+
+    result = _solve(data)
+    # one variable per eligible pair plus one uncovered variable per shift
+    section = next(row for row in result['build_profile']['sections'] if row['section'] == "variables and channels")
+    assert section['variables'] == len(pairs) + len(shifts)
+    assigned = result['assignments_df'].dropna(subset=['employee_id'])
+    assert set(zip(assigned['shift_id'], assigned['employee_id'])) <= pairs
+
+
+def test_staged_solve_keeps_the_phase1_coverage(data):
+    result = _solve(data, staged=True, phase1_share=0.4)
+    coverage, quality = result['phases']
+    assert (coverage['phase'], quality['phase']) == ("coverage", "quality")
+    assert quality['objective'] == result['objective_value']
+
+    # phase 2 may not leave more shifts uncovered than phase 1 reached
+    breakdown = result['objective_breakdown']
+    assert breakdown['uncovered']['value'] + breakdown['uncovered_optional']['value'] <= coverage['objective']
+    assert {event['phase'] for event in result['incumbents']} <= {"coverage", "quality"}
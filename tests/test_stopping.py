@@ -0,0 +1,62 @@
+import contextlib
+import io
+import threading
+import time
+from types import SimpleNamespace
+
+from ortools.sat.python import cp_model
+
+from app import auto_rooster
+from app.stopping import StopCallback, coverage_lower_bound, stop_reason, stop_without_improvement
+
+
+def test_coverage_lower_bound():
+    # day 1: shift 3 has no eligible employee; day 2: three shifts, two employees
+    shifts_by_date = {1: [1, 2, 3], 2: [4, 5, 6]}
+    emps_by_shift = {1: ["a"], 2: ["b"], 3: [], 4: ["a", "b"], 5: ["a"], 6: ["b"]}
+    weights = {1: 1000, 2: 1000, 3: 500, 4: 1000, 5: 500, 6: 1000}
+    assert coverage_lower_bound(shifts_by_date, emps_by_shift, weights) == 500 + 500
+
+
+def test_stop_reason():
+    callback = SimpleNamespace(stop_reason=None)
+    assert stop_reason("OPTIMAL", SimpleNamespace(stop_reason="soft_gap")) == "optimal"
+    assert stop_reason("FEASIBLE", SimpleNamespace(stop_reason="soft_gap")) == "soft_gap"
+    assert stop_reason("INFEASIBLE", callback) == "infeasible"
+    assert stop_reason("FEASIBLE", callback) == "time_limit"
+
+
+def test_stops_once_the_coverage_bound_is_reached():
+    model = cp_model.CpModel()
+    x = [model.NewBoolVar(f"x{i}") for i in range(20)]
+    u = model.NewBoolVar("u")
+    model.Add(sum(x) + u >= 1)
+    model.Minimize(1000 * u + sum((i + 1) * v for i, v in enumerate(x)))
+
+    callback = StopCallback([u], on_incumbent=None, coverage=[(u, 1000)], coverage_lb=0)
+    cp_model.CpSolver().Solve(model, callback)
+    assert callback.stop_reason == "coverage_bound"
+    assert callback.events and callback.events[-1]['uncovered'] == 0
+
+
+def test_watchdog_stops_a_search_without_improvement():
+    stopped = threading.Event()
+    solver = SimpleNamespace(StopSearch=stopped.set)
+    callback = SimpleNamespace(last_improvement=None, stop_reason=None)
+
+    done = stop_without_improvement(solver, callback, no_improvement_s=0.05, poll_s=0.01)
+    time.sleep(0.1)
+    assert not stopped.is_set()  # no solution yet
+    callback.last_improvement = time.monotonic()
+    assert stopped.wait(2)
+    assert callback.stop_reason == "no_improvement"
+    done.set()
+
+
+def test_solve_stops_at_the_objective_target(data):
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = auto_rooster(data, time_limit_s=30, on_incumbent=None, num_workers=2,
+                              stop={"objective_target": float("inf")})
+    assert result['stop_reason'] == "objective_target"
+    assert len(result['incumbents']) == 1
+    assert result['solve_time_s'] < 30
@@ -0,0 +1,60 @@
+import time
+
+import pandas as pd
+import pytest
+
+from web import app as web_app
+from web import uploads
+from web.app import app
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", str(tmp_path))
+    return app.test_client()
+
+
+def _get_teams(client, path):
+    with open(path, "rb") as f:
+        return client.post("/get_teams", data={"onb_file": (f, "onb.xlsx")}, content_type="multipart/form-data")
+
+
+def test_get_teams_stores_the_upload_and_parses_it_in_the_background(client, workbooks, frames):
+    response = _get_teams(client, workbooks[1])
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["teams"] == sorted(frames["onb"]["Team medewerker"].dropna().unique())
+
+    token = body["onb_token"]
+    with open(workbooks[1], "rb") as f:
+        assert uploads.get_upload(token) == f.read()
+    deadline = time.time() + 10
+    while (parsed := uploads.get_parsed_frames(token)) is None:
+        assert time.time() < deadline
+        time.sleep(0.05)
+    for name in ("onb", "prev_assignments"):
+        pd.testing.assert_frame_equal(parsed[name], frames[name])
+
+
+def test_schedule_reads_the_workbook_by_token(client, workbooks, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(web_app, "submit_job", lambda fn, *args: submitted.append(args) or "job")
+    monkeypatch.setattr(web_app, "start_background_parse", lambda token, content: None)
+    token = _get_teams(client, workbooks[1]).get_json()["onb_token"]
+
+    def schedule(onb_token):
+        with open(workbooks[0], "rb") as f:
+            return client.post("/schedule", data={"workers_rooster_template_vast_rooster": (f, "werknemers.xlsx"),
+                                                  "onb_token": onb_token}, content_type="multipart/form-data")
+
+    assert schedule(token).status_code == 202
+    _, onb_content, _, onb_token = submitted[0][:4]
+    with open(workbooks[1], "rb") as f:
+        assert (onb_content, onb_token) == (f.read(), token)
+
+    # unknown and malformed tokens ask for the workbook again instead of failing the job later
+    for bad in ("00000000-0000-4000-8000-000000000000", "../../etc/passwd"):
+        response = schedule(bad)
+        assert response.status_code == 400
+        assert "opnieuw" in response.get_json()["error"]
+    assert len(submitted) == 1
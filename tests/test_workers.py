@@ -0,0 +1,37 @@
+import datetime as dt
+
+import pytest
+
+from app.workers import FIRST_ROW, WorkerSheetError, parse_workers
+
+
+def test_parses_typed_columns(frames):
+    workers, report = parse_workers(frames["workers"], today=dt.date(2026, 1, 1))
+    assert report == []
+    assert workers["medewerker_id"].notna().all()  # the empty rows below the list are dropped
+    assert all(isinstance(d, list) and d for d in workers["deskundigheid"])
+    assert workers["contract_minutes"].dtype.kind == "i"
+    assert (workers["leeftijd"] > 0).all()
+
+
+def test_collects_every_violation_with_its_excel_row(frames):
+    raw = frames["workers"].copy()
+    raw["deskundigheid.1"] = raw["deskundigheid.1"].astype(object)
+    raw.loc[0, "deskundigheid.1"] = "twee"
+    raw.loc[1, "datum indienst"] = "2023-31-01"
+    raw.loc[2, "patroon"] = "7,x"
+    raw.loc[3, "voorkeur dagdelen (dag, avond, nacht)"] = "soms, niet, niet"
+
+    with pytest.raises(WorkerSheetError) as excinfo:
+        parse_workers(raw)
+
+    report = excinfo.value.report
+    fatal = {(r["row"], r["column"]) for r in report if r["fatal"]}
+    assert fatal == {(FIRST_ROW, "deskundigheid.1"), (FIRST_ROW + 1, "datum indienst"), (FIRST_ROW + 2, "patroon")}
+    assert [(r["row"], r["fatal"]) for r in report if r["column"].startswith("voorkeur")] == [(FIRST_ROW + 3, False)]
+    assert f"rij {FIRST_ROW + 2}, kolom 'patroon'" in str(excinfo.value)
+
+
+def test_missing_column_is_reported(frames):
+    with pytest.raises(WorkerSheetError, match="kolom 'patroon': kolom ontbreekt"):
+        parse_workers(frames["workers"].drop(columns=["patroon"]))
@@ -1,12 +1,22 @@
 import os
+import io
 import tempfile
 import pandas as pd
 from flask import Flask, request, jsonify, send_file, render_template
 import csv
 import traceback
+from functools import partial
 
 
 from app import preprocess_data, auto_rooster, validate_auto_rooster
+from app.loaders import WORKERS_WORKBOOK_FRAMES, ONB_WORKBOOK_FRAMES, load_workbook_frames, read_teams
+from app.decompose import SPLIT_MODES, solve_decomposed
+from app.cache import cache_key, get_cached, put_cached, cache_stats, get_cached_hint, put_cached_hint
+from app.hints import build_hint, solution_hint
+from app.params import PROFILES, resolve_profile
+from app.workers import WorkerSheetError
+from web.jobs import submit_job, update_job, get_job, append_event, read_events, max_concurrent_solves, JobQueueFull
+from web.uploads import save_upload, get_upload, start_background_parse, get_parsed_frames
 
 app = Flask(__name__)
 app.config["MAX_CONTENT_LENGTH"] = 30 * 1024 * 1024  # 30 MB upload limit
@@ -31,21 +41,6 @@ def read_dataframe(file_storage):
         return pd.read_excel(file_storage)
     return pd.read_csv(file_storage, sep=sep)
 
-def read_workers(file_storage):
-    return pd.read_excel(file_storage, sheet_name='Tabellen', usecols='T:AH', skiprows=1)
-
-def read_rooster_template(file_storage):
-    return pd.read_excel(file_storage, sheet_name="Tabellen", usecols="E:P", skiprows=1)
-
-def read_vast_rooster(file_storage):
-    return pd.read_excel(file_storage, sheet_name='Vaste roosters', usecols='A:E', skiprows=1)
-
-def read_onb(file_storage):
-    return pd.read_excel(file_storage, sheet_name='Aanlevering onbeschikbaarheid p')
-
-def read_prev_assignments(file_storage):
-    return pd.read_excel(file_storage, sheet_name='Aanlevering diensten')
-
 @app.route("/", methods=["GET"])
 def index():
     return render_template("upload.html")
@@ -57,86 +52,175 @@ def get_teams():
         if not onb_file:
             return jsonify({"error": "No file provided"}), 400
 
-        df = read_onb(onb_file)
-
-        if "Team medewerker" not in df.columns:
-            return jsonify({"error": "Column 'Team medewerker' missing"}), 400
+        # keep the upload for /schedule and stream only the team column now
+        content = onb_file.read()
+        try:
+            teams = read_teams(io.BytesIO(content))
+        except KeyError as e:
+            return jsonify({"error": e.args[0]}), 400
 
-        teams = sorted(df["Team medewerker"].dropna().unique().tolist())
-        return jsonify({"teams": teams})
+        onb_token = save_upload(content)
+        start_background_parse(onb_token, content)
+        return jsonify({"teams": teams, "onb_token": onb_token})
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def parse_and_preprocess(job_id, workers_content, onb_content, team_filter=None, onb_token=None):
+    """Parses both workbooks, applies the team filter and preprocesses (the cacheable part of a job)."""
+    # --- 1. Parse uploaded files (the onb workbook may already be parsed after /get_teams) ---
+    update_job(job_id, phase="parsing")
+    frames, timings = load_workbook_frames(io.BytesIO(workers_content), WORKERS_WORKBOOK_FRAMES)
+    onb_frames = get_parsed_frames(onb_token) if onb_token else None
+    if onb_frames is None:
+        onb_frames, timings["onb_workbook"] = load_workbook_frames(io.BytesIO(onb_content), ONB_WORKBOOK_FRAMES)
+    print(f"Workbooks parsed: {timings}")
+    workers_df = frames["workers"]
+    rooster_template_df = frames["rooster_template"]
+    vast_rooster_df = frames["vast_rooster"]
+    onb_df = onb_frames["onb"]
+    prev_df = onb_frames["prev_assignments"]
+
+    #Filter onb_df based on a dropdown selection for column 'Team medewerker'
+    if team_filter:
+        onb_df = onb_df[onb_df['Team medewerker'] == team_filter]
+        prev_df = prev_df[prev_df['Team medewerker'] == team_filter]
+
+    # --- 2. Preprocess ---
+    update_job(job_id, phase="preprocessing")
+    return preprocess_data(df_werknemers = workers_df, df_rooster_template = rooster_template_df, df_onb = onb_df, prev_assignments = prev_df, df_vastrooster = vast_rooster_df)
+
+def run_schedule_job(job_id, workers_content, onb_content, team_filter=None, onb_token=None, profile="standard",
+                     split="none"):
+    """Background pipeline for /schedule: parse → preprocess → solve → validate → CSV."""
+    # --- 1. Parse & preprocess, skipped when the same uploads and team were seen before ---
+    key = cache_key(workers_content, onb_content, team=team_filter)
+    data = get_cached(key)
+    update_job(job_id, cache_hit=data is not None)
+    if data is None:
+        try:
+            data = parse_and_preprocess(job_id, workers_content, onb_content, team_filter, onb_token)
+        except WorkerSheetError as e:
+            # every malformed value of the worker sheet at once, shown like validation errors
+            return {"state": "failed", "validation_errors": str(e).splitlines()}
+        put_cached(key, data)
+    else:
+        print(f"Preprocessed data loaded from cache ({key[:12]})")
+
+    # --- 2. Solve, warm started from the last run on these inputs or else the previous roster ---
+    update_job(job_id, phase="solving")
+    hint, hint_info = build_hint(data, "auto", last_solution=get_cached_hint(key), repair=True)
+    update_job(job_id, hint=hint_info)
+    # split (opt-in, see app/decompose.py) solves independent groups of shifts/employees in parallel,
+    # only without a team filter
+    if team_filter or split == "none":
+        solve = auto_rooster
+    else:
+        solve = partial(solve_decomposed, split_teams=split == "teams")
+    # the CPUs are shared by as many solves as may run at once, so jobs that start later do not oversubscribe them
+    settings = resolve_profile(profile, concurrent_solves=max_concurrent_solves())
+    update_job(job_id, profile=profile, num_workers=settings["num_workers"])
+    # staged: coverage first (a fifth of the time), then the soft terms with the coverage reached fixed
+    result = solve(data, on_incumbent=partial(append_event, job_id), hint=hint,
+                   staged=True, phase1_share=0.2, **settings)
+    if result is None:
+        return {"state": "failed", "error": "Geen oplossing gevonden"}
+    put_cached_hint(key, solution_hint(result))
+
+    assignments_df = result["assignments_df"]
+
+    # --- 3. Validate schedule ---
+    update_job(job_id, phase="validating")
+    errors = validate_auto_rooster(data, result)
+    if errors:
+        return {"state": "failed", "validation_errors": errors}
+
+    # --- 4. Save CSV to temp file ---
+    tmpfile = tempfile.NamedTemporaryFile(delete=False, suffix=".csv")
+    assignments_df.to_csv(tmpfile.name, index=False)
+    tmpfile.flush()
+
+    # --- 5. Return stats ---
+    stats = {
+        "start_date": assignments_df["shift_date"].min().date().isoformat(),
+        "end_date": assignments_df["shift_date"].max().date().isoformat(),
+        "total_shifts": len(data["shifts"]),
+        "num_employees": int(assignments_df["employee_id"].nunique()),
+        "shifts_filled": int(assignments_df["shift_filled"].sum()),
+        "shifts_unfilled": len(data["shifts"]) - int(assignments_df["shift_filled"].sum()),
+        "hint": hint_info,
+        "vast_rooster_unmatched": data["vast_rooster_unmatched"],
+        "worker_report": data["worker_report"],
+        "phases": result["phases"],
+        "profile": profile,
+        "num_workers": result["num_workers"],
+        "stop_reason": result["stop_reason"],
+        "first_solution_s": result["incumbents"][0]["elapsed_s"] if result["incumbents"] else None,
+        "download_url": f"/download/{os.path.basename(tmpfile.name)}"
+    }
+    return {"state": "done", "stats": stats}
+
 @app.route("/schedule", methods=["POST"])
 def generate_schedule():
+    """Starts a background solve and returns its job ID immediately (poll /jobs/<id>)."""
     try:
-        # --- 1. Get uploaded files ---
-        #print("=== LOADING FILES ===")
-        required_files = ["workers_rooster_template_vast_rooster", "onb_vorig_rooster"]
+        # --- 1. Get uploaded files (the onb workbook by token when /get_teams stored it) ---
+        onb_token = request.form.get("onb_token") or None
+        required_files = ["workers_rooster_template_vast_rooster"] if onb_token else ["workers_rooster_template_vast_rooster", "onb_vorig_rooster"]
         for rf in required_files:
             if rf not in request.files:
                 return jsonify({"error": f"Missing required file: {rf}"}), 400
 
-        #workers_df = read_dataframe(request.files["workers"])\
-        workers_df = read_workers(request.files["workers_rooster_template_vast_rooster"])
-        rooster_template_df = read_rooster_template(request.files["workers_rooster_template_vast_rooster"])
-        vast_rooster_df = read_vast_rooster(request.files["workers_rooster_template_vast_rooster"])
-        onb_df = read_onb(request.files["onb_vorig_rooster"])
-        prev_df = read_prev_assignments(request.files["onb_vorig_rooster"])
-        print(prev_df.head())
-        # if no prev_assignments provided, set to None
-        #if request.files["prev_assignments"].filename == "":
-        #    prev_df = None
-        #else:    
-        #    prev_df = read_dataframe(request.files["prev_assignments"])
-
-        #Filter onb_df based on a dropdown selection for column 'Team medewerker'
+        # read the uploads now, the request (and its files) is gone once the job runs
+        workers_content = request.files["workers_rooster_template_vast_rooster"].read()
+        if onb_token:
+            onb_content = get_upload(onb_token)
+            if onb_content is None:
+                return jsonify({"error": "Onbekende of verlopen upload, kies het beschikbaarheidsbestand opnieuw."}), 400
+        else:
+            onb_content = request.files["onb_vorig_rooster"].read()
         team_filter = request.form.get("team_filter", None)
-        if team_filter:
-            onb_df = onb_df[onb_df['Team medewerker'] == team_filter]
-            prev_df = prev_df[prev_df['Team medewerker'] == team_filter]
-        
-        
-                
-        # --- 2. Preprocess & solve ---
-        #print("=== LOADING & PREPROCESSING DATA ===")
-        data = preprocess_data(df_werknemers = workers_df, df_rooster_template = rooster_template_df, df_onb = onb_df, prev_assignments = prev_df, df_vastrooster = vast_rooster_df)
-    
-        #print("=== SOLVING SCHEDULE ===")
-        result = auto_rooster(data, time_limit_s=300)
-
-        assignments_df = result["assignments_df"]
-
-        # --- 3. Validate schedule ---
-        errors = validate_auto_rooster(data, result)
-        if errors:
-            return jsonify({"status": "failed", "validation_errors": errors}), 400
-
-        # --- 4. Save CSV to temp file ---
-        tmpfile = tempfile.NamedTemporaryFile(delete=False, suffix=".csv")
-        assignments_df.to_csv(tmpfile.name, index=False)
-        tmpfile.flush()
-    
-        # --- 5. Return stats as JSON ---
-        stats = {
-            "start_date": assignments_df["shift_date"].min().date().isoformat(),
-            "end_date": assignments_df["shift_date"].max().date().isoformat(),
-            "total_shifts": len(data["shifts"]),
-            "num_employees": assignments_df["employee_id"].nunique(),
-            "shifts_filled": int(assignments_df["shift_filled"].sum()),
-            "shifts_unfilled": len(data["shifts"]) - int(assignments_df["shift_filled"].sum()),
-            "download_url": f"/download/{os.path.basename(tmpfile.name)}"
-        }
-    
-
-        return jsonify({"status": "success", "stats": stats})
-        
+        profile = request.form.get("profile") or "standard"
+        if profile not in PROFILES:
+            return jsonify({"error": f"Onbekend profiel: {profile}"}), 400
+        split = request.form.get("split") or "none"
+        if split not in SPLIT_MODES:
+            return jsonify({"error": f"Onbekende opsplitsing: {split}"}), 400
+
+        job_id = submit_job(run_schedule_job, workers_content, onb_content, team_filter, onb_token, profile, split)
+        return jsonify({"status": "queued", "job_id": job_id, "status_url": f"/jobs/{job_id}"}), 202
+
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         traceback.print_exc()
         return jsonify({"error": str(e),
                         "trace": traceback.format_exc()}), 500
 
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job)
+
+@app.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    """
+    Improving solutions found so far, from index ?since= on. A short request instead of a
+    stream: the upload page polls it with /jobs/<id>, so an open page holds no server thread.
+    """
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    since = request.args.get("since", 0, type=int)
+    events = read_events(job_id, since)
+    return jsonify({"state": job["state"], "events": events, "next": since + len(events)})
+
+@app.route("/cache/stats", methods=["GET"])
+def preprocessing_cache_stats():
+    return jsonify(cache_stats())
+
 @app.route("/download/<filename>", methods=["GET"])
 def download_file(filename):
     return send_file(os.path.join(tempfile.gettempdir(), filename),
@@ -0,0 +1,129 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Job state lives on disk so every gunicorn worker process can answer GET /jobs/<id>,
+# the executor (and therefore the concurrency bound) is per process. The dockerfile runs a
+# single gunicorn process with threads (WEB_CONCURRENCY=1), so there MAX_RUNNING_JOBS and
+# MAX_QUEUED_JOBS are the limits of the whole service. With more processes every process has
+# its own limits, and each solve is sized for all of them running at once (max_concurrent_solves).
+JOB_DIR = os.environ.get("ROOSTER_JOB_DIR", os.path.join(tempfile.gettempdir(), "rooster_jobs"))
+MAX_RUNNING_JOBS = int(os.environ.get("ROOSTER_MAX_JOBS", 1))
+MAX_QUEUED_JOBS = int(os.environ.get("ROOSTER_MAX_QUEUED_JOBS", 8))
+WEB_PROCESSES = int(os.environ.get("WEB_CONCURRENCY", 1))  # gunicorn's default for --workers
+JOB_TTL_S = int(os.environ.get("ROOSTER_JOB_TTL_S", 24 * 3600))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_RUNNING_JOBS, thread_name_prefix="rooster-job")
+_lock = threading.Lock()
+_pending = 0  # queued + running jobs in this process
+
+
+class JobQueueFull(Exception):
+    """Raised when this process already has MAX_QUEUED_JOBS jobs waiting or running."""
+
+
+def _job_path(job_id):
+    return os.path.join(JOB_DIR, f"{job_id}.json")
+
+
+def _write_job(job):
+    os.makedirs(JOB_DIR, exist_ok=True)
+    tmp_path = _job_path(job["job_id"]) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(job, f, default=str)
+    os.replace(tmp_path, _job_path(job["job_id"]))
+
+
+def get_job(job_id):
+    """Returns the job record, or None for unknown (or malformed) job IDs."""
+    try:
+        uuid.UUID(job_id)
+        with open(_job_path(job_id)) as f:
+            return json.load(f)
+    except (ValueError, OSError):
+        return None
+
+
+def update_job(job_id, **fields):
+    with _lock:
+        job = get_job(job_id) or {"job_id": job_id}
+        job.update(fields)
+        job["updated"] = time.time()
+        _write_job(job)
+    return job
+
+
+def _events_path(job_id):
+    return os.path.join(JOB_DIR, f"{job_id}.events")
+
+
+def append_event(job_id, event):
+    """Appends one progress event (a JSON line) to the job's event log."""
+    os.makedirs(JOB_DIR, exist_ok=True)
+    with open(_events_path(job_id), "a") as f:
+        f.write(json.dumps(event, default=str) + "\n")
+
+
+def read_events(job_id, start=0):
+    """Returns the job's progress events from index start on (only complete lines)."""
+    try:
+        with open(_events_path(job_id)) as f:
+            lines = f.readlines()
+    except OSError:
+        return []
+    return [json.loads(line) for line in lines[start:] if line.endswith("\n")]
+
+
+def max_concurrent_solves():
+    """Solves that can run at the same time: MAX_RUNNING_JOBS in every web process."""
+    return MAX_RUNNING_JOBS * WEB_PROCESSES
+
+
+def _purge_old_jobs():
+    if not os.path.isdir(JOB_DIR):
+        return
+    cutoff = time.time() - JOB_TTL_S
+    for name in os.listdir(JOB_DIR):
+        path = os.path.join(JOB_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def submit_job(fn, *args, **kwargs):
+    """
+    Queues fn(job_id, *args, **kwargs) on the background executor and returns the job ID.
+    fn reports progress with update_job(job_id, phase=...) and returns the job result dict.
+    """
+    global _pending
+    with _lock:
+        if _pending >= MAX_QUEUED_JOBS:
+            raise JobQueueFull(f"Er staan al {_pending} roosters in de wachtrij, probeer het later opnieuw.")
+        _pending += 1
+
+    _purge_old_jobs()
+    job_id = str(uuid.uuid4())
+    update_job(job_id, state="queued", phase=None, created=time.time())
+
+    def run():
+        global _pending
+        try:
+            update_job(job_id, state="running", started=time.time())
+            result = fn(job_id, *args, **kwargs)
+            update_job(job_id, state=result.pop("state", "done"), phase=None, finished=time.time(), **result)
+        except Exception as e:
+            traceback.print_exc()
+            update_job(job_id, state="error", finished=time.time(), error=str(e), trace=traceback.format_exc())
+        finally:
+            with _lock:
+                _pending -= 1
+
+    _executor.submit(run)
+    return job_id
@@ -0,0 +1,84 @@
+import io
+import os
+import pickle
+import tempfile
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app.loaders import ONB_WORKBOOK_FRAMES, load_workbook_frames
+
+# The onbeschikbaarheid workbook is uploaded once (with /get_teams) and stored under a token,
+# /schedule references the token instead of uploading it again. Like the job records the
+# uploads and their parsed frames live on disk so every gunicorn worker can use them.
+UPLOAD_DIR = os.environ.get("ROOSTER_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "rooster_uploads"))
+UPLOAD_TTL_S = int(os.environ.get("ROOSTER_UPLOAD_TTL_S", 24 * 3600))
+
+_parse_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="onb-parse")
+
+
+def _upload_path(token, suffix):
+    uuid.UUID(token)  # raises ValueError for malformed tokens
+    return os.path.join(UPLOAD_DIR, f"{token}{suffix}")
+
+
+def _write_atomic(path, payload):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def _purge_old_uploads():
+    if not os.path.isdir(UPLOAD_DIR):
+        return
+    cutoff = time.time() - UPLOAD_TTL_S
+    for name in os.listdir(UPLOAD_DIR):
+        path = os.path.join(UPLOAD_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def save_upload(content):
+    """Stores the workbook bytes and returns its session token."""
+    _purge_old_uploads()
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    token = str(uuid.uuid4())
+    _write_atomic(_upload_path(token, ".xlsx"), content)
+    return token
+
+
+def get_upload(token):
+    """Returns the stored workbook bytes, or None for unknown (or malformed) tokens."""
+    try:
+        with open(_upload_path(token, ".xlsx"), "rb") as f:
+            return f.read()
+    except (ValueError, OSError):
+        return None
+
+
+def _parse_upload(token, content):
+    try:
+        frames, timings = load_workbook_frames(io.BytesIO(content), ONB_WORKBOOK_FRAMES)
+        _write_atomic(_upload_path(token, ".frames.pkl"), pickle.dumps(frames, protocol=pickle.HIGHEST_PROTOCOL))
+        print(f"Background parse of upload {token} done: {timings}")
+    except Exception:
+        traceback.print_exc()
+
+
+def start_background_parse(token, content):
+    """Parses the onb and prev_assignments frames in the background for a later /schedule."""
+    _parse_executor.submit(_parse_upload, token, content)
+
+
+def get_parsed_frames(token):
+    """The background-parsed frames of the upload, or None if they are not (yet) available."""
+    try:
+        with open(_upload_path(token, ".frames.pkl"), "rb") as f:
+            return pickle.loads(f.read())
+    except (ValueError, OSError, pickle.UnpicklingError, EOFError):
+        return None